@@ -27,6 +27,40 @@ class Config:
     VECTOR_DB_PATH = os.getenv("VECTOR_DB_PATH", "./vector_db")
     CHROMA_COLLECTION_NAME = os.getenv("CHROMA_COLLECTION_NAME", "research_papers")
     
+    # Vector index backend: "chroma" (HNSW, default) or "exact" (brute-force
+    # over a memory-mapped matrix; best for small workspaces)
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+    
+    # Compressed vectors for the exact backend: "none" or "int8". With int8,
+    # search scans 1-byte codes and re-scores the best
+    # k * QUANTIZATION_RESCORE_FACTOR candidates against the float vectors.
+    VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none").lower()
+    QUANTIZATION_RESCORE_FACTOR = int(os.getenv("QUANTIZATION_RESCORE_FACTOR", "4"))
+    
+    # HNSW Index Configuration (applied when a collection is created;
+    # run scripts/rebuild_index.py to apply new values to an existing one)
+    HNSW_M = int(os.getenv("HNSW_M", "16"))
+    HNSW_CONSTRUCTION_EF = int(os.getenv("HNSW_CONSTRUCTION_EF", "100"))
+    HNSW_SEARCH_EF = int(os.getenv("HNSW_SEARCH_EF", "10"))
+    
+    # Chroma ingests publish a new index segment that is folded into the base
+    # segment in the background; with more than this many pending, the next
+    # ingest folds before returning (queries fan out to each segment)
+    MAX_INDEX_SEGMENTS = int(os.getenv("MAX_INDEX_SEGMENTS", "4"))
+    
+    # Workspace Configuration
+    DEFAULT_WORKSPACE = os.getenv("DEFAULT_WORKSPACE", "default")
+    MAX_OPEN_WORKSPACES = int(os.getenv("MAX_OPEN_WORKSPACES", "16"))
+    
+    # Multi-process serving (serve.py): SERVE_WORKERS read-only API workers
+    # share memory-mapped model weights and index files; a single writer
+    # process applies ingestion jobs and publishes new index generations
+    SERVE_MODE = os.getenv("SERVE_MODE", "single").lower()
+    SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", "4"))
+    SHARED_MODEL_DIR = os.getenv("SHARED_MODEL_DIR", "")
+    WRITE_JOB_TIMEOUT = float(os.getenv("WRITE_JOB_TIMEOUT", "600"))
+    GENERATION_POLL_INTERVAL = float(os.getenv("GENERATION_POLL_INTERVAL", "0.5"))
+    
     # Embeddings Configuration
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
     EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "384"))
@@ -36,13 +70,100 @@ class Config:
     MAX_CHUNK_SIZE = int(os.getenv("MAX_CHUNK_SIZE", "1000"))
     CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
     
+    # PDF text extractor: pypdf, pymupdf or pdfium (falls back to pypdf on failure)
+    PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "pypdf").lower()
+    
+    # Out-of-process PDF extraction with per-file limits (opt-in: it costs a
+    # worker process per EXTRACTION_WORKERS); failing PDFs are quarantined either way
+    EXTRACTION_SANDBOX = os.getenv("EXTRACTION_SANDBOX", "False").lower() == "true"
+    EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "120"))
+    EXTRACTION_MAX_RSS_MB = int(os.getenv("EXTRACTION_MAX_RSS_MB", "1024"))
+    EXTRACTION_MAX_FILES_PER_WORKER = int(os.getenv("EXTRACTION_MAX_FILES_PER_WORKER", "50"))
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "1"))
+    
+    # Boilerplate stripping between extraction and chunking (opt-in: it
+    # changes chunk texts and ids, so enable it and re-chunk together)
+    TEXT_CLEANING_ENABLED = os.getenv("TEXT_CLEANING_ENABLED", "False").lower() == "true"
+    CLEAN_EDGE_LINES = int(os.getenv("CLEAN_EDGE_LINES", "3"))
+    CLEAN_MIN_REPEAT_FRACTION = float(os.getenv("CLEAN_MIN_REPEAT_FRACTION", "0.5"))
+    CLEAN_DEHYPHENATE = os.getenv("CLEAN_DEHYPHENATE", "True").lower() == "true"
+    CLEAN_COLLAPSE_WHITESPACE = os.getenv("CLEAN_COLLAPSE_WHITESPACE", "True").lower() == "true"
+    CLEAN_DROP_REFERENCES = os.getenv("CLEAN_DROP_REFERENCES", "False").lower() == "true"
+    
+    # Compressed cache of extracted page texts (zstd when installed, else zlib)
+    TEXT_CACHE_ENABLED = os.getenv("TEXT_CACHE_ENABLED", "True").lower() == "true"
+    TEXT_CACHE_LEVEL = int(os.getenv("TEXT_CACHE_LEVEL", "3"))
+    
+    # Near-duplicate chunks (MinHash/LSH) are linked instead of embedded;
+    # opt-in (0 disables, 0.85 is a good starting threshold)
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0"))
+    NEAR_DUPLICATE_NUM_PERM = int(os.getenv("NEAR_DUPLICATE_NUM_PERM", "64"))
+    NEAR_DUPLICATE_SHINGLE_SIZE = int(os.getenv("NEAR_DUPLICATE_SHINGLE_SIZE", "5"))
+    NEAR_DUPLICATE_ACTION = os.getenv("NEAR_DUPLICATE_ACTION", "link").lower()
+    
+    # Result diversification: re-rank TOP_K * MMR_FETCH_FACTOR candidates by
+    # maximal marginal relevance (lambda 1 = relevance only, 0 = novelty only)
+    # and/or cap chunks per source document (0 = no cap); both per request too
+    MMR_ENABLED = os.getenv("MMR_ENABLED", "False").lower() == "true"
+    MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.5"))
+    MMR_FETCH_FACTOR = int(os.getenv("MMR_FETCH_FACTOR", "4"))
+    MAX_CHUNKS_PER_SOURCE = int(os.getenv("MAX_CHUNKS_PER_SOURCE", "0"))
+    
+    # In-memory chunk counters are re-read from the backend in the background
+    # when older than this (writes always mark them for a re-read)
+    COUNT_RECONCILE_SECONDS = float(os.getenv("COUNT_RECONCILE_SECONDS", "60"))
+    
+    # Ingestion Configuration
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+    INGEST_WRITE_RETRIES = int(os.getenv("INGEST_WRITE_RETRIES", "3"))
+    INGEST_RETRY_BACKOFF = float(os.getenv("INGEST_RETRY_BACKOFF", "0.5"))
+    
+    # Per-document ingest reports and the thresholds that flag a PDF as pathological
+    INGEST_REPORTS_ENABLED = os.getenv("INGEST_REPORTS_ENABLED", "True").lower() == "true"
+    SLOW_EXTRACTION_SECONDS = float(os.getenv("SLOW_EXTRACTION_SECONDS", "10"))
+    SLOW_PAGE_SECONDS = float(os.getenv("SLOW_PAGE_SECONDS", "1.0"))
+    MIN_CHARS_PER_PAGE = int(os.getenv("MIN_CHARS_PER_PAGE", "200"))
+    MAX_TRUNCATED_FRACTION = float(os.getenv("MAX_TRUNCATED_FRACTION", "0.2"))
+    
     # Groq API Configuration
     GROQ_API_KEY = os.getenv("GROQ_API_KEY", None)
     GROQ_MODEL = os.getenv("GROQ_MODEL", "mixtral-8x7b-32768")
+    # Point at another Groq/OpenAI-compatible server, e.g. scripts/fake_llm_server.py
+    GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "")
+    GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "2"))
+    GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "60"))
+    
+    # Compression of large JSON bodies on the fast response path (brotli when installed, else gzip)
+    RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "True").lower() == "true"
+    RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "4096"))
+    GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+    BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
     
     # CORS Configuration
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", '["http://localhost:3000", "http://localhost:8080"]')
     
+    # Metrics Configuration (Prometheus text format at /metrics)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    
+    # Tracing Configuration (OpenTelemetry spans for the RAG pipeline)
+    # TRACING_EXPORTER: "none", "file" (OTel JSON lines), "otlp" (HTTP collector) or "console"
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+    TRACING_FILE = os.getenv("TRACING_FILE", "./traces/spans.jsonl")
+    TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+    # Comma-separated propagator names; "none" disables context propagation
+    TRACING_PROPAGATORS = os.getenv("TRACING_PROPAGATORS", "tracecontext,baggage")
+    TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "researchhub-backend")
+    
+    # Admin API (profiling controls and downloads); empty disables admin access
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+    
+    # Profiling Configuration (cProfile captures of selected requests and write jobs)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+    PROFILING_MAX_PER_MINUTE = int(os.getenv("PROFILING_MAX_PER_MINUTE", "6"))
+    PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+    
     # Logging Configuration
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     
@@ -17,7 +17,7 @@ import logging
 import os
 from typing import Dict, Any
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
@@ -27,6 +27,10 @@ load_dotenv()
 # Single source of truth for DB path and data directory
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.abspath(os.path.join(BASE_DIR, "vector_db"))
+# Spool directory for jobs handed to the writer process (serve.py)
+WRITE_QUEUE_DIR = os.path.join(DB_PATH, "write_queue")
+# Saved profiles and profiling toggles, shared by all processes
+PROFILE_DIR = os.path.abspath(os.path.join(BASE_DIR, os.getenv("PROFILE_DIR") or "profiles"))
 
 # Data directory - resolve to absolute path
 _env_data_dir = os.getenv("DATA_DIR")
@@ -41,7 +45,13 @@ else:
     DATA_DIR = os.path.abspath(os.path.join(BASE_DIR, "data"))
 
 # Import routers
-from routers import papers, chat
+from config import Config
+from routers import admin, papers, chat
+from utils.metrics import MetricsMiddleware, register_gauge_callback, render_metrics
+from utils.profiling import ProfilingMiddleware, configure_profiling
+from utils.tracing import TracingMiddleware, configure_tracing
+from utils.workspaces import WorkspaceManager
+from utils.write_queue import WriteQueue
 
 # Configure logging
 logging.basicConfig(
@@ -51,6 +61,46 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def register_state_gauges(workspace_manager: WorkspaceManager, write_queue: WriteQueue = None) -> None:
+    """Register gauges that are read from live state when /metrics is scraped."""
+    register_gauge_callback(
+        "researchhub_collection_chunks",
+        "Chunks stored per open workspace",
+        ["workspace", "backend"],
+        lambda: [
+            ((workspace, store.backend_name), store.count())
+            for workspace, store in workspace_manager.open_stores().items()
+        ]
+    )
+    register_gauge_callback(
+        "researchhub_open_workspaces",
+        "Workspace store handles held open",
+        [],
+        lambda: [((), len(workspace_manager.open_stores()))]
+    )
+
+    def threadpool_depth():
+        # Sync endpoints (e.g. /chat/chat) run on AnyIO's worker threads
+        from anyio import to_thread
+        stats = to_thread.current_default_thread_limiter().statistics()
+        return [(("busy",), stats.borrowed_tokens), (("waiting",), stats.tasks_waiting)]
+
+    register_gauge_callback(
+        "researchhub_threadpool_tasks",
+        "Requests running on or waiting for the sync-endpoint thread pool",
+        ["state"],
+        threadpool_depth
+    )
+
+    if write_queue is not None:
+        register_gauge_callback(
+            "researchhub_write_queue_depth",
+            "Write jobs waiting for the writer process",
+            [],
+            lambda: [((), write_queue.depth())]
+        )
+
+
 # Lifespan context manager for startup and shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -71,7 +121,10 @@ async def lifespan(app: FastAPI):
     logger.info("ResearchPilot AI Agent - Startup")
     logger.info("=" * 60)
     
+    tracer_provider = None
     try:
+        tracer_provider = configure_tracing()
+        
         # Get configuration from environment (single source of truth for db_path)
         logger.info(f"WORKING DIRECTORY: {os.getcwd()}")
         logger.info(f"FINAL VECTOR DB PATH: {DB_PATH}")
@@ -90,14 +143,30 @@ async def lifespan(app: FastAPI):
         collection_name = os.getenv("CHROMA_COLLECTION_NAME", "research_papers")
         data_dir = DATA_DIR  # Use the absolute path defined at module level
         
+        # One set of workspace stores (client + embedding model) for both routers.
+        # Under serve.py this process is one of several read-only workers and
+        # writes go through the queue to the single writer process.
+        multi_process = Config.SERVE_MODE == "multi"
+        workspace_manager = WorkspaceManager(
+            db_path=db_path,
+            collection_name=collection_name,
+            read_only=multi_process
+        )
+        write_queue = WriteQueue(WRITE_QUEUE_DIR) if multi_process else None
+        logger.info(f"✓ Workspace stores initialized ({'read-only worker' if multi_process else 'single process'})")
+        
         # Initialize papers router
-        papers.initialize_papers_router(db_path, collection_name, data_dir)
+        papers.initialize_papers_router(db_path, collection_name, data_dir, workspace_manager, write_queue)
         logger.info("✓ Papers router initialized")
         
         # Initialize chat router
-        chat.initialize_chat_router(db_path, collection_name, groq_api_key)
+        chat.initialize_chat_router(db_path, collection_name, groq_api_key, workspace_manager)
         logger.info("✓ Chat router initialized")
         
+        if Config.METRICS_ENABLED:
+            register_state_gauges(workspace_manager, write_queue)
+            logger.info("✓ Metrics exposed at /metrics")
+        
         logger.info("All services initialized successfully")
         logger.info("=" * 60)
         logger.info("Server is ready to accept requests")
@@ -113,6 +182,9 @@ async def lifespan(app: FastAPI):
     logger.info("=" * 60)
     logger.info("ResearchPilot AI Agent - Shutdown")
     logger.info("Cleaning up resources...")
+    if tracer_provider is not None:
+        # Flush spans still buffered in the batch processor
+        tracer_provider.shutdown()
     logger.info("=" * 60)
 
 
@@ -162,15 +234,37 @@ app.add_middleware(
 )
 logger.info(f"CORS enabled for origins: {cors_origins}")
 
+# cProfile capture of requests selected by header or admin toggle
+if configure_profiling(PROFILE_DIR) is not None:
+    app.add_middleware(ProfilingMiddleware)
+    logger.info(f"Profiling enabled, dumps in {PROFILE_DIR}")
+
+# One server span per request, joined to the caller's trace when one is propagated
+if Config.TRACING_EXPORTER != "none":
+    app.add_middleware(TracingMiddleware)
+
+# Request latency per route (added last, so it is outermost and also
+# covers CORS preflight handling)
+if Config.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Add explicit OPTIONS handler for preflight requests (backup)
 @app.options("/{full_path:path}")
 async def options_handler(full_path: str):
     """Handle OPTIONS preflight requests"""
     return {"message": "OK"}
 
+if Config.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        """Prometheus scrape endpoint."""
+        payload, content_type = render_metrics()
+        return Response(content=payload, media_type=content_type)
+
 # Include routers
 app.include_router(papers.router)
 app.include_router(chat.router)
+app.include_router(admin.router)
 
 logger.info("Routers registered successfully")
 
@@ -193,8 +287,16 @@ async def root() -> Dict[str, Any]:
             "docs": "/api/docs",
             "redoc": "/api/redoc",
             "papers_ingest": "POST /api/v1/papers/ingest",
+            "papers_rechunk": "POST /api/v1/papers/rechunk",
             "papers_search": "GET /api/v1/papers/search?query=<query>",
+            "papers_chunks": "GET /api/v1/papers/chunks?ids=<id>,<id>",
             "papers_stats": "GET /api/v1/papers/stats",
+            "papers_ingest_reports": "GET /api/v1/papers/ingest-reports",
+            "papers_quarantine": "GET /api/v1/papers/quarantine",
+            "papers_duplicates": "GET /api/v1/papers/duplicates",
+            "papers_workspaces": "GET /api/v1/papers/workspaces",
+            "metrics": "GET /metrics",
+            "admin_profiles": "GET /api/v1/admin/profiles",
             "chat": "POST /api/v1/chat/chat",
             "context": "POST /api/v1/chat/context",
             "chat_health": "GET /api/v1/chat/health"
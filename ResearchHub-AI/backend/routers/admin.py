@@ -0,0 +1,110 @@
+"""
+Admin Router Module
+Profiling controls and profile downloads, guarded by ADMIN_TOKEN.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from utils.profiling import ProfileStore, admin_token_valid, get_profile_store
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
+
+
+class ProfilingToggles(BaseModel):
+    """Requests and write jobs to profile until switched off or expired."""
+
+    paths: List[str] = []
+    jobs: List[str] = []
+    sample_rate: float = 1.0
+    expires_in: Optional[float] = 600
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject requests without the configured admin token."""
+    if not admin_token_valid(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token missing or invalid")
+
+
+def require_profile_store() -> ProfileStore:
+    store = get_profile_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (set PROFILING_ENABLED=true)")
+    return store
+
+
+@router.get("/profiling", dependencies=[Depends(require_admin)])
+async def get_profiling(store: ProfileStore = Depends(require_profile_store)) -> Dict[str, Any]:
+    """Show the active profiling toggles and rate limit."""
+    return {
+        "status": "success",
+        "toggles": store.get_toggles(),
+        "max_per_minute": store.limiter.capacity,
+        "max_files": store.max_files,
+    }
+
+
+@router.put("/profiling", dependencies=[Depends(require_admin)])
+async def set_profiling(
+    toggles: ProfilingToggles,
+    store: ProfileStore = Depends(require_profile_store)
+) -> Dict[str, Any]:
+    """Profile requests under the given path prefixes and the given write-job operations."""
+    from routers.papers import WRITE_JOBS
+
+    unknown = sorted(set(toggles.jobs) - set(WRITE_JOBS))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown write jobs: {', '.join(unknown)} (expected any of {', '.join(sorted(WRITE_JOBS))})"
+        )
+    stored = store.set_toggles(toggles.paths, toggles.jobs, toggles.sample_rate, toggles.expires_in)
+    logger.info(f"Profiling toggles set: {stored}")
+    return {"status": "success", "toggles": stored}
+
+
+@router.delete("/profiling", dependencies=[Depends(require_admin)])
+async def clear_profiling(store: ProfileStore = Depends(require_profile_store)) -> Dict[str, Any]:
+    """Switch toggled profiling off (header-requested profiles still work)."""
+    store.clear_toggles()
+    return {"status": "success", "toggles": {}}
+
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles(store: ProfileStore = Depends(require_profile_store)) -> Dict[str, Any]:
+    """List saved profiles, newest first."""
+    profiles = store.list_profiles()
+    return {"status": "success", "profiles": profiles, "count": len(profiles)}
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def download_profile(
+    profile_id: str,
+    format: str = "prof",
+    sort: str = "cumulative",
+    limit: int = 50,
+    store: ProfileStore = Depends(require_profile_store)
+):
+    """
+    Download a saved profile.
+
+    format=prof returns the raw cProfile dump (for pstats, snakeviz, ...);
+    format=text returns the top `limit` functions sorted by `sort`.
+    """
+    try:
+        if format == "text":
+            return PlainTextResponse(store.summary(profile_id, sort=sort, limit=min(max(1, limit), 500)))
+        path = store.profile_path(profile_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Profile not found: {profile_id}")
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown sort key: {sort}")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
@@ -5,11 +5,16 @@ Exposes a simple chat endpoint wired to the ResearchAgent.
 
 import logging
 import os
-from typing import Dict, Any, Optional
-from fastapi import APIRouter, HTTPException
+from typing import Dict, Optional
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
 
+from config import Config
+from utils.diversity import validate_diversity
+from utils.fast_json import json_response
 from utils.research_agent import ResearchAgent
+from utils.tracing import collect_timings
+from utils.workspaces import WorkspaceManager, WorkspaceNotFoundError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,10 +31,17 @@ class ChatRequest(BaseModel):
     query: str
     use_context: bool = True
     top_k: int = 5
+    workspace: str = Config.DEFAULT_WORKSPACE
+    # Add a per-stage latency breakdown (milliseconds) to the response
+    include_timings: bool = False
+    # Context diversification (defaults: MMR_ENABLED, MMR_LAMBDA, MAX_CHUNKS_PER_SOURCE)
+    diversify: Optional[bool] = None
+    mmr_lambda: Optional[float] = None
+    max_per_source: Optional[int] = None
 
 
 @router.post("/chat")
-def chat(request: ChatRequest) -> Dict[str, Any]:
+def chat(request: ChatRequest, http_request: Request) -> Response:
     if not request.query or not request.query.strip():
         raise HTTPException(status_code=400, detail="Query cannot be empty")
 
@@ -37,12 +49,27 @@ def chat(request: ChatRequest) -> Dict[str, Any]:
         raise HTTPException(status_code=503, detail="Chat service not initialized")
 
     try:
-        result = agent.analyze_topic(
-            query=request.query,
-            top_k=request.top_k,
-            use_context=request.use_context,
-        )
-        return result
+        agent.workspaces.validate_name(request.workspace)
+        validate_diversity(request.mmr_lambda, request.max_per_source)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        with collect_timings(request.include_timings) as timings:
+            result = agent.analyze_topic(
+                query=request.query,
+                top_k=request.top_k,
+                use_context=request.use_context,
+                workspace=request.workspace,
+                diversify=request.diversify,
+                mmr_lambda=request.mmr_lambda,
+                max_per_source=request.max_per_source,
+            )
+        if timings is not None:
+            result["timings"] = timings
+        return json_response(result, http_request)
+    except WorkspaceNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Chat error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -53,14 +80,20 @@ def chat_health() -> Dict[str, str]:
     return {"status": "healthy", "service": "chat"}
 
 
-def initialize_chat_router(db_path: str, collection_name: str, groq_api_key: str | None = None) -> None:
+def initialize_chat_router(
+    db_path: str,
+    collection_name: str,
+    groq_api_key: str | None = None,
+    workspace_manager: Optional[WorkspaceManager] = None,
+) -> None:
     """
     Initialize the chat router and the ResearchAgent instance.
 
     Args:
         db_path: Path to the Chroma vector DB directory.
-        collection_name: Name of the Chroma collection to use.
+        collection_name: Base name of the Chroma collection to use.
         groq_api_key: Optional Groq API key; if provided, it will be set in the environment
+        workspace_manager: Optional WorkspaceManager shared with the papers router
     """
     global agent
 
@@ -69,6 +102,10 @@ def initialize_chat_router(db_path: str, collection_name: str, groq_api_key: str
         os.environ["GROQ_API_KEY"] = groq_api_key
 
     # Create a ResearchAgent configured to use the specified DB/collection
-    agent = ResearchAgent(db_path=db_path, collection_name=collection_name)
+    agent = ResearchAgent(
+        db_path=db_path,
+        collection_name=collection_name,
+        workspace_manager=workspace_manager,
+    )
 
     logger.info("Chat router initialized with ResearchAgent")
@@ -3,17 +3,33 @@ Papers Router Module
 Handles document ingestion and semantic search endpoints.
 """
 
+import asyncio
 import logging
 import os
 import re
-from pathlib import Path
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, Request, Response, UploadFile, File
 from pydantic import BaseModel
 
+from config import Config
+from utils.blob_store import BlobStore, hash_bytes
 from utils.document_loader import DocumentLoader
-from utils.vector_store import VectorStore
+from utils.base_store import BaseVectorStore
+from utils.diversity import validate_diversity
+from utils.extraction_sandbox import ExtractionSandbox
+from utils.fast_json import json_response
+from utils.ingest_reports import IngestReportStore, build_reports
+from utils.pdf_extractors import ExtractionError
+from utils.profiling import profile_job
+from utils.quarantine import Quarantine
+from utils.snippets import make_snippet, query_terms
+from utils.text_cache import TextCache
+from utils.text_cleaner import create_text_cleaner
+from utils.tracing import collect_timings
+from utils.workspaces import WorkspaceManager, WorkspaceNotFoundError
+from utils.write_queue import WriteQueue
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,26 +38,97 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/api/v1/papers", tags=["papers"])
 
-# Initialize document loader and vector store
+# Initialize document loader, workspace stores, blob store, ingest reports
+# and the quarantine of PDFs whose extraction failed.
+# `vector_store` is the default workspace's store, kept for scripts.
+# `write_queue` is set in multi-process serving, where writes are handed
+# to the writer process instead of running in the request's worker.
 document_loader = None
+workspaces = None
 vector_store = None
-
-
-def initialize_papers_router(db_path: str, collection_name: str, data_dir: str):
+blob_store = None
+ingest_reports = None
+quarantine = None
+write_queue = None
+
+# Write jobs run one at a time, as in the writer process; in single-process
+# mode they run on worker threads so searches keep being served meanwhile
+_write_job_lock = threading.Lock()
+
+
+def initialize_papers_router(
+    db_path: str,
+    collection_name: str,
+    data_dir: str,
+    workspace_manager: Optional[WorkspaceManager] = None,
+    queue: Optional[WriteQueue] = None
+):
     """
     Initialize the papers router with document loader and vector store.
 
     Args:
         db_path: Path to vector database
-        collection_name: Name of the ChromaDB collection
+        collection_name: Base name of the ChromaDB collection
         data_dir: Path to data directory with PDFs
+        workspace_manager: Optional shared WorkspaceManager (one is created if omitted)
+        queue: Write queue to the writer process (multi-process serving only)
     """
-    global document_loader, vector_store
-    document_loader = DocumentLoader(data_dir=data_dir)
-    vector_store = VectorStore(db_path=db_path, collection_name=collection_name)
+    global document_loader, workspaces, vector_store, blob_store, ingest_reports, quarantine, write_queue
+    quarantine = Quarantine(data_dir)
+    sandbox = None
+    if Config.EXTRACTION_SANDBOX:
+        sandbox = ExtractionSandbox(
+            Config.PDF_EXTRACTOR,
+            timeout=Config.EXTRACTION_TIMEOUT,
+            max_rss_mb=Config.EXTRACTION_MAX_RSS_MB,
+            max_files_per_worker=Config.EXTRACTION_MAX_FILES_PER_WORKER,
+            workers=Config.EXTRACTION_WORKERS
+        )
+    text_cache = None
+    if Config.TEXT_CACHE_ENABLED:
+        text_cache = TextCache(os.path.join(data_dir, "text_cache"), level=Config.TEXT_CACHE_LEVEL)
+    document_loader = DocumentLoader(
+        data_dir=data_dir,
+        chunk_size=Config.MAX_CHUNK_SIZE,
+        chunk_overlap=Config.CHUNK_OVERLAP,
+        text_cache=text_cache,
+        extractor=Config.PDF_EXTRACTOR,
+        sandbox=sandbox,
+        quarantine=quarantine,
+        cleaner=create_text_cleaner()
+    )
+    workspaces = workspace_manager or WorkspaceManager(db_path=db_path, collection_name=collection_name)
+    vector_store = workspaces.get(Config.DEFAULT_WORKSPACE)
+    blob_store = BlobStore(data_dir=data_dir)
+    ingest_reports = IngestReportStore(db_path)
+    write_queue = queue
     logger.info("Papers router initialized")
 
 
+def get_workspace_store(workspace: str, create: bool = False) -> BaseVectorStore:
+    """
+    Resolve a workspace's vector store, mapping errors to HTTP status codes.
+
+    Only write paths that add documents pass `create`; everything else
+    gets a 404 for a workspace that does not exist.
+    """
+    if not document_loader or not workspaces or not blob_store:
+        raise HTTPException(status_code=500, detail="Router not initialized")
+    try:
+        return workspaces.get(workspace, create=create)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkspaceNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+def sanitize_filename(name: str) -> str:
+    """Strip characters that are unsafe in filenames."""
+    cleaned = re.sub(r"[<>:\\\"/|?*]", "_", name)
+    cleaned = cleaned.strip().rstrip(". ")
+    return cleaned or "uploaded.pdf"
+
+
 class SearchRequest(BaseModel):
     """Search request model."""
 
@@ -50,12 +137,15 @@ class SearchRequest(BaseModel):
 
 
 class SearchResult(BaseModel):
-    """Individual search result model."""
+    """Individual search result model; optional fields depend on `include`."""
 
+    id: str
     rank: int
-    document: str
     similarity: float
-    metadata: Dict[str, Any]
+    document: Optional[str] = None
+    snippet: Optional[str] = None
+    highlights: Optional[List[List[int]]] = None
+    metadata: Optional[Dict[str, Any]] = None
 
 
 class SearchResponse(BaseModel):
@@ -65,6 +155,12 @@ class SearchResponse(BaseModel):
     query: str
     results_count: int
     results: List[SearchResult]
+    timings: Optional[Dict[str, float]] = None
+
+
+# Parts of a search result that `include` can select (id, rank and similarity are always sent)
+SEARCH_INCLUDE_FIELDS = ("document", "snippet", "metadata")
+MAX_CHUNK_IDS = 100
 
 
 class IngestionResponse(BaseModel):
@@ -73,145 +169,750 @@ class IngestionResponse(BaseModel):
     status: str
     message: str
     documents_ingested: int
+    flagged_documents: List[str] = []
+
+
+def _record_reports(
+    workspace: str,
+    loader_stats: List[Dict[str, Any]],
+    result: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Build and persist the ingest reports of a write job (if enabled)."""
+    if not Config.INGEST_REPORTS_ENABLED:
+        return []
+    reports = build_reports(loader_stats, (result or {}).get("documents"))
+    try:
+        ingest_reports.record(workspace, reports)
+    except OSError as e:
+        logger.warning(f"Failed to persist ingest reports: {str(e)}")
+    return reports
 
 
-@router.post("/upload")
-async def upload_pdf(file: UploadFile = File(...)) -> Dict[str, Any]:
-    """
-    Upload a PDF file to the data directory and ingest it into the vector store.
+def _extract_upload(
+    workspace: str,
+    metadata: Dict[str, Any],
+    previous_hash: Optional[str]
+) -> Tuple[List[Tuple[str, dict]], Dict[str, Any]]:
     """
-    try:
-        if not document_loader or not vector_store:
-            raise HTTPException(status_code=500, detail="Router not initialized")
-
-        if not file.filename.lower().endswith(".pdf"):
-            raise HTTPException(status_code=400, detail="Only PDF files are supported")
-
-        def sanitize_filename(name: str) -> str:
-            cleaned = re.sub(r"[<>:\\\"/|?*]", "_", name)
-            cleaned = cleaned.strip().rstrip(". ")
-            return cleaned or "uploaded.pdf"
-
-        data_dir = Path(document_loader.data_dir)
-        safe_name = sanitize_filename(file.filename)
-        file_path = data_dir / safe_name
-
-        counter = 1
-        original_name = safe_name
-        while file_path.exists():
-            name_parts = original_name.rsplit(".", 1)
-            file_path = data_dir / f"{name_parts[0]}_{counter}.{name_parts[1]}"
-            counter += 1
-
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-
-        logger.info(f"Saved uploaded file: {file_path}")
-
-        text = document_loader.load_pdf(str(file_path))
-        metadata = {
-            "source": file_path.name,
-            "file_path": str(file_path),
-            "document_type": "pdf",
-        }
-        chunks = document_loader.chunk_text(text, metadata)
+    Extract and chunk an uploaded PDF, quarantining it if extraction fails.
 
-        if not chunks:
-            raise HTTPException(status_code=500, detail="Failed to extract text from PDF")
-
-        result = vector_store.ingest_documents(chunks)
+    A failed upload is unlinked from its filename again (restoring the
+    previous version's mapping, if any) and answered with a 422.
+    """
+    filename = metadata["source"]
+    content_hash = metadata["content_hash"]
+    entry = quarantine.get(content_hash)
+    if entry is None:
+        try:
+            return document_loader.process_pdf(metadata["file_path"], metadata)
+        except ExtractionError as e:
+            entry = quarantine.add(metadata["file_path"], filename, content_hash, e)
+            _record_reports(workspace, [{
+                "source": filename, "content_hash": content_hash, "error": str(e), "quarantined": True
+            }])
+    else:
+        logger.info(f"Rejecting {filename}: content quarantined ({entry['reason']})")
+
+    blob_store.remove(filename, workspace)
+    if previous_hash and previous_hash != content_hash:
+        blob_store.link(filename, previous_hash, workspace)
+    raise HTTPException(
+        status_code=422,
+        detail=f"PDF quarantined ({entry['reason']}): {entry['detail']}"
+    )
+
+
+def _upload_job(workspace: str, filename: str, content: bytes) -> Dict[str, Any]:
+    """
+    Store an uploaded PDF and ingest it into a workspace.
 
-        if result["status"] == "success":
-            logger.info(
-                f"Successfully uploaded and ingested {file_path.name}: {result['count']} chunks"
-            )
+    PDFs are stored by content hash, so re-uploading identical bytes (under
+    any name) is a no-op that returns the already-ingested chunk ids; the
+    new name counts as a reference to them (see _delete_job). New content
+    under a name already in use in the same workspace replaces that name's
+    document; names in other workspaces are unrelated documents.
+    """
+    store = get_workspace_store(workspace, create=True)
+    previous_hash = blob_store.resolve(filename, workspace)
+    if previous_hash is not None and previous_hash != hash_bytes(content):
+        return _replace_job(workspace, filename, content)
+    content_hash, file_path, created = blob_store.put(content, filename, workspace)
+
+    if not created:
+        existing_ids = store.get_document_ids(content_hash)
+        if existing_ids:
+            logger.info(f"Duplicate upload {filename} -> {content_hash}, skipping ingestion")
             return {
                 "status": "success",
-                "message": "File uploaded and ingested successfully",
-                "filename": file_path.name,
-                "documents_ingested": result["count"],
+                "message": "Identical file already ingested",
+                "filename": filename,
+                "content_hash": content_hash,
+                "duplicate": True,
+                "documents_ingested": 0,
+                "document_ids": existing_ids,
             }
 
+    logger.info(f"Stored uploaded file {filename} as blob {file_path}")
+
+    metadata = {
+        "source": filename,
+        "file_path": str(file_path),
+        "document_type": "pdf",
+        "content_hash": content_hash,
+    }
+    chunks, stats = _extract_upload(workspace, metadata, previous_hash)
+
+    if not chunks:
+        _record_reports(workspace, [stats])
+        raise HTTPException(status_code=500, detail="Failed to extract text from PDF")
+
+    result = store.ingest_documents(chunks)
+
+    if result["status"] == "success":
+        reports = _record_reports(workspace, [stats], result)
+        logger.info(f"Successfully uploaded and ingested {filename}: {result['count']} chunks")
+        return {
+            "status": "success",
+            "message": "File uploaded and ingested successfully",
+            "filename": filename,
+            "workspace": workspace,
+            "content_hash": content_hash,
+            "duplicate": False,
+            "documents_ingested": result["count"],
+            "near_duplicates": result["near_duplicates"],
+            "document_ids": result["ids"],
+            "report": reports[0] if reports else None,
+        }
+
+    raise HTTPException(status_code=500, detail=result["message"])
+
+
+def _replace_job(workspace: str, filename: str, content: bytes) -> Dict[str, Any]:
+    """Re-ingest a new version of a document, rewriting only its own chunks."""
+    store = get_workspace_store(workspace, create=True)
+    previous_hash = blob_store.resolve(filename, workspace)
+    content_hash, file_path, _ = blob_store.put(content, filename, workspace)
+
+    metadata = {
+        "source": filename,
+        "file_path": str(file_path),
+        "document_type": "pdf",
+        "content_hash": content_hash,
+    }
+    chunks, stats = _extract_upload(workspace, metadata, previous_hash)
+
+    if not chunks:
+        _record_reports(workspace, [stats])
+        raise HTTPException(status_code=500, detail="Failed to extract text from PDF")
+
+    # Other names still referring to the old version keep its chunks
+    if previous_hash and previous_hash != content_hash:
+        _hand_over(workspace, store, filename, previous_hash)
+    result = store.replace_document(filename, chunks)
+
+    if result["status"] != "success":
         raise HTTPException(status_code=500, detail=result["message"])
+    reports = _record_reports(workspace, [stats], result)
+
+    # Drop the superseded blob if no name in any workspace refers to it
+    if previous_hash and previous_hash != content_hash and not blob_store.refcount(previous_hash):
+        blob_store.blob_path(previous_hash).unlink(missing_ok=True)
+
+    logger.info(f"Replaced {filename}: {result['count']} chunks written, {result['removed']} removed")
+    return {
+        "status": "success",
+        "message": "Document replaced successfully",
+        "filename": filename,
+        "workspace": workspace,
+        "content_hash": content_hash,
+        "documents_ingested": result["count"],
+        "documents_removed": result["removed"],
+        "near_duplicates": result["near_duplicates"],
+        "document_ids": result["ids"],
+        "report": reports[0] if reports else None,
+    }
+
+
+def _hand_over(workspace: str, store: BaseVectorStore, filename: str, content_hash: str) -> Optional[str]:
+    """
+    Give the chunks stored under `filename` to another name for the same
+    content in the same workspace.
 
-    except HTTPException:
-        raise
+    Returns:
+        The name now owning the content, or None if no other name in the
+        workspace refers to it
+    """
+    others = [name for name in blob_store.names_for(content_hash, workspace) if name != filename]
+    if not others:
+        return None
+    store.rename_document(filename, others[0])
+    return others[0]
+
+
+def _delete_job(workspace: str, source: str) -> Dict[str, Any]:
+    """
+    Delete one document name.
+
+    Identical uploads under several names share one set of chunks, so the
+    chunks and the blob are deleted with the last name referring to them;
+    until then the chunks move to a remaining name if `source` owned them.
+    """
+    store = get_workspace_store(workspace)
+
+    content_hash = blob_store.resolve(source, workspace)
+    owner = _hand_over(workspace, store, source, content_hash) if content_hash else None
+    deleted = store.delete_document(source) if owner is None else 0
+    removed_hash = blob_store.remove(source, workspace)
+    ingest_reports.remove(workspace, source)
+
+    if not deleted and removed_hash is None:
+        raise HTTPException(status_code=404, detail=f"Document not found: {source}")
+
+    return {
+        "status": "success",
+        "message": f"Deleted {deleted} chunks" if owner is None else f"Content still referenced by {owner}",
+        "filename": source,
+        "workspace": workspace,
+        "documents_deleted": deleted,
+    }
+
+
+def _ingest_directory_job(workspace: str) -> Dict[str, Any]:
+    """
+    Ingest new and changed PDFs from the data directory.
+
+    A PDF whose name is already indexed with other content is a new
+    version of that document and replaces it, so the old version's chunks
+    stop matching searches.
+    """
+    store = get_workspace_store(workspace, create=True)
+
+    logger.info("Starting document ingestion process...")
+
+    # Files whose content hash is already in the store are skipped unparsed
+    loader_stats: List[Dict[str, Any]] = []
+    documents = document_loader.load_documents_from_directory(
+        skip_hash=store.has_document,
+        reports=loader_stats
+    )
+
+    if not documents:
+        # Still report files whose extraction failed
+        _record_reports(workspace, loader_stats)
+        logger.warning("No documents found to ingest")
+        return {
+            "status": "warning",
+            "message": "No new PDF documents found in data directory. Please add PDFs to the data folder.",
+            "documents_ingested": 0,
+        }
+
+    indexed = {document["source"]: document.get("content_hash") for document in store.list_documents()}
+    new_documents: List[Tuple[str, dict]] = []
+    changed: Dict[str, List[Tuple[str, dict]]] = {}
+    for text, metadata in documents:
+        source = metadata["source"]
+        if source in indexed and indexed[source] != metadata["content_hash"]:
+            changed.setdefault(source, []).append((text, metadata))
+        else:
+            new_documents.append((text, metadata))
+
+    results = [store.ingest_documents(new_documents)] if new_documents else []
+    for source, chunks in changed.items():
+        results.append(store.replace_document(source, chunks))
+
+    failed = [result for result in results if result["status"] != "success"]
+    if failed:
+        raise HTTPException(status_code=500, detail=failed[0]["message"])
+
+    count = sum(result["count"] for result in results)
+    documents_stats = {key: value for result in results for key, value in result["documents"].items()}
+    reports = _record_reports(workspace, loader_stats, {"documents": documents_stats})
+    message = f"Ingested {count} document chunks"
+    if changed:
+        message += f", replacing {len(changed)} changed document(s)"
+    logger.info(f"Successfully ingested {count} document chunks ({len(changed)} document(s) replaced)")
+    return {
+        "status": "success",
+        "message": message,
+        "documents_ingested": count,
+        "flagged_documents": [r["source"] for r in reports if r["flags"]],
+    }
+
+
+def _rechunk_job(workspace: str, extract_missing: bool = False, force: bool = False) -> Dict[str, Any]:
+    """
+    Re-chunk and re-embed a workspace's documents from the text cache.
+
+    Documents already chunked with the current chunker settings are left
+    alone unless `force` is set. PDFs are never parsed, except for
+    documents missing from the cache when `extract_missing` is set.
+    """
+    store = get_workspace_store(workspace)
+    settings = document_loader.chunker_settings()
+    summary: Dict[str, Any] = {
+        "documents": 0,
+        "rechunked": 0,
+        "unchanged": 0,
+        "extracted": 0,
+        "chunks_ingested": 0,
+        "chunks_removed": 0,
+        "missing": [],
+    }
+
+    for stored in store.list_documents():
+        summary["documents"] += 1
+        if not force and all(stored.get(field) == value for field, value in settings.items()):
+            summary["unchanged"] += 1
+            continue
+
+        metadata = {field: value for field, value in stored.items() if field != "chunk_index" and field not in settings}
+        source = metadata.get("source", "document")
+        processed = document_loader.rechunk_from_cache(metadata)
+        file_path = metadata.get("file_path")
+        if processed is None and extract_missing and file_path and os.path.exists(file_path):
+            try:
+                processed = document_loader.process_pdf(file_path, metadata)
+                summary["extracted"] += 1
+            except ExtractionError as e:
+                logger.warning(f"Cannot re-extract '{source}': {str(e)}")
+        if processed is None or not processed[0]:
+            logger.warning(f"Cannot re-chunk '{source}': no cached text")
+            summary["missing"].append(source)
+            continue
+
+        chunks, stats = processed
+        result = store.replace_document(source, chunks)
+        if result["status"] != "success":
+            raise HTTPException(status_code=500, detail=f"Re-chunking '{source}' failed: {result['message']}")
+        _record_reports(workspace, [stats], result)
+        summary["rechunked"] += 1
+        summary["chunks_ingested"] += result["count"]
+        summary["chunks_removed"] += result["removed"]
+
+    logger.info(
+        f"Re-chunked {summary['rechunked']} of {summary['documents']} document(s) in '{workspace}' "
+        f"({summary['unchanged']} unchanged, {len(summary['missing'])} missing from the text cache)"
+    )
+    return {"status": "success", "workspace": workspace, "chunker": settings, **summary}
+
+
+def _clear_job(workspace: str) -> Dict[str, Any]:
+    """Remove every chunk from one workspace."""
+    store = get_workspace_store(workspace)
+    if not store.clear_collection():
+        raise HTTPException(status_code=500, detail=f"Failed to clear workspace '{workspace}'")
+    ingest_reports.clear(workspace)
+    blob_store.remove_workspace(workspace)
+    return {"status": "success", "message": f"Workspace '{workspace}' cleared", "workspace": workspace}
+
+
+# Operations that modify the index; in multi-process serving they are handed
+# to the writer process. Values are (operation, prefix for unexpected errors).
+WRITE_JOBS = {
+    "upload": (_upload_job, "Upload failed"),
+    "replace": (_replace_job, "Replace failed"),
+    "delete": (_delete_job, "Delete failed"),
+    "ingest_directory": (_ingest_directory_job, "Ingestion failed"),
+    "rechunk": (_rechunk_job, "Re-chunking failed"),
+    "clear": (_clear_job, "Clear failed"),
+}
+
+
+def run_write_job(op: str, args: Dict[str, Any], content: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Run one write operation, returning errors as data instead of raising.
+
+    Args:
+        op: Key of WRITE_JOBS
+        args: Keyword arguments for the operation
+        content: Uploaded file bytes, for operations that take them
+
+    Returns:
+        The operation's response, or {"error": {"status_code", "detail"}}
+    """
+    operation, error_prefix = WRITE_JOBS[op]
+    try:
+        if content is not None:
+            args = {**args, "content": content}
+        with _write_job_lock, profile_job(op):
+            return operation(**args)
+    except HTTPException as e:
+        return {"error": {"status_code": e.status_code, "detail": e.detail}}
     except Exception as e:
-        logger.error(f"Error during file upload: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+        logger.error(f"Write job '{op}' failed: {str(e)}")
+        return {"error": {"status_code": 500, "detail": f"{error_prefix}: {str(e)}"}}
 
 
-@router.post("/ingest", response_model=IngestionResponse)
-async def ingest_documents() -> Dict[str, Any]:
-    """Ingest PDF documents from the data directory into the vector store."""
+async def execute_write(op: str, args: Dict[str, Any], content: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Run a write operation here, or hand it to the writer process when serving multi-process.
+
+    Raises:
+        HTTPException: With the operation's status code if it failed
+    """
+    if write_queue is None:
+        # Parsing, embedding and index writes must not block the event loop serving searches
+        result = await asyncio.to_thread(run_write_job, op, args, content)
+    else:
+        job_id = write_queue.submit(op, args, content)
+        try:
+            result = await asyncio.to_thread(write_queue.wait, job_id, Config.WRITE_JOB_TIMEOUT)
+        except TimeoutError as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        # Read our own write right away instead of waiting for the next generation poll
+        workspaces.refresh(args.get("workspace"))
+
+    error = result.get("error")
+    if error:
+        raise HTTPException(status_code=error["status_code"], detail=error["detail"])
+    return result
+
+
+def validate_workspace(workspace: str) -> str:
+    """Validate a workspace name without opening its store."""
     try:
-        if not document_loader or not vector_store:
-            raise HTTPException(status_code=500, detail="Router not initialized")
+        return WorkspaceManager.validate_name(workspace)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        logger.info("Starting document ingestion process...")
 
-        documents = document_loader.load_documents_from_directory()
+@router.post("/upload")
+async def upload_pdf(
+    file: UploadFile = File(...),
+    workspace: str = Config.DEFAULT_WORKSPACE
+) -> Dict[str, Any]:
+    """
+    Upload a PDF file and ingest it into the vector store.
 
-        if not documents:
-            logger.warning("No documents found to ingest")
-            return {
-                "status": "warning",
-                "message": "No PDF documents found in data directory. Please add PDFs to the data folder.",
-                "documents_ingested": 0,
-            }
+    PDFs are stored by content hash, so re-uploading identical bytes (under
+    any name) is a no-op that returns the already-ingested chunk ids.
+    """
+    validate_workspace(workspace)
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+    content = await file.read()
+    return await execute_write(
+        "upload",
+        {"workspace": workspace, "filename": sanitize_filename(file.filename)},
+        content
+    )
+
+
+@router.put("/documents/{source}")
+async def replace_document(
+    source: str,
+    file: UploadFile = File(...),
+    workspace: str = Config.DEFAULT_WORKSPACE
+) -> Dict[str, Any]:
+    """
+    Replace a previously ingested document with a new version of the PDF.
 
-        result = vector_store.ingest_documents(documents)
+    Only the chunks of `source` are re-embedded and rewritten; the rest of
+    the collection is untouched.
+    """
+    validate_workspace(workspace)
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
-        if result["status"] == "success":
-            logger.info(f"Successfully ingested {result['count']} document chunks")
-            return {
-                "status": "success",
-                "message": result["message"],
-                "documents_ingested": result["count"],
-            }
+    content = await file.read()
+    return await execute_write(
+        "replace",
+        {"workspace": workspace, "filename": sanitize_filename(source)},
+        content
+    )
 
-        raise HTTPException(status_code=500, detail=result["message"])
 
-    except Exception as e:
-        logger.error(f"Error during document ingestion: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
+@router.delete("/documents/{source}")
+async def delete_document(source: str, workspace: str = Config.DEFAULT_WORKSPACE) -> Dict[str, Any]:
+    """Delete one document's chunks from a workspace's vector store."""
+    validate_workspace(workspace)
+    return await execute_write("delete", {"workspace": workspace, "source": source})
 
 
-@router.get("/search", response_model=SearchResponse)
-async def search_documents(query: str, top_k: int = 5) -> Dict[str, Any]:
-    """Search for similar documents using semantic search."""
+@router.post("/ingest", response_model=IngestionResponse)
+async def ingest_documents(workspace: str = Config.DEFAULT_WORKSPACE) -> Dict[str, Any]:
+    """Ingest PDF documents from the data directory into a workspace's vector store."""
+    validate_workspace(workspace)
+    return await execute_write("ingest_directory", {"workspace": workspace})
+
+
+@router.post("/rechunk")
+async def rechunk_documents(
+    workspace: str = Config.DEFAULT_WORKSPACE,
+    extract_missing: bool = False,
+    force: bool = False
+) -> Dict[str, Any]:
+    """
+    Re-chunk and re-embed documents after MAX_CHUNK_SIZE, CHUNK_OVERLAP or
+    the chunker changed, using cached page texts instead of the PDFs.
+
+    Set extract_missing=true to parse the PDFs of documents ingested before
+    the text cache existed, and force=true to rebuild documents whose
+    chunker settings are already current.
+    """
+    validate_workspace(workspace)
+    return await execute_write(
+        "rechunk",
+        {"workspace": workspace, "extract_missing": extract_missing, "force": force}
+    )
+
+
+def _parse_list(value: Optional[str]) -> List[str]:
+    """Split a comma-separated query parameter."""
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def _select_fields(metadata: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """Keep only the requested metadata fields (all of them when none are named)."""
+    if not fields:
+        return metadata
+    return {field: metadata[field] for field in fields if field in metadata}
+
+
+@router.get("/search", response_model=SearchResponse, response_model_exclude_unset=True)
+async def search_documents(
+    request: Request,
+    query: str,
+    top_k: int = 5,
+    workspace: str = Config.DEFAULT_WORKSPACE,
+    include_timings: bool = False,
+    include: str = "document,metadata",
+    fields: Optional[str] = None,
+    snippet_chars: int = 240,
+    diversify: Optional[bool] = None,
+    mmr_lambda: Optional[float] = None,
+    max_per_source: Optional[int] = None
+) -> Response:
+    """
+    Search for similar documents in a workspace using semantic search.
+
+    Every result has its chunk `id`, `rank` and `similarity`; `include`
+    (comma-separated) adds any of `document` (full chunk text), `snippet`
+    (a `snippet_chars` window centred on the query terms, with
+    `highlights` offsets of the matches) and `metadata`. `fields` limits
+    metadata to the named keys, e.g. `include=snippet,metadata&fields=source`
+    for list views; full text is fetched later from GET /chunks.
+
+    diversify=true re-ranks over-fetched candidates by maximal marginal
+    relevance (`mmr_lambda`: 1 = relevance only, 0 = novelty only) so
+    overlapping chunks of one passage do not fill the results;
+    `max_per_source` caps results per source document (0 = no cap).
+    Unset values fall back to MMR_ENABLED, MMR_LAMBDA and MAX_CHUNKS_PER_SOURCE.
+
+    With include_timings=true the response adds a per-stage latency
+    breakdown in milliseconds (embed_query, vector_search, retrieval).
+    Results are built as plain dicts and sent through the fast JSON path
+    (see utils.fast_json); SearchResponse only documents the shape.
+    """
     try:
         if not query or not query.strip():
             raise HTTPException(status_code=400, detail="Query cannot be empty")
+        parts = _parse_list(include)
+        unknown = [part for part in parts if part not in SEARCH_INCLUDE_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown include value(s) {', '.join(unknown)}; expected {', '.join(SEARCH_INCLUDE_FIELDS)}"
+            )
+        metadata_fields = _parse_list(fields)
+        try:
+            validate_diversity(mmr_lambda, max_per_source)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        if not vector_store:
-            raise HTTPException(status_code=500, detail="Vector store not initialized")
+        store = get_workspace_store(workspace)
 
         top_k = min(max(1, top_k), 20)
         logger.info(f"Searching for query: '{query}' with top_k={top_k}")
 
-        results = vector_store.query_similar_documents(query, top_k=top_k)
-
-        formatted_results = [
-            SearchResult(
-                rank=result["rank"],
-                document=result["document"],
-                similarity=result["similarity"],
-                metadata=result["metadata"],
+        with collect_timings(include_timings) as timings:
+            results = store.query_similar_documents(
+                query,
+                top_k=top_k,
+                diversify=diversify,
+                mmr_lambda=mmr_lambda,
+                max_per_source=max_per_source
             )
-            for result in results
-        ]
+
+        terms = query_terms(query) if "snippet" in parts else set()
+        formatted_results = []
+        for result in results:
+            selected: Dict[str, Any] = {
+                "id": result["id"],
+                "rank": result["rank"],
+                "similarity": result["similarity"],
+            }
+            if "document" in parts:
+                selected["document"] = result["document"]
+            if "snippet" in parts:
+                selected["snippet"], selected["highlights"] = make_snippet(
+                    result["document"], terms, width=min(max(40, snippet_chars), 2000)
+                )
+            if "metadata" in parts:
+                selected["metadata"] = _select_fields(result["metadata"], metadata_fields)
+            formatted_results.append(selected)
 
         logger.info(f"Found {len(formatted_results)} similar documents")
 
-        return {
+        return json_response({
             "status": "success",
             "query": query,
             "results_count": len(formatted_results),
             "results": formatted_results,
-        }
+            "timings": timings,
+        }, request)
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Search failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
+
+
+@router.get("/chunks")
+async def get_chunks(
+    request: Request,
+    ids: str,
+    workspace: str = Config.DEFAULT_WORKSPACE,
+    fields: Optional[str] = None
+) -> Response:
+    """
+    Fetch the full text of chosen chunks in one call.
+
+    `ids` is a comma-separated list of chunk ids from search results (at
+    most 100); `fields` limits metadata as in /search. Ids no longer
+    stored are listed under `missing`.
+    """
+    chunk_ids = list(dict.fromkeys(_parse_list(ids)))
+    if not chunk_ids:
+        raise HTTPException(status_code=400, detail="No chunk ids given")
+    if len(chunk_ids) > MAX_CHUNK_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CHUNK_IDS} chunk ids per request")
+    store = get_workspace_store(workspace)
+    metadata_fields = _parse_list(fields)
+    chunks = [
+        {**chunk, "metadata": _select_fields(chunk["metadata"], metadata_fields)}
+        for chunk in store.get_chunks(chunk_ids)
+    ]
+    found = {chunk["id"] for chunk in chunks}
+    return json_response({
+        "status": "success",
+        "workspace": workspace,
+        "chunks": chunks,
+        "missing": [chunk_id for chunk_id in chunk_ids if chunk_id not in found],
+    }, request)
+
+
+@router.get("/stats")
+async def get_stats(request: Request, workspace: str = Config.DEFAULT_WORKSPACE) -> Response:
+    """
+    Get statistics for a workspace's collection.
+
+    Counts come from the store's maintained counters, so polling is cheap;
+    the response carries an ETag and a matching If-None-Match gets 304.
+    """
+    store = get_workspace_store(workspace)
+    stats = store.get_collection_stats()
+    if not stats:
+        raise HTTPException(status_code=500, detail="Failed to read collection stats")
+    return json_response(
+        {"status": "success", "workspace": workspace, **stats},
+        request,
+        headers={"Cache-Control": "no-cache"},
+        etag=True
+    )
+
+
+@router.get("/ingest-reports")
+async def list_ingest_reports(
+    request: Request,
+    workspace: str = Config.DEFAULT_WORKSPACE,
+    flagged_only: bool = False,
+    sort: str = "total_seconds",
+    limit: int = 50
+) -> Response:
+    """
+    List per-document ingest reports, most expensive first.
+
+    flagged_only=true keeps documents flagged as pathological (failed,
+    slow or text-poor extraction, heavily truncated chunks).
+    """
+    validate_workspace(workspace)
+    if not ingest_reports:
+        raise HTTPException(status_code=500, detail="Router not initialized")
+    try:
+        reports = ingest_reports.list_reports(
+            workspace, flagged_only=flagged_only, sort_by=sort, limit=min(max(1, limit), 1000)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response({
+        "status": "success",
+        "workspace": workspace,
+        "reports": reports,
+        "count": len(reports),
+        "totals": ingest_reports.totals(workspace),
+    }, request)
+
+
+@router.get("/ingest-reports/{source}")
+async def get_ingest_report(source: str, workspace: str = Config.DEFAULT_WORKSPACE) -> Dict[str, Any]:
+    """Get the latest ingest report of one document."""
+    validate_workspace(workspace)
+    if not ingest_reports:
+        raise HTTPException(status_code=500, detail="Router not initialized")
+    report = ingest_reports.get(workspace, source)
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"No ingest report for '{source}' in workspace '{workspace}'")
+    return {"status": "success", "workspace": workspace, "report": report}
+
+
+@router.get("/duplicates")
+async def get_duplication_report(workspace: str = Config.DEFAULT_WORKSPACE, limit: int = 50) -> Dict[str, Any]:
+    """
+    Report near-duplicate chunks linked instead of embedded, per document.
+
+    Documents are listed most duplicated first, with the documents their
+    chunks duplicate.
+    """
+    store = get_workspace_store(workspace)
+    if store.near_duplicates is None:
+        return {"status": "success", "workspace": workspace, "enabled": False}
+    report = store.near_duplicates.report(limit=min(max(1, limit), 1000))
+    return {"status": "success", "workspace": workspace, "enabled": True, **report}
+
+
+@router.get("/quarantine")
+async def list_quarantine() -> Dict[str, Any]:
+    """List PDFs whose extraction failed, with the reason."""
+    if not quarantine:
+        raise HTTPException(status_code=500, detail="Router not initialized")
+    entries = quarantine.list_entries()
+    return {"status": "success", "quarantined": entries, "count": len(entries)}
+
+
+@router.delete("/quarantine/{content_hash}")
+async def release_quarantine(content_hash: str) -> Dict[str, Any]:
+    """Forget a quarantined PDF so it can be uploaded or ingested again."""
+    if not quarantine:
+        raise HTTPException(status_code=500, detail="Router not initialized")
+    if not quarantine.release(content_hash):
+        raise HTTPException(status_code=404, detail=f"Not quarantined: {content_hash}")
+    return {"status": "success", "content_hash": content_hash}
+
+
+@router.post("/clear")
+async def clear_workspace(workspace: str = Config.DEFAULT_WORKSPACE) -> Dict[str, Any]:
+    """Remove every chunk from one workspace; other workspaces are untouched."""
+    validate_workspace(workspace)
+    return await execute_write("clear", {"workspace": workspace})
+
+
+@router.get("/workspaces")
+async def list_workspaces() -> Dict[str, Any]:
+    """List workspaces that have a collection."""
+    if not workspaces:
+        raise HTTPException(status_code=500, detail="Router not initialized")
+    names = workspaces.list_workspaces()
+    return {"status": "success", "workspaces": names, "count": len(names)}
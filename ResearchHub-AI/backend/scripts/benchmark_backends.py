@@ -0,0 +1,106 @@
+"""
+Compare the chroma (HNSW) and exact (memory-mapped brute force) backends.
+
+Usage:
+    python scripts/benchmark_backends.py --sizes 1000,10000,100000 --k 5
+
+For each corpus size a synthetic clustered corpus is written to both
+backends in a temporary directory using pre-computed embeddings (the
+embedding model is never loaded). Reported per backend: build time, cold
+open time, p50/p99 query latency and recall@k against exact search.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Ensure backend root is on sys.path so `utils` imports resolve when running as a script
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from config import Config
+from benchmark_hnsw import exact_top_k, normalize, synthetic_embeddings
+from utils.workspaces import create_vector_store
+
+
+def bench_backend(backend, corpus, queries, truth, k, batch_size):
+    """Build, reopen and query one backend; returns a result row."""
+    with tempfile.TemporaryDirectory(prefix=f"{backend}_bench_") as tmp_dir:
+        # The model name is never resolved because embeddings are supplied directly
+        store = create_vector_store(backend, tmp_dir, "bench_collection", embedding_model=None)
+
+        build_start = time.perf_counter()
+        for start in range(0, len(corpus), batch_size):
+            end = min(start + batch_size, len(corpus))
+            store._write_batch(
+                [str(i) for i in range(start, end)],
+                corpus[start:end].tolist(),
+                [""] * (end - start),
+                [{"row": i} for i in range(start, end)]
+            )
+        build_seconds = time.perf_counter() - build_start
+        del store
+
+        open_start = time.perf_counter()
+        store = create_vector_store(backend, tmp_dir, "bench_collection", embedding_model=None)
+        open_seconds = time.perf_counter() - open_start
+
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            query_start = time.perf_counter()
+            results = store.query_by_embedding(query.tolist(), top_k=k)
+            latencies.append((time.perf_counter() - query_start) * 1000)
+            hits += len({r["metadata"]["row"] for r in results} & set(expected.tolist()))
+
+        return {
+            "backend": backend,
+            "vectors": len(corpus),
+            "recall_at_k": round(hits / (len(queries) * k), 4),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "build_seconds": round(build_seconds, 2),
+            "open_seconds": round(open_seconds, 3),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,50000", help="comma-separated corpus sizes")
+    parser.add_argument("--backends", default="chroma,exact")
+    parser.add_argument("--dim", type=int, default=Config.EMBEDDING_DIMENSION)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=Config.INGEST_BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    rows = []
+    print(f"{'backend':>8} {'vectors':>9} {'recall@k':>9} {'p50 ms':>9} {'p99 ms':>9} {'build s':>9} {'open s':>9}")
+    for size in [int(v) for v in args.sizes.split(",") if v.strip()]:
+        corpus = normalize(synthetic_embeddings(size, args.dim, args.seed))
+        rng = np.random.default_rng(args.seed + 1)
+        picks = rng.integers(0, size, size=args.queries)
+        queries = normalize(corpus[picks] + 0.1 * rng.standard_normal((args.queries, args.dim)).astype(np.float32))
+        k = min(args.k, size)
+        truth = exact_top_k(corpus, queries, k)
+
+        for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+            row = bench_backend(backend, corpus, queries, truth, k, args.batch_size)
+            rows.append(row)
+            print(f"{row['backend']:>8} {row['vectors']:>9} {row['recall_at_k']:>9.4f} {row['p50_ms']:>9.3f} "
+                  f"{row['p99_ms']:>9.3f} {row['build_seconds']:>9.2f} {row['open_seconds']:>9.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"dim": args.dim, "queries": args.queries, "k": args.k, "results": rows}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Compare PDF text extractors on speed and text fidelity.
+
+Usage:
+    python scripts/benchmark_extractors.py --extractors pypdf,pymupdf,pdfium
+    python scripts/benchmark_extractors.py --pdf-dir ./data --reference pypdf --json extractors.json
+
+Without --pdf-dir a fixture set of synthetic PDFs is generated (see
+scripts/synthetic_corpus.py) whose page texts are known exactly, and
+fidelity is measured against them. With --pdf-dir the PDFs in that
+directory are compared against the --reference extractor's output.
+
+Reported per extractor: pages/s, mean ms per document, failed documents,
+page count mismatches and two fidelity scores averaged over pages -
+word F1 (same words, any order) and order similarity (difflib ratio over
+the word sequences, which drops when reading order or line joins differ).
+Extractors whose package is not installed are reported and skipped.
+"""
+import argparse
+import difflib
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Ensure backend root is on sys.path so `utils` imports resolve when running as a script
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from synthetic_corpus import LINES_PER_PAGE, make_pdf, synthetic_text
+from utils.pdf_extractors import EXTRACTORS, PdfExtractor, create_extractor
+
+
+def words(text: str) -> List[str]:
+    """Lower-cased word tokens, ignoring punctuation and whitespace layout."""
+    return re.findall(r"\w+", text.lower())
+
+
+def word_f1(expected: List[str], actual: List[str]) -> float:
+    """F1 of the word multisets."""
+    if not expected and not actual:
+        return 1.0
+    common = sum((Counter(expected) & Counter(actual)).values())
+    if not common:
+        return 0.0
+    precision = common / len(actual)
+    recall = common / len(expected)
+    return 2 * precision * recall / (precision + recall)
+
+
+def order_similarity(expected: List[str], actual: List[str]) -> float:
+    """difflib ratio of the word sequences (1.0 = identical order)."""
+    if not expected and not actual:
+        return 1.0
+    return difflib.SequenceMatcher(None, expected, actual, autojunk=False).ratio()
+
+
+def synthetic_fixtures(out_dir: str, docs: int, pages: int, words_per_page: int, seed: int) -> List[Tuple[str, List[str]]]:
+    """Write synthetic PDFs; returns (path, expected page texts) pairs."""
+    rng = random.Random(seed)
+    fixtures = []
+    for doc in range(docs):
+        texts = [synthetic_text(rng, words_per_page) for _ in range(pages)]
+        path = os.path.join(out_dir, f"fixture_{doc:03d}.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(texts))
+        # make_pdf keeps the first LINES_PER_PAGE lines of each page
+        fixtures.append((path, ["\n".join(text.split("\n")[:LINES_PER_PAGE]) for text in texts]))
+    return fixtures
+
+
+def reference_fixtures(pdf_dir: str, reference: PdfExtractor) -> List[Tuple[str, Optional[List[str]]]]:
+    """PDFs in a directory with the reference extractor's page texts (None if it failed)."""
+    fixtures = []
+    for name in sorted(os.listdir(pdf_dir)):
+        if not name.lower().endswith(".pdf"):
+            continue
+        path = os.path.join(pdf_dir, name)
+        try:
+            fixtures.append((path, reference.extract_pages(path)))
+        except Exception as e:
+            print(f"Reference extractor failed on {name}: {e}")
+            fixtures.append((path, None))
+    return fixtures
+
+
+def bench_extractor(extractor: PdfExtractor, fixtures: List[Tuple[str, Optional[List[str]]]], repeat: int) -> Dict[str, Any]:
+    """Time one extractor over the fixtures and score its text; returns a result row."""
+    seconds = 0.0
+    pages_done = 0
+    failures = 0
+    mismatches = 0
+    f1_scores: List[float] = []
+    order_scores: List[float] = []
+
+    for path, expected_pages in fixtures:
+        try:
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                pages = extractor.extract_pages(path)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+        except Exception as e:
+            print(f"{extractor.name} failed on {os.path.basename(path)}: {e}")
+            failures += 1
+            continue
+        seconds += best
+        pages_done += len(pages)
+        if expected_pages is None:
+            continue
+        if len(pages) != len(expected_pages):
+            mismatches += 1
+        for expected, actual in zip(expected_pages, pages):
+            expected_words, actual_words = words(expected), words(actual)
+            f1_scores.append(word_f1(expected_words, actual_words))
+            order_scores.append(order_similarity(expected_words, actual_words))
+
+    documents = len(fixtures) - failures
+    return {
+        "extractor": extractor.name,
+        "version": extractor.version,
+        "documents": documents,
+        "pages": pages_done,
+        "failures": failures,
+        "page_count_mismatches": mismatches,
+        "seconds": round(seconds, 4),
+        "pages_per_s": round(pages_done / seconds, 1) if seconds else 0.0,
+        "ms_per_document": round(seconds * 1000 / documents, 2) if documents else 0.0,
+        "word_f1": round(sum(f1_scores) / len(f1_scores), 4) if f1_scores else None,
+        "order_similarity": round(sum(order_scores) / len(order_scores), 4) if order_scores else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--extractors", default=",".join(EXTRACTORS), help="comma-separated extractor names")
+    parser.add_argument("--pdf-dir", default=None, help="benchmark these PDFs instead of synthetic fixtures")
+    parser.add_argument("--reference", default="pypdf", help="extractor whose text is ground truth for --pdf-dir")
+    parser.add_argument("--docs", type=int, default=20, help="synthetic fixture documents")
+    parser.add_argument("--pages", type=int, default=10, help="pages per synthetic document")
+    parser.add_argument("--words-per-page", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per document (best is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    extractors = []
+    skipped = {}
+    for name in [n.strip() for n in args.extractors.split(",") if n.strip()]:
+        try:
+            extractors.append(create_extractor(name))
+        except ImportError as e:
+            skipped[name] = str(e)
+            print(f"Skipping {name}: {e}")
+
+    with tempfile.TemporaryDirectory(prefix="extractor_bench_") as tmp_dir:
+        if args.pdf_dir:
+            fixtures = reference_fixtures(args.pdf_dir, create_extractor(args.reference))
+            truth = f"reference:{args.reference}"
+        else:
+            fixtures = synthetic_fixtures(tmp_dir, args.docs, args.pages, args.words_per_page, args.seed)
+            truth = "synthetic"
+        if not fixtures:
+            raise SystemExit("No PDFs to benchmark")
+
+        rows = []
+        print(f"{'extractor':>10} {'pages/s':>10} {'ms/doc':>10} {'word F1':>8} {'order':>8} {'failed':>7} {'pg diff':>8}")
+        for extractor in extractors:
+            row = bench_extractor(extractor, fixtures, max(1, args.repeat))
+            rows.append(row)
+            f1 = f"{row['word_f1']:.4f}" if row["word_f1"] is not None else "-"
+            order = f"{row['order_similarity']:.4f}" if row["order_similarity"] is not None else "-"
+            print(f"{row['extractor']:>10} {row['pages_per_s']:>10.1f} {row['ms_per_document']:>10.2f} {f1:>8} "
+                  f"{order:>8} {row['failures']:>7} {row['page_count_mismatches']:>8}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"truth": truth, "documents": len(fixtures), "skipped": skipped, "results": rows}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
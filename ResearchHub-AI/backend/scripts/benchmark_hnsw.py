@@ -0,0 +1,176 @@
+"""
+Sweep HNSW search_ef and report recall@k against exact brute force plus
+p50/p99 query latency.
+
+Usage:
+    python scripts/benchmark_hnsw.py --workspace default --ef 10,20,40,80,160
+    python scripts/benchmark_hnsw.py --synthetic 50000 --k 10 --json hnsw.json
+
+The corpus is either the stored embeddings of a workspace or a synthetic
+clustered set. Chroma fixes search_ef when a collection is created, so a
+throwaway index is built per value in a temporary directory; the real
+collection is only read.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Ensure backend root is on sys.path so `utils` imports resolve when running as a script
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except Exception:
+    pass
+
+import chromadb
+
+from config import Config
+from utils.vector_store import VectorStore, hnsw_metadata
+from utils.workspaces import workspace_collection_name
+
+
+def load_workspace_embeddings(workspace: str, page_size: int = 5000) -> np.ndarray:
+    """Read every stored embedding of a workspace's collection."""
+    db_path = os.path.abspath(os.path.join(BACKEND_DIR, "vector_db"))
+    base_name = os.getenv("CHROMA_COLLECTION_NAME", "research_papers")
+    client = chromadb.PersistentClient(path=db_path)
+    store = VectorStore(
+        db_path=db_path,
+        collection_name=workspace_collection_name(base_name, workspace),
+        embedding_model=None,
+        client=client,
+        read_only=True
+    )
+
+    pages = []
+    for segment in store.segments:
+        for offset in range(0, segment.count(), page_size):
+            page = segment.get(include=["embeddings"], limit=page_size, offset=offset)
+            pages.append(np.asarray(page["embeddings"], dtype=np.float32))
+    if not pages:
+        raise SystemExit(f"Workspace '{workspace}' has no embeddings")
+    return np.vstack(pages)
+
+
+def synthetic_embeddings(count: int, dim: int, seed: int) -> np.ndarray:
+    """Clustered random vectors, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, count // 200), dim)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size=count)
+    return centers[labels] + 0.35 * rng.standard_normal((count, dim)).astype(np.float32)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Exact cosine top-k indices for each query (rows are normalized)."""
+    sims = queries @ corpus.T
+    top = np.argpartition(-sims, kth=k - 1, axis=1)[:, :k]
+    return top
+
+
+def bench_search_ef(corpus, queries, truth, k, m, construction_ef, search_ef, batch_size):
+    """Build a throwaway index with the given parameters and measure it."""
+    with tempfile.TemporaryDirectory(prefix="hnsw_bench_") as tmp_dir:
+        client = chromadb.PersistentClient(path=tmp_dir)
+        collection = client.create_collection(
+            name="hnsw_bench",
+            metadata=hnsw_metadata(m, construction_ef, search_ef)
+        )
+
+        build_start = time.perf_counter()
+        for start in range(0, len(corpus), batch_size):
+            end = min(start + batch_size, len(corpus))
+            collection.add(
+                ids=[str(i) for i in range(start, end)],
+                embeddings=corpus[start:end].tolist()
+            )
+        build_seconds = time.perf_counter() - build_start
+
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            query_start = time.perf_counter()
+            result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=["distances"])
+            latencies.append((time.perf_counter() - query_start) * 1000)
+            hits += len(set(int(i) for i in result["ids"][0]) & set(expected.tolist()))
+
+        return {
+            "search_ef": search_ef,
+            "recall_at_k": round(hits / (len(queries) * k), 4),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "build_seconds": round(build_seconds, 2),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspace", default=Config.DEFAULT_WORKSPACE)
+    parser.add_argument("--synthetic", type=int, default=0, help="use N synthetic vectors instead of a workspace")
+    parser.add_argument("--dim", type=int, default=Config.EMBEDDING_DIMENSION)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--ef", default="10,20,40,80,160", help="comma-separated search_ef values")
+    parser.add_argument("--m", type=int, default=Config.HNSW_M)
+    parser.add_argument("--construction-ef", type=int, default=Config.HNSW_CONSTRUCTION_EF)
+    parser.add_argument("--batch-size", type=int, default=Config.INGEST_BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        corpus = synthetic_embeddings(args.synthetic, args.dim, args.seed)
+        source = f"synthetic({args.synthetic}x{args.dim})"
+    else:
+        corpus = load_workspace_embeddings(args.workspace)
+        source = f"workspace:{args.workspace}"
+    corpus = normalize(corpus)
+
+    # Perturbed corpus rows stand in for real queries
+    rng = np.random.default_rng(args.seed + 1)
+    picks = rng.integers(0, len(corpus), size=args.queries)
+    queries = normalize(corpus[picks] + 0.1 * rng.standard_normal((args.queries, corpus.shape[1])).astype(np.float32))
+    k = min(args.k, len(corpus))
+    truth = exact_top_k(corpus, queries, k)
+
+    print(f"Corpus {source}: {len(corpus)} vectors, {args.queries} queries, k={k}, "
+          f"M={args.m}, construction_ef={args.construction_ef}")
+    print(f"{'search_ef':>10} {'recall@k':>10} {'p50 ms':>10} {'p99 ms':>10} {'build s':>10}")
+
+    results = []
+    for search_ef in [int(v) for v in args.ef.split(",") if v.strip()]:
+        row = bench_search_ef(
+            corpus, queries, truth, k, args.m, args.construction_ef, search_ef, args.batch_size
+        )
+        results.append(row)
+        print(f"{row['search_ef']:>10} {row['recall_at_k']:>10.4f} {row['p50_ms']:>10.3f} "
+              f"{row['p99_ms']:>10.3f} {row['build_seconds']:>10.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "corpus": source,
+                "vectors": len(corpus),
+                "queries": args.queries,
+                "k": k,
+                "m": args.m,
+                "construction_ef": args.construction_ef,
+                "results": results,
+            }, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
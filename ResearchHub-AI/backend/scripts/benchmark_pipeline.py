@@ -0,0 +1,439 @@
+"""
+Benchmark the ingest, search and chat hot paths on a synthetic corpus.
+
+Usage:
+    python scripts/benchmark_pipeline.py --docs 20 --pages 10 --json run.json
+    python scripts/benchmark_pipeline.py --stages search,chat --concurrency 1,8,32 --requests 400
+    python scripts/benchmark_pipeline.py --json new.json --compare run.json --tolerance 0.15
+
+Stages (all by default):
+    extraction  PDF text extraction (DocumentLoader.load_pdf)
+    chunking    DocumentLoader.chunk_text
+    embedding   batch embedding throughput
+    store       vector index add (per batch) and query latency
+    search      GET /api/v1/papers/search end to end, at each concurrency level
+    chat        POST /api/v1/chat/chat end to end, with a fake LLM
+
+Everything runs in a temporary directory; the real vector_db and data
+directories are never touched. End-to-end stages drive the FastAPI app
+in-process through httpx's ASGI transport, so routing, validation,
+middleware and serialization are all included. The chat stage replaces
+the Groq SDK client with a fake that sleeps for --llm-latency-ms, so
+results do not depend on the network or an API key.
+
+--compare flags every metric that got worse than a previous JSON run by
+more than --tolerance and exits with status 1 if any did.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+# Ensure backend root is on sys.path so `utils` imports resolve when running as a script
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from synthetic_corpus import synthetic_query, write_corpus
+
+STAGES = ("extraction", "chunking", "embedding", "store", "search", "chat")
+
+
+def latency_summary(samples_ms: List[float]) -> Dict[str, float]:
+    """Mean and tail percentiles of a list of latencies in milliseconds."""
+    if not samples_ms:
+        return {"count": 0}
+    values = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "count": len(samples_ms),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+    }
+
+
+class FakeCompletions:
+    """Stand-in for the Groq SDK's chat.completions with a fixed latency."""
+
+    def __init__(self, latency_ms: float, completion_tokens: int):
+        self.latency = latency_ms / 1000
+        self.completion_tokens = completion_tokens
+        self.answer = " ".join(["finding"] * completion_tokens)
+
+    def create(self, model: str, messages: List[Dict[str, str]], **kwargs: Any) -> Any:
+        time.sleep(self.latency)
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=self.answer))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=self.completion_tokens),
+        )
+
+
+def bench_extraction(loader, pdf_paths: List[str]) -> Tuple[Dict[str, Any], List[Tuple[str, dict]]]:
+    """Extract every PDF; returns the result row and (text, metadata) per document."""
+    latencies, documents = [], []
+    total_bytes = sum(os.path.getsize(p) for p in pdf_paths)
+    start = time.perf_counter()
+    for path in pdf_paths:
+        doc_start = time.perf_counter()
+        text = loader.load_pdf(path)
+        latencies.append((time.perf_counter() - doc_start) * 1000)
+        documents.append((text, {"source": os.path.basename(path), "document_type": "pdf"}))
+    elapsed = time.perf_counter() - start
+    return {
+        "documents": len(pdf_paths),
+        "mb_per_s": round(total_bytes / 1e6 / elapsed, 3),
+        "docs_per_s": round(len(pdf_paths) / elapsed, 3),
+        **latency_summary(latencies),
+    }, documents
+
+
+def bench_chunking(loader, documents: List[Tuple[str, dict]]) -> Tuple[Dict[str, Any], List[Tuple[str, dict]]]:
+    """Chunk every extracted document; returns the result row and all chunks."""
+    latencies, chunks = [], []
+    total_chars = sum(len(text) for text, _ in documents)
+    start = time.perf_counter()
+    for index, (text, metadata) in enumerate(documents):
+        doc_start = time.perf_counter()
+        chunks.extend(loader.chunk_text(text, {**metadata, "content_hash": f"bench{index:08d}"}))
+        latencies.append((time.perf_counter() - doc_start) * 1000)
+    elapsed = time.perf_counter() - start
+    return {
+        "chunks": len(chunks),
+        "chunks_per_s": round(len(chunks) / elapsed, 1),
+        "mchars_per_s": round(total_chars / 1e6 / elapsed, 3),
+        **latency_summary(latencies),
+    }, chunks
+
+
+def bench_embedding(store, texts: List[str], batch_size: int) -> Tuple[Dict[str, Any], List[List[float]]]:
+    """Embed all chunk texts in batches; returns the result row and the embeddings."""
+    latencies, embeddings = [], []
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        batch_start = time.perf_counter()
+        embeddings.extend(store.generate_embeddings(texts[offset:offset + batch_size]))
+        latencies.append((time.perf_counter() - batch_start) * 1000)
+    elapsed = time.perf_counter() - start
+    return {
+        "texts": len(texts),
+        "batch_size": batch_size,
+        "texts_per_s": round(len(texts) / elapsed, 1),
+        **{f"batch_{key}": value for key, value in latency_summary(latencies).items() if key != "count"},
+    }, embeddings
+
+
+def bench_store(store, chunks, embeddings, query_embeddings, k: int, batch_size: int) -> Dict[str, Any]:
+    """Write pre-computed embeddings batch by batch, then run queries."""
+    from utils.base_store import make_chunk_id
+
+    add_latencies = []
+    start = time.perf_counter()
+    for offset in range(0, len(chunks), batch_size):
+        batch = chunks[offset:offset + batch_size]
+        batch_start = time.perf_counter()
+        store._write_batch(
+            [make_chunk_id(text, metadata) for text, metadata in batch],
+            embeddings[offset:offset + batch_size],
+            [text for text, _ in batch],
+            [metadata for _, metadata in batch]
+        )
+        add_latencies.append((time.perf_counter() - batch_start) * 1000)
+    add_seconds = time.perf_counter() - start
+
+    query_latencies = []
+    for query_embedding in query_embeddings:
+        query_start = time.perf_counter()
+        store.query_by_embedding(query_embedding, top_k=k)
+        query_latencies.append((time.perf_counter() - query_start) * 1000)
+
+    add_summary = latency_summary(add_latencies)
+    query_summary = latency_summary(query_latencies)
+    return {
+        "backend": store.backend_name,
+        "vectors": store.count(),
+        "add_vectors_per_s": round(len(chunks) / add_seconds, 1),
+        **{f"add_batch_{key}": value for key, value in add_summary.items() if key != "count"},
+        "queries": query_summary.pop("count", 0),
+        **{f"query_{key}": value for key, value in query_summary.items()},
+    }
+
+
+async def run_load(send: Callable[[int], Any], concurrency: int, total: int) -> Dict[str, Any]:
+    """
+    Issue `total` requests from `concurrency` concurrent callers.
+
+    Args:
+        send: Coroutine function taking the request number and returning a response
+        concurrency: Number of concurrent callers
+        total: Requests across all callers
+
+    Returns:
+        Throughput, latency percentiles and error count
+    """
+    latencies: List[float] = []
+    errors = 0
+    numbers = iter(range(total))
+
+    async def caller() -> None:
+        nonlocal errors
+        for number in numbers:
+            start = time.perf_counter()
+            try:
+                response = await send(number)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "requests_per_s": round(total / elapsed, 2),
+        **latency_summary(latencies),
+    }
+
+
+async def bench_endpoints(app, stages, queries, args) -> Dict[str, Any]:
+    """Drive the search and chat endpoints in-process at each concurrency level."""
+    import httpx
+
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+
+        async def search(number: int):
+            return await client.get(
+                "/api/v1/papers/search", params={"query": queries[number % len(queries)], "top_k": args.k}
+            )
+
+        async def chat(number: int):
+            return await client.post(
+                "/api/v1/chat/chat", json={"query": queries[number % len(queries)], "top_k": args.k}
+            )
+
+        for stage, send in (("search", search), ("chat", chat)):
+            if stage not in stages:
+                continue
+            # Warm up once so the first measured request does not pay for lazy setup
+            await send(0)
+            rows = []
+            for concurrency in args.concurrency:
+                row = await run_load(send, concurrency, args.requests)
+                rows.append(row)
+                print(f"  {stage:>6} c={concurrency:<4} {row['requests_per_s']:>9.2f} req/s  "
+                      f"p50 {row.get('p50_ms', 0):>9.2f} ms  p99 {row.get('p99_ms', 0):>9.2f} ms  "
+                      f"errors {row['errors']}")
+            results[stage] = rows
+    return results
+
+
+def environment_info(args) -> Dict[str, Any]:
+    """Describe the machine and code version a run was taken on."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": commit,
+        "backend": args.backend,
+        "embedding_model": args.model,
+    }
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Flatten nested results into `stage.metric` (or `stage.c8.metric`) keys."""
+    flat: Dict[str, float] = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, list):
+            for row in value:
+                flat.update(flatten(row, f"{prefix}{key}.c{row.get('concurrency')}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = float(value)
+    return flat
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    List metrics that regressed by more than `tolerance` (a fraction).
+
+    Keys ending in `_ms` are lower-is-better, `_per_s` higher-is-better;
+    counts and sizes are ignored.
+    """
+    now, before = flatten(current), flatten(baseline)
+    regressions = []
+    for key in sorted(now.keys() & before.keys()):
+        old, new = before[key], now[key]
+        if old <= 0:
+            continue
+        change = (new - old) / old
+        if (key.endswith("_ms") and change > tolerance) or (key.endswith("_per_s") and -change > tolerance):
+            regressions.append(f"{key}: {old:g} -> {new:g} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of stages")
+    parser.add_argument("--docs", type=int, default=20, help="synthetic PDFs in the corpus")
+    parser.add_argument("--pages", type=int, default=10, help="pages per PDF")
+    parser.add_argument("--words-per-page", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", default=None, help="vector backend (default: VECTOR_BACKEND)")
+    parser.add_argument("--model", default=None, help="embedding model (default: EMBEDDING_MODEL)")
+    parser.add_argument("--batch-size", type=int, default=None, help="embed/write batch (default: INGEST_BATCH_SIZE)")
+    parser.add_argument("--queries", type=int, default=200, help="distinct queries for store/search/chat")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="fake LLM response time")
+    parser.add_argument("--llm-completion-tokens", type=int, default=400)
+    parser.add_argument("--log-level", default="WARNING", help="log level while benchmarking")
+    parser.add_argument("--json", default=None, help="write results to this file")
+    parser.add_argument("--compare", default=None, help="previous JSON results to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    args.concurrency = [int(v) for v in args.concurrency.split(",") if v.strip()]
+
+    with tempfile.TemporaryDirectory(prefix="pipeline_bench_") as tmp_dir:
+        # Settings are read at import time, so point everything at the scratch directory first
+        os.environ["GROQ_API_KEY"] = "gsk_benchmark_fake_key"
+        os.environ["TRACING_EXPORTER"] = "none"
+        os.environ["SERVE_MODE"] = "single"
+        os.environ["SHARED_MODEL_DIR"] = ""
+
+        from config import Config
+        from routers import chat, papers
+        from utils.document_loader import DocumentLoader
+        from utils.text_cleaner import create_text_cleaner
+        from utils.workspaces import WorkspaceManager
+        import main as app_module
+
+        logging.getLogger().setLevel(args.log_level.upper())
+        for name in list(logging.root.manager.loggerDict):
+            logging.getLogger(name).setLevel(args.log_level.upper())
+
+        args.backend = (args.backend or Config.VECTOR_BACKEND).lower()
+        args.model = args.model or Config.EMBEDDING_MODEL
+        batch_size = args.batch_size or Config.INGEST_BATCH_SIZE
+
+        data_dir = os.path.join(tmp_dir, "data")
+        db_path = os.path.join(tmp_dir, "vector_db")
+        corpus_start = time.perf_counter()
+        pdf_paths = write_corpus(data_dir, args.docs, args.pages, args.words_per_page, args.seed)
+        print(f"Corpus: {len(pdf_paths)} PDFs x {args.pages} pages in {time.perf_counter() - corpus_start:.1f}s")
+
+        rng = random.Random(args.seed + 1)
+        queries = [synthetic_query(rng) for _ in range(args.queries)]
+
+        workspace_manager = WorkspaceManager(
+            db_path=db_path, collection_name="bench", embedding_model=args.model, backend=args.backend
+        )
+        store = workspace_manager.get(Config.DEFAULT_WORKSPACE)
+        loader = DocumentLoader(data_dir=data_dir, extractor=Config.PDF_EXTRACTOR, cleaner=create_text_cleaner())
+
+        results: Dict[str, Any] = {}
+        documents, chunks, embeddings = None, None, None
+
+        # Component stages depend on the previous stage's output, so earlier
+        # stages run (untimed in the report) whenever a later one needs them
+        needs_chunks = any(s in stages for s in ("chunking", "embedding", "store", "search", "chat"))
+        if "extraction" in stages or needs_chunks:
+            row, documents = bench_extraction(loader, pdf_paths)
+            if "extraction" in stages:
+                results["extraction"] = row
+                print(f"  extraction  {row['docs_per_s']:>9.2f} docs/s  p50 {row['p50_ms']:.2f} ms")
+        if needs_chunks:
+            row, chunks = bench_chunking(loader, documents)
+            if "chunking" in stages:
+                results["chunking"] = row
+                print(f"  chunking    {row['chunks_per_s']:>9.1f} chunks/s  p50 {row['p50_ms']:.2f} ms")
+        if needs_chunks:
+            row, embeddings = bench_embedding(store, [text for text, _ in chunks], batch_size)
+            if "embedding" in stages:
+                results["embedding"] = row
+                print(f"  embedding   {row['texts_per_s']:>9.1f} texts/s  batch p50 {row['batch_p50_ms']:.2f} ms")
+
+            # The store stage writes the corpus into the workspace the endpoints search
+            query_embeddings = store.generate_embeddings(queries)
+            row = bench_store(store, chunks, embeddings, query_embeddings, args.k, batch_size)
+            if "store" in stages:
+                results["store"] = row
+                print(f"  store       {row['add_vectors_per_s']:>9.1f} vectors/s  "
+                      f"query p50 {row['query_p50_ms']:.3f} ms  p99 {row['query_p99_ms']:.3f} ms")
+
+        if "search" in stages or "chat" in stages:
+            papers.initialize_papers_router(db_path, "bench", data_dir, workspace_manager)
+            chat.initialize_chat_router(db_path, "bench", None, workspace_manager)
+            if chat.agent.llm is None:
+                raise SystemExit("GroqClient failed to initialize; cannot attach the fake LLM")
+            chat.agent.llm.client = SimpleNamespace(
+                chat=SimpleNamespace(completions=FakeCompletions(args.llm_latency_ms, args.llm_completion_tokens))
+            )
+            results.update(asyncio.run(bench_endpoints(app_module.app, stages, queries, args)))
+
+    report = {
+        "config": {
+            "docs": args.docs,
+            "pages": args.pages,
+            "words_per_page": args.words_per_page,
+            "seed": args.seed,
+            "batch_size": batch_size,
+            "queries": args.queries,
+            "k": args.k,
+            "requests": args.requests,
+            "llm_latency_ms": args.llm_latency_ms,
+        },
+        "environment": environment_info(args),
+        "results": results,
+    }
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.json}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline.get("results", {}), args.tolerance)
+        if regressions:
+            print(f"Regressions beyond {args.tolerance:.0%} against {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Measure the recall loss, memory savings and latency of int8 vector
+compression in the exact backend.
+
+Usage:
+    python scripts/benchmark_quantization.py --size 100000 --rescore 1,2,4,8
+
+A synthetic clustered corpus is written once with float32 vectors, then
+reopened in int8 mode. For each re-score factor, recall@k is measured
+against float32 exact search on the same store.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Ensure backend root is on sys.path so `utils` imports resolve when running as a script
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from config import Config
+from benchmark_hnsw import normalize, synthetic_embeddings
+from utils.exact_store import ExactVectorStore
+
+
+def run_queries(store, queries, k):
+    """Return (result rows per query, latencies in ms)."""
+    latencies = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        results = store.query_by_embedding(query.tolist(), top_k=k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append({r["metadata"]["row"] for r in results})
+    return found, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=Config.EMBEDDING_DIMENSION)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rescore", default="1,2,4,8", help="comma-separated re-score factors")
+    parser.add_argument("--batch-size", type=int, default=Config.INGEST_BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    corpus = normalize(synthetic_embeddings(args.size, args.dim, args.seed))
+    rng = np.random.default_rng(args.seed + 1)
+    picks = rng.integers(0, args.size, size=args.queries)
+    queries = normalize(corpus[picks] + 0.1 * rng.standard_normal((args.queries, args.dim)).astype(np.float32))
+    k = min(args.k, args.size)
+
+    with tempfile.TemporaryDirectory(prefix="quant_bench_") as tmp_dir:
+        # The model name is never resolved because embeddings are supplied directly
+        store = ExactVectorStore(tmp_dir, "bench_collection", embedding_model=None, quantization="none")
+        for start in range(0, args.size, args.batch_size):
+            end = min(start + args.batch_size, args.size)
+            store._write_batch(
+                [str(i) for i in range(start, end)],
+                corpus[start:end].tolist(),
+                [""] * (end - start),
+                [{"row": i} for i in range(start, end)]
+            )
+        truth, float_latencies = run_queries(store, queries, k)
+        float_memory = store.memory_footprint()
+        del store
+
+        store = ExactVectorStore(tmp_dir, "bench_collection", embedding_model=None, quantization="int8")
+        int8_memory = store.memory_footprint()
+
+        rows = [{
+            "mode": "float32",
+            "rescore_factor": None,
+            "recall_at_k": 1.0,
+            "p50_ms": round(float(np.percentile(float_latencies, 50)), 3),
+            "p99_ms": round(float(np.percentile(float_latencies, 99)), 3),
+            "scan_bytes": float_memory["scan_bytes"],
+        }]
+        for factor in [int(v) for v in args.rescore.split(",") if v.strip()]:
+            Config.QUANTIZATION_RESCORE_FACTOR = factor
+            found, latencies = run_queries(store, queries, k)
+            hits = sum(len(a & b) for a, b in zip(found, truth))
+            rows.append({
+                "mode": "int8",
+                "rescore_factor": factor,
+                "recall_at_k": round(hits / (len(queries) * k), 4),
+                "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+                "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+                "scan_bytes": int8_memory["scan_bytes"],
+            })
+
+    saving = 1 - int8_memory["scan_bytes"] / max(1, float_memory["scan_bytes"])
+    print(f"Corpus {args.size}x{args.dim}, {args.queries} queries, k={k}")
+    print(f"Scanned bytes: float32 {float_memory['scan_bytes']:,} -> int8 {int8_memory['scan_bytes']:,} "
+          f"({saving:.1%} smaller)")
+    print(f"{'mode':>8} {'rescore':>8} {'recall@k':>9} {'loss':>8} {'p50 ms':>9} {'p99 ms':>9}")
+    for row in rows:
+        loss = 1.0 - row["recall_at_k"]
+        factor = "-" if row["rescore_factor"] is None else row["rescore_factor"]
+        print(f"{row['mode']:>8} {factor:>8} {row['recall_at_k']:>9.4f} {loss:>8.4f} "
+              f"{row['p50_ms']:>9.3f} {row['p99_ms']:>9.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "vectors": args.size,
+                "dim": args.dim,
+                "queries": args.queries,
+                "k": k,
+                "float_memory": float_memory,
+                "int8_memory": int8_memory,
+                "results": rows,
+            }, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Measure the CPU cost of serializing search responses.
+
+Usage:
+    python scripts/benchmark_serialization.py --top-k 5,20,50 --requests 500
+
+Two routes return the same synthetic search payload: one the way
+/papers/search used to (SearchResult models validated against the
+response model, then jsonable_encoder and the stdlib encoder), one
+through utils.fast_json (plain dicts, one orjson call). Requests go
+through FastAPI's in-process test client, so routing and the ASGI
+round trip are included; reported per route is CPU time per request
+(process time) and body size. The encode-only columns time the two
+serialization steps alone (model validation + jsonable_encoder + json
+against fast_json.dumps). Compressed sizes and the CPU cost of
+compressing once are reported for gzip and, when installed, brotli.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Ensure backend root is on sys.path so `utils` imports resolve when running as a script
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from config import Config
+from routers.papers import SearchResponse, SearchResult
+from synthetic_corpus import synthetic_query, synthetic_text
+from utils import fast_json
+
+
+def synthetic_payload(rng: random.Random, top_k: int, words: int) -> dict:
+    """A search response shaped like /papers/search with include=document,metadata."""
+    results = []
+    for rank in range(1, top_k + 1):
+        results.append({
+            "id": f"{rng.getrandbits(64):016x}",
+            "rank": rank,
+            "similarity": round(1 - rank * 0.01 - rng.random() * 0.005, 6),
+            "document": synthetic_text(rng, words),
+            "metadata": {
+                "source": f"paper_{rng.randint(0, 999):03d}.pdf",
+                "doc_id": rng.randint(1, 10_000),
+                "chunk_index": rng.randint(0, 200),
+                "document_type": "pdf",
+                "content_hash": f"{rng.getrandbits(128):032x}",
+            },
+        })
+    return {
+        "status": "success",
+        "query": synthetic_query(rng),
+        "results_count": len(results),
+        "results": results,
+        "timings": None,
+    }
+
+
+def build_app(payload: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/model", response_model=SearchResponse, response_model_exclude_unset=True)
+    def model_route():
+        return {**payload, "results": [SearchResult(**result) for result in payload["results"]]}
+
+    @app.get("/fast", response_model=SearchResponse)
+    def fast_route():
+        return fast_json.json_response(payload)
+
+    return app
+
+
+def cpu_per_request(client: TestClient, path: str, requests: int, headers: dict = None) -> tuple:
+    """Mean CPU microseconds per request and the size of the last body on the wire."""
+    client.get(path, headers=headers)  # warm up
+    start = time.process_time()
+    for _ in range(requests):
+        response = client.get(path, headers=headers)
+    elapsed = time.process_time() - start
+    return elapsed / requests * 1e6, len(response.content)
+
+
+def encode_cpu(payload: dict, requests: int) -> tuple:
+    """Mean CPU microseconds of the old and the fast serialization step alone."""
+    def model_encode():
+        response = SearchResponse(**{**payload, "results": [SearchResult(**r) for r in payload["results"]]})
+        return json.dumps(jsonable_encoder(response, exclude_unset=True)).encode("utf-8")
+
+    timings = []
+    for encode in (model_encode, lambda: fast_json.dumps(payload)):
+        encode()
+        start = time.process_time()
+        for _ in range(requests):
+            encode()
+        timings.append((time.process_time() - start) / requests * 1e6)
+    return tuple(timings)
+
+
+def compression_row(body: bytes, encoding: str, repeats: int = 20) -> dict:
+    start = time.process_time()
+    for _ in range(repeats):
+        compressed = fast_json.compress(body, encoding)
+    return {
+        "encoding": encoding,
+        "bytes": len(compressed),
+        "ratio": round(len(body) / len(compressed), 2),
+        "cpu_us": round((time.process_time() - start) / repeats * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", default="5,20,50", help="comma-separated result counts")
+    parser.add_argument("--words", type=int, default=Config.MAX_CHUNK_SIZE // 6, help="words per result text")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    encoder = "orjson" if fast_json.orjson is not None else "json (orjson not installed)"
+    print(f"fast path encoder: {encoder}")
+    print(f"{'top_k':>6} {'model us':>10} {'fast us':>10} {'saved us':>10} {'speedup':>8} "
+          f"{'enc model':>10} {'enc fast':>10} {'bytes':>9}")
+
+    rows = []
+    for top_k in [int(v) for v in args.top_k.split(",") if v.strip()]:
+        payload = synthetic_payload(random.Random(args.seed), top_k, args.words)
+        with TestClient(build_app(payload)) as client:
+            model_us, model_bytes = cpu_per_request(client, "/model", args.requests)
+            fast_us, fast_bytes = cpu_per_request(client, "/fast", args.requests)
+        encode_model_us, encode_fast_us = encode_cpu(payload, args.requests)
+
+        body = fast_json.dumps(payload)
+        encodings = ["gzip"] + (["br"] if fast_json.brotli is not None else [])
+        row = {
+            "top_k": top_k,
+            "model_cpu_us": round(model_us, 1),
+            "fast_cpu_us": round(fast_us, 1),
+            "saved_cpu_us": round(model_us - fast_us, 1),
+            "speedup": round(model_us / fast_us, 2),
+            "encode_model_cpu_us": round(encode_model_us, 1),
+            "encode_fast_cpu_us": round(encode_fast_us, 1),
+            "model_bytes": model_bytes,
+            "fast_bytes": fast_bytes,
+            "compression": [compression_row(body, encoding) for encoding in encodings],
+        }
+        rows.append(row)
+        print(f"{top_k:>6} {row['model_cpu_us']:>10.1f} {row['fast_cpu_us']:>10.1f} {row['saved_cpu_us']:>10.1f} "
+              f"{row['speedup']:>7.2f}x {row['encode_model_cpu_us']:>10.1f} {row['encode_fast_cpu_us']:>10.1f} "
+              f"{fast_bytes:>9}")
+        for entry in row["compression"]:
+            print(f"{'':>6} {entry['encoding']:>10}: {entry['bytes']} bytes ({entry['ratio']}x) "
+                  f"in {entry['cpu_us']} us")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"encoder": encoder, "requests": args.requests, "words": args.words, "results": rows}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
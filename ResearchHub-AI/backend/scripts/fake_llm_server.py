@@ -0,0 +1,206 @@
+"""
+Local stand-in for the Groq (OpenAI-compatible) chat-completions API.
+
+Usage:
+    python scripts/fake_llm_server.py --port 8900 --latency-ms 400 --tokens-per-s 250
+    python scripts/fake_llm_server.py --error-rate 0.05 --error-codes 429,500,503 --timeout-rate 0.01
+
+Then start the backend against it:
+    GROQ_BASE_URL=http://localhost:8900 GROQ_API_KEY=gsk_fake python main.py
+
+Each completion waits for the time to first token (--latency-ms plus up
+to --jitter-ms) and then produces --completion-tokens tokens at
+--tokens-per-s, so a non-streaming call takes latency + tokens / rate.
+Streaming requests (stream=true) receive the tokens as server-sent
+events at that rate. Faults are injected per request: --error-rate
+answers with one of --error-codes (429s carry a retry-after header) and
+--timeout-rate holds the request for --timeout-seconds without answering.
+
+Served paths: POST /openai/v1/chat/completions (Groq SDK),
+POST /v1/chat/completions (OpenAI clients), GET /openai/v1/models and
+GET /stats (request and fault counters).
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ANSWER_WORDS = (
+    "The retrieved studies suggest consistent improvements over the baseline, although "
+    "methodology and evaluation datasets differ and several results lack ablations."
+).split()
+
+
+@dataclass
+class FakeLLMSettings:
+    """Behaviour of the fake server (set from the command line)."""
+
+    latency_ms: float = 400.0
+    jitter_ms: float = 100.0
+    tokens_per_s: float = 250.0
+    completion_tokens: int = 300
+    error_rate: float = 0.0
+    error_codes: List[int] = field(default_factory=lambda: [500])
+    timeout_rate: float = 0.0
+    timeout_seconds: float = 120.0
+    seed: int = 0
+
+
+settings = FakeLLMSettings()
+stats: Dict[str, Any] = {"requests": 0, "in_flight": 0, "completed": 0, "timeouts": 0, "errors": {}}
+rng = random.Random(settings.seed)
+app = FastAPI(title="Fake LLM server")
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough prompt token count (4 characters per token)."""
+    return max(1, sum(len(str(m.get("content", ""))) for m in messages) // 4)
+
+
+def completion_text(tokens: int) -> List[str]:
+    """Deterministic answer split into `tokens` pieces (one word per token)."""
+    return [ANSWER_WORDS[i % len(ANSWER_WORDS)] + " " for i in range(tokens)]
+
+
+def error_response(status: int) -> JSONResponse:
+    """An error body in the OpenAI/Groq format."""
+    kinds = {429: "rate_limit_exceeded", 500: "internal_server_error", 503: "service_unavailable"}
+    headers = {"retry-after": "1"} if status == 429 else None
+    body = {"error": {"message": f"Injected fault ({status})", "type": kinds.get(status, "api_error")}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+
+def token_delay() -> float:
+    return 1.0 / settings.tokens_per_s if settings.tokens_per_s > 0 else 0.0
+
+
+async def stream_tokens(completion_id: str, model: str, pieces: List[str]) -> AsyncIterator[str]:
+    """Server-sent events in the chat.completion.chunk format."""
+    created = int(time.time())
+    delay = token_delay()
+    try:
+        for index, piece in enumerate(pieces):
+            delta = {"role": "assistant", "content": piece} if index == 0 else {"content": piece}
+            chunk = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            if delay:
+                await asyncio.sleep(delay)
+        final = {
+            "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+        stats["completed"] += 1
+    finally:
+        stats["in_flight"] -= 1
+
+
+@app.post("/openai/v1/chat/completions")
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    stats["in_flight"] += 1
+    handed_to_stream = False
+    try:
+        roll = rng.random()
+        if roll < settings.timeout_rate:
+            stats["timeouts"] += 1
+            await asyncio.sleep(settings.timeout_seconds)
+            return error_response(504)
+        if roll < settings.timeout_rate + settings.error_rate:
+            status = rng.choice(settings.error_codes)
+            stats["errors"][str(status)] = stats["errors"].get(str(status), 0) + 1
+            return error_response(status)
+
+        model = body.get("model", "fake-model")
+        requested = body.get("max_tokens") or body.get("max_completion_tokens")
+        tokens = min(int(requested), settings.completion_tokens) if requested else settings.completion_tokens
+        pieces = completion_text(tokens)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+
+        await asyncio.sleep((settings.latency_ms + rng.uniform(0, settings.jitter_ms)) / 1000)
+        if body.get("stream"):
+            # The stream generator releases the in-flight slot when it finishes
+            handed_to_stream = True
+            return StreamingResponse(stream_tokens(completion_id, model, pieces), media_type="text/event-stream")
+        await asyncio.sleep(tokens * token_delay())
+
+        prompt_tokens = estimate_tokens(body.get("messages", []))
+        stats["completed"] += 1
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(pieces).strip()},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": tokens,
+                "total_tokens": prompt_tokens + tokens,
+            },
+        }
+    finally:
+        if not handed_to_stream:
+            stats["in_flight"] -= 1
+
+
+@app.get("/openai/v1/models")
+@app.get("/v1/models")
+async def list_models() -> Dict[str, Any]:
+    return {"object": "list", "data": [{"id": "fake-model", "object": "model", "owned_by": "fake"}]}
+
+
+@app.get("/stats")
+async def get_stats() -> Dict[str, Any]:
+    return {**stats, "settings": settings.__dict__}
+
+
+def main():
+    global rng
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=settings.latency_ms, help="time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=settings.jitter_ms, help="extra random first-token delay")
+    parser.add_argument("--tokens-per-s", type=float, default=settings.tokens_per_s, help="0 = instant")
+    parser.add_argument("--completion-tokens", type=int, default=settings.completion_tokens)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with an error")
+    parser.add_argument("--error-codes", default="500", help="comma-separated statuses to inject")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="fraction of requests left hanging")
+    parser.add_argument("--timeout-seconds", type=float, default=settings.timeout_seconds)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    settings.latency_ms = args.latency_ms
+    settings.jitter_ms = args.jitter_ms
+    settings.tokens_per_s = args.tokens_per_s
+    settings.completion_tokens = args.completion_tokens
+    settings.error_rate = args.error_rate
+    settings.error_codes = [int(code) for code in args.error_codes.split(",") if code.strip()]
+    settings.timeout_rate = args.timeout_rate
+    settings.timeout_seconds = args.timeout_seconds
+    settings.seed = args.seed
+    rng = random.Random(args.seed)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Ramp concurrent users against a running backend and report throughput,
+latency percentiles and error rates per step.
+
+Usage:
+    python scripts/load_test.py --url http://localhost:8000 --users 1,4,16,64 --step-seconds 30
+    python scripts/load_test.py --mix search=0.7,chat=0.3 --think-ms 500 --json load.json
+
+Each simulated user loops for the length of a step: it picks an endpoint
+by the --mix weights, sends a query drawn from the synthetic research
+vocabulary, waits for the answer and then sleeps --think-ms. A step ends
+once its duration is over and in-flight requests have finished; the
+ramp stops early when a step's error rate exceeds --max-error-rate.
+
+For capacity tests without calling Groq, run the backend against the
+local fake server (see scripts/fake_llm_server.py):
+    python scripts/fake_llm_server.py --latency-ms 600 --tokens-per-s 250 &
+    GROQ_BASE_URL=http://localhost:8900 GROQ_API_KEY=gsk_fake python serve.py --workers 4
+    python scripts/load_test.py --users 1,8,32,128
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+# Ensure backend root is on sys.path so `utils` imports resolve when running as a script
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from benchmark_pipeline import latency_summary
+from synthetic_corpus import synthetic_query
+
+ENDPOINTS = ("search", "chat")
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse "search=0.8,chat=0.2" into normalized weights."""
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' in --mix, expected one of {ENDPOINTS}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("--mix weights must add up to more than 0")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+async def send(client: httpx.AsyncClient, endpoint: str, query: str, args) -> int:
+    """Issue one request; returns the HTTP status (0 for transport errors)."""
+    try:
+        if endpoint == "search":
+            response = await client.get(
+                "/api/v1/papers/search", params={"query": query, "top_k": args.top_k, "workspace": args.workspace}
+            )
+        else:
+            response = await client.post(
+                "/api/v1/chat/chat", json={"query": query, "top_k": args.top_k, "workspace": args.workspace}
+            )
+        return response.status_code
+    except httpx.HTTPError:
+        return 0
+
+
+async def run_step(client: httpx.AsyncClient, users: int, mix: Dict[str, float], args, seed: int) -> Dict[str, Any]:
+    """Run `users` concurrent users for one ramp step."""
+    samples: List[Tuple[str, float, int]] = []
+    names, weights = list(mix.keys()), list(mix.values())
+    deadline = time.perf_counter() + args.step_seconds
+
+    async def user(user_id: int) -> None:
+        rng = random.Random(seed * 100003 + user_id)
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            status = await send(client, endpoint, synthetic_query(rng), args)
+            samples.append((endpoint, (time.perf_counter() - start) * 1000, status))
+            if args.think_ms:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * args.think_ms / 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(users)))
+    elapsed = time.perf_counter() - start
+
+    step: Dict[str, Any] = {"users": users, "seconds": round(elapsed, 2)}
+    total_errors = 0
+    for endpoint in names:
+        rows = [(latency, status) for name, latency, status in samples if name == endpoint]
+        errors: Dict[str, int] = {}
+        for _, status in rows:
+            if status == 0 or status >= 400:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+        error_count = sum(errors.values())
+        total_errors += error_count
+        step[endpoint] = {
+            "requests": len(rows),
+            "requests_per_s": round(len(rows) / elapsed, 2),
+            "error_rate": round(error_count / len(rows), 4) if rows else 0.0,
+            "errors_by_status": errors,
+            **latency_summary([latency for latency, status in rows if 0 < status < 400]),
+        }
+    step["requests_per_s"] = round(len(samples) / elapsed, 2)
+    step["error_rate"] = round(total_errors / len(samples), 4) if samples else 0.0
+    return step
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    mix = parse_mix(args.mix)
+    max_users = max(args.users)
+    limits = httpx.Limits(max_connections=max_users, max_keepalive_connections=max_users)
+    steps = []
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        try:
+            (await client.get("/health")).raise_for_status()
+        except httpx.HTTPError as e:
+            raise SystemExit(f"Backend at {args.url} is not healthy: {e}")
+
+        print(f"{'users':>6} {'endpoint':>8} {'req/s':>9} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'errors':>8}")
+        for index, users in enumerate(args.users):
+            step = await run_step(client, users, mix, args, seed=args.seed + index)
+            steps.append(step)
+            for endpoint in mix:
+                row = step[endpoint]
+                print(f"{users:>6} {endpoint:>8} {row['requests_per_s']:>9.2f} {row.get('p50_ms', 0):>10.1f} "
+                      f"{row.get('p95_ms', 0):>10.1f} {row.get('p99_ms', 0):>10.1f} {row['error_rate']:>8.2%}")
+            if step["error_rate"] > args.max_error_rate:
+                print(f"Stopping ramp: error rate {step['error_rate']:.1%} exceeds {args.max_error_rate:.1%}")
+                break
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="backend base URL")
+    parser.add_argument("--users", default="1,2,4,8,16,32", help="comma-separated concurrent users per step")
+    parser.add_argument("--step-seconds", type=float, default=30.0)
+    parser.add_argument("--mix", default="search=0.8,chat=0.2", help="endpoint weights")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a user's requests")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--workspace", default="default")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--max-error-rate", type=float, default=0.5, help="stop ramping above this error rate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="write results to this file")
+    args = parser.parse_args()
+    args.users = [int(v) for v in args.users.split(",") if v.strip()]
+
+    steps = asyncio.run(run(args))
+    if steps:
+        best = max(steps, key=lambda step: step["requests_per_s"])
+        print(f"Peak throughput: {best['requests_per_s']:.2f} req/s at {best['users']} users")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "url": args.url,
+                "mix": parse_mix(args.mix),
+                "step_seconds": args.step_seconds,
+                "think_ms": args.think_ms,
+                "steps": steps,
+            }, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Re-index a workspace's collection with new HNSW parameters.
+Stored embeddings are copied as-is, so no text is re-embedded.
+
+Usage:
+    python scripts/rebuild_index.py --workspace default --m 32 --construction-ef 200 --search-ef 64
+
+Parameters that are not given fall back to HNSW_M / HNSW_CONSTRUCTION_EF /
+HNSW_SEARCH_EF from the environment. The rebuilt index is published as a
+new snapshot, so the collection never goes missing, but stop the API
+server first: ChromaDB's local storage cannot be shared between processes.
+"""
+import argparse
+import os
+import sys
+
+# Ensure backend root is on sys.path so `utils` imports resolve when running as a script
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except Exception:
+    pass
+
+from config import Config
+from utils.vector_store import VectorStore, hnsw_metadata
+from utils.workspaces import workspace_collection_name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspace", default=Config.DEFAULT_WORKSPACE)
+    parser.add_argument("--m", type=int, default=None, help="hnsw:M")
+    parser.add_argument("--construction-ef", type=int, default=None, help="hnsw:construction_ef")
+    parser.add_argument("--search-ef", type=int, default=None, help="hnsw:search_ef")
+    parser.add_argument("--batch-size", type=int, default=1000, help="records copied per page")
+    args = parser.parse_args()
+
+    # Use the exact same absolute path as main.py
+    db_path = os.path.abspath(os.path.join(BACKEND_DIR, "vector_db"))
+    base_name = os.getenv("CHROMA_COLLECTION_NAME", "research_papers")
+    collection_name = workspace_collection_name(base_name, args.workspace)
+    index_metadata = hnsw_metadata(args.m, args.construction_ef, args.search_ef)
+
+    print(f"Using db_path={db_path}, collection={collection_name}")
+    print(f"New index parameters: {index_metadata}")
+
+    # Stored embeddings are copied, so no embedding model is loaded
+    store = VectorStore(
+        db_path=db_path,
+        collection_name=collection_name,
+        embedding_model=None,
+        batch_size=args.batch_size
+    )
+    result = store.rebuild_index(args.m, args.construction_ef, args.search_ef)
+    if result["status"] != "success":
+        raise SystemExit(f"Rebuild failed: {result['message']}")
+    print(f"Rebuilt '{collection_name}': {result['count']} records, metadata={store.collection.metadata}")
+
+
+if __name__ == "__main__":
+    main()
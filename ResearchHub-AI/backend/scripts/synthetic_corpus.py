@@ -0,0 +1,149 @@
+"""
+Generate synthetic research PDFs for benchmarks.
+
+Usage:
+    python scripts/synthetic_corpus.py --out /tmp/corpus --docs 50 --pages 12
+    python scripts/synthetic_corpus.py --out /tmp/corpus --docs 5 --pages 200 --words-per-page 600
+
+Text is drawn from a fixed research vocabulary with a seeded RNG, so the
+same arguments always produce byte-identical files. PDFs are written
+directly (one Helvetica text stream per page) without any PDF library.
+"""
+import argparse
+import os
+import random
+from typing import List
+
+VOCABULARY = (
+    "model training dataset evaluation baseline transformer attention embedding retrieval "
+    "corpus benchmark accuracy precision recall latency throughput gradient optimizer loss "
+    "regularization dropout convolution recurrent network layer encoder decoder token "
+    "vocabulary language vision graph reinforcement policy reward agent environment "
+    "simulation protein sequence genome cell clinical trial patient cohort treatment "
+    "outcome statistical significance hypothesis variance distribution sampling bayesian "
+    "inference posterior prior likelihood estimator bias fairness robustness adversarial "
+    "perturbation generalization transfer pretraining finetuning prompt instruction "
+    "alignment reasoning knowledge citation survey methodology experiment ablation "
+    "analysis result discussion limitation future work quantum material battery catalyst "
+    "climate emission energy solar carbon sensor signal frequency spectrum circuit "
+    "semiconductor compiler memory cache parallel distributed scheduler kernel index "
+    "query ranking relevance similarity cluster partition hashing compression"
+).split()
+
+# Lines per page before the text runs off a 842pt page at 12pt leading
+LINES_PER_PAGE = 64
+LINE_WIDTH = 90
+
+
+def synthetic_text(rng: random.Random, words: int) -> str:
+    """Sentences of 8-20 vocabulary words, wrapped to LINE_WIDTH characters."""
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 20))
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+        remaining -= length
+
+    lines, current = [], ""
+    for word in " ".join(sentences).split(" "):
+        if current and len(current) + 1 + len(word) > LINE_WIDTH:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return "\n".join(lines)
+
+
+def synthetic_query(rng: random.Random, words: int = 6) -> str:
+    """A short query over the same vocabulary as the documents."""
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: List[str]) -> bytes:
+    """
+    Build a minimal PDF with one text page per string.
+
+    Args:
+        pages: Page texts; newlines start a new line on the page
+
+    Returns:
+        PDF file bytes
+    """
+    page_count = len(pages)
+    # Objects: 1 catalog, 2 page tree, 3 font, then a (page, content) pair per page
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(page_count))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, text in enumerate(pages):
+        shown = " ".join(f"({_escape(line)}) '" for line in text.split("\n")[:LINES_PER_PAGE])
+        stream = f"BT /F1 10 Tf 40 810 Td 12 TL {shown} ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def write_corpus(out_dir: str, docs: int, pages: int, words_per_page: int, seed: int = 0) -> List[str]:
+    """
+    Write `docs` synthetic PDFs into a directory.
+
+    Args:
+        out_dir: Target directory (created if missing)
+        docs: Number of PDFs
+        pages: Pages per PDF
+        words_per_page: Words per page (at most ~LINES_PER_PAGE lines are kept)
+        seed: RNG seed
+
+    Returns:
+        Paths of the written PDFs
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for doc in range(docs):
+        texts = [synthetic_text(rng, words_per_page) for _ in range(pages)]
+        path = os.path.join(out_dir, f"synthetic_{seed}_{doc:05d}.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(texts))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="directory to write PDFs into")
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--words-per-page", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = write_corpus(args.out, args.docs, args.pages, args.words_per_page, args.seed)
+    total_bytes = sum(os.path.getsize(p) for p in paths)
+    print(f"Wrote {len(paths)} PDFs ({total_bytes / 1e6:.1f} MB) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+ResearchPilot AI Agent - Production Server
+Multi-process serving with one writer and N read-only API workers.
+
+`main.py` runs a single process. This entry point instead starts:
+- a writer process that owns all index writes (uploads, ingestion,
+  deletes, clears) and publishes a new index generation after each job
+- N uvicorn workers that serve searches and chat from read-only,
+  memory-mapped index files and hand write requests to the writer
+
+Embedding model weights are exported once to SHARED_MODEL_DIR and mapped
+by every process, so an extra worker adds little more than the Python
+interpreter and its per-request state to the host's memory use.
+
+Requires VECTOR_BACKEND=exact: ChromaDB's local persistent mode cannot be
+shared between processes.
+
+Usage:
+    python serve.py --workers 4
+    python serve.py --workers 8 --host 0.0.0.0 --port 8000
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BACKEND_DIR)
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger("serve")
+
+
+def run_writer(
+    db_path: str,
+    collection_name: str,
+    data_dir: str,
+    queue_dir: str,
+    profile_dir: str,
+    ready
+) -> None:
+    """
+    Writer process: apply queued write jobs one at a time.
+
+    Args:
+        db_path: Vector database root
+        collection_name: Base collection name
+        data_dir: Data directory with PDFs and blobs
+        queue_dir: Write queue spool directory
+        profile_dir: Profile dumps and toggles (write jobs can be profiled)
+        ready: Event set once the model is exported and stores are open
+    """
+    from routers import papers
+    from utils.profiling import configure_profiling
+    from utils.workspaces import WorkspaceManager
+    from utils.write_queue import WriteQueue, publish_generation
+
+    workspace_manager = WorkspaceManager(db_path=db_path, collection_name=collection_name)
+    papers.initialize_papers_router(db_path, collection_name, data_dir, workspace_manager)
+    configure_profiling(profile_dir)
+    queue = WriteQueue(queue_dir)
+    queue.recover()
+    publish_generation(db_path)
+    ready.set()
+    logger.info("Writer process ready")
+
+    while True:
+        claimed = queue.claim(timeout=1.0)
+        if claimed is None:
+            continue
+        job, content = claimed
+        logger.info(f"Running write job {job['id']} ({job['op']})")
+        result = papers.run_write_job(job["op"], job["args"], content)
+        # Publish before completing so the submitting worker's refresh sees the new data
+        publish_generation(db_path)
+        queue.complete(job["id"], result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ResearchPilot with one writer and N read-only workers")
+    parser.add_argument("--workers", type=int, default=None, help="API worker processes (default: SERVE_WORKERS)")
+    parser.add_argument("--host", default=None, help="Bind host (default: HOST)")
+    parser.add_argument("--port", type=int, default=None, help="Bind port (default: PORT)")
+    args = parser.parse_args()
+
+    # Settings are read from the environment at import time, and uvicorn
+    # workers inherit it, so set serve-mode defaults before importing them
+    from dotenv import load_dotenv
+    load_dotenv()
+    os.environ["SERVE_MODE"] = "multi"
+    os.environ.setdefault("SHARED_MODEL_DIR", os.path.join(BACKEND_DIR, "vector_db", "shared_model"))
+
+    # Per-process metric files, aggregated by /metrics in whichever worker is scraped
+    metrics_dir = os.environ.setdefault(
+        "PROMETHEUS_MULTIPROC_DIR", os.path.join(BACKEND_DIR, "vector_db", "prometheus")
+    )
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+    import uvicorn
+    from config import Config
+    from main import DB_PATH, DATA_DIR, PROFILE_DIR, WRITE_QUEUE_DIR
+
+    if Config.VECTOR_BACKEND != "exact":
+        logger.error("Multi-process serving requires VECTOR_BACKEND=exact; use main.py for the chroma backend")
+        sys.exit(1)
+
+    workers = max(1, args.workers or Config.SERVE_WORKERS)
+    host = args.host or Config.HOST
+    port = args.port or Config.PORT
+    collection_name = Config.CHROMA_COLLECTION_NAME
+
+    context = multiprocessing.get_context("spawn")
+    ready = context.Event()
+    writer = context.Process(
+        target=run_writer,
+        args=(DB_PATH, collection_name, DATA_DIR, WRITE_QUEUE_DIR, PROFILE_DIR, ready),
+        name="index-writer",
+        daemon=True
+    )
+    writer.start()
+
+    # Workers start after the writer has exported the shared model weights
+    while not ready.wait(timeout=1.0):
+        if not writer.is_alive():
+            logger.error("Writer process exited during startup")
+            sys.exit(1)
+
+    logger.info(f"Starting {workers} read-only workers on {host}:{port}")
+    try:
+        uvicorn.run(
+            "main:app",
+            host=host,
+            port=port,
+            workers=workers,
+            log_level=Config.LOG_LEVEL.lower()
+        )
+    finally:
+        writer.terminate()
+        writer.join(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
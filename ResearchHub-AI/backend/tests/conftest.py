@@ -0,0 +1,63 @@
+"""
+Shared test fixtures.
+
+Stores are built in temporary directories with a deterministic
+bag-of-words encoder passed as their embedding model, so tests never
+download a sentence-transformer.
+"""
+
+import hashlib
+import os
+import sys
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# synthetic_corpus (PDF and text generators) lives with the scripts
+sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+
+
+class HashingEncoder:
+    """Embeds a text as its L2-normalized bag of hashed words."""
+
+    dimension = 64
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts, **kwargs) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                digest = hashlib.md5(word.encode("utf-8")).digest()
+                vectors[row, int.from_bytes(digest[:4], "little") % self.dimension] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+@pytest.fixture
+def encoder() -> HashingEncoder:
+    return HashingEncoder()
+
+
+@pytest.fixture
+def papers_client(tmp_path, monkeypatch, encoder):
+    """Papers router on the exact backend, with its module state set up in `tmp_path`."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    import utils.shared_model
+    from routers import papers
+    from utils.workspaces import WorkspaceManager
+
+    monkeypatch.setattr(utils.shared_model, "load_embedding_model", lambda *args, **kwargs: encoder)
+    db_path = str(tmp_path / "vector_db")
+    manager = WorkspaceManager(db_path=db_path, backend="exact")
+    papers.initialize_papers_router(db_path, "research_papers", str(tmp_path / "data"), manager)
+
+    app = FastAPI()
+    app.include_router(papers.router)
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,46 @@
+"""Directory ingest adds new PDFs and replaces changed ones."""
+
+from routers import papers
+from synthetic_corpus import make_pdf
+
+INGEST = "/api/v1/papers/ingest"
+
+FIRST = make_pdf(["retrieval of transformer embeddings " * 40, "graph attention networks " * 60])
+SECOND = make_pdf(["convolution kernels and dropout regularization " * 30, "graph attention pooling " * 50])
+
+
+def ingest(client):
+    response = client.post(INGEST)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_changed_pdf_replaces_its_previous_version(papers_client, tmp_path):
+    pdf = tmp_path / "data" / "x.pdf"
+    pdf.write_bytes(FIRST)
+    ingest(papers_client)
+
+    pdf.write_bytes(SECOND)
+    result = ingest(papers_client)
+    store = papers.get_workspace_store("default")
+
+    assert "replacing 1 changed document(s)" in result["message"]
+    assert store._count_stored() == result["documents_ingested"]
+    hits = store.query_similar_documents("graph attention", top_k=10)
+    assert hits and len({hit["metadata"]["content_hash"] for hit in hits}) == 1
+    assert [document["source"] for document in store.list_documents()] == ["x.pdf"]
+
+
+def test_unchanged_pdfs_are_skipped_and_new_ones_added(papers_client, tmp_path):
+    (tmp_path / "data" / "x.pdf").write_bytes(FIRST)
+    first = ingest(papers_client)
+
+    assert ingest(papers_client)["documents_ingested"] == 0
+
+    (tmp_path / "data" / "y.pdf").write_bytes(SECOND)
+    second = ingest(papers_client)
+    store = papers.get_workspace_store("default")
+
+    assert "replacing" not in second["message"]
+    assert store._count_stored() == first["documents_ingested"] + second["documents_ingested"]
+    assert [document["source"] for document in store.list_documents()] == ["x.pdf", "y.pdf"]
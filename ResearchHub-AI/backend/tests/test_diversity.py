@@ -0,0 +1,54 @@
+"""Maximal-marginal-relevance selection and the per-source cap."""
+
+import numpy as np
+import pytest
+
+from utils.diversity import mmr_select, validate_diversity
+from utils.exact_store import ExactVectorStore
+
+# Two near-identical candidates and one distinct, slightly less relevant one
+EMBEDDINGS = [[1.0, 0.0, 0.0], [0.99, 0.14, 0.0], [0.6, 0.0, 0.8]]
+RELEVANCE = [0.95, 0.94, 0.80]
+
+
+def test_lambda_one_ranks_by_relevance():
+    assert mmr_select(EMBEDDINGS, RELEVANCE, k=3, mmr_lambda=1.0) == [0, 1, 2]
+
+
+def test_mmr_prefers_a_novel_candidate_over_a_near_duplicate():
+    assert mmr_select(EMBEDDINGS, RELEVANCE, k=2, mmr_lambda=0.5) == [0, 2]
+
+
+def test_per_source_cap_limits_results_from_one_source():
+    sources = ["a.pdf", "a.pdf", "b.pdf"]
+
+    assert mmr_select(EMBEDDINGS, RELEVANCE, k=3, mmr_lambda=1.0, sources=sources, max_per_source=1) == [0, 2]
+
+
+def test_empty_and_zero_k_select_nothing():
+    assert mmr_select([], [], k=3) == []
+    assert mmr_select(EMBEDDINGS, RELEVANCE, k=0) == []
+
+
+@pytest.mark.parametrize("settings", [{"mmr_lambda": -0.1}, {"mmr_lambda": 1.5}, {"max_per_source": -1}])
+def test_invalid_settings_are_rejected(settings):
+    with pytest.raises(ValueError):
+        validate_diversity(**settings)
+
+
+def test_store_search_applies_the_cap(tmp_path, encoder):
+    store = ExactVectorStore(str(tmp_path), "papers", encoder, quantization="none")
+    store.ingest_documents(
+        [(f"graph attention networks part {i}", {"source": "a.pdf", "content_hash": "a", "chunk_index": i}) for i in range(6)]
+        + [("graph attention survey", {"source": "b.pdf", "content_hash": "b", "chunk_index": 0})]
+    )
+    query = encoder.encode(["graph attention networks"])[0].tolist()
+
+    plain = store.query_by_embedding(query, top_k=3, diversify=False, max_per_source=0)
+    capped = store.query_by_embedding(query, top_k=3, diversify=False, max_per_source=2)
+    diverse = store.query_by_embedding(query, top_k=3, diversify=True, mmr_lambda=0.3, max_per_source=0)
+
+    assert [hit["metadata"]["source"] for hit in plain] == ["a.pdf"] * 3
+    assert sorted(hit["metadata"]["source"] for hit in capped) == ["a.pdf", "a.pdf", "b.pdf"]
+    assert "b.pdf" in {hit["metadata"]["source"] for hit in diverse}
+    assert np.all(np.diff([hit["similarity"] for hit in plain]) <= 0)
@@ -0,0 +1,126 @@
+"""Document catalog: per-document fields stored once and joined back onto results."""
+
+import pytest
+
+from config import Config
+from utils.document_catalog import DocumentCatalog, split_metadata
+from utils.exact_store import ExactVectorStore
+
+METADATA = {
+    "source": "a.pdf", "content_hash": "h1", "file_path": "/blobs/h1.pdf",
+    "document_type": "pdf", "chunk_index": 3, "doc_id": 99,
+}
+
+
+@pytest.fixture
+def store(tmp_path, encoder):
+    return ExactVectorStore(str(tmp_path), "papers", encoder, quantization="none")
+
+
+def chunks(source, content_hash, count=3):
+    return [
+        (f"chunk {i} on graph attention from {source}", {"source": source, "content_hash": content_hash, "chunk_index": i})
+        for i in range(count)
+    ]
+
+
+def test_split_metadata_separates_document_and_chunk_fields():
+    document, chunk = split_metadata(METADATA)
+
+    assert document == {"source": "a.pdf", "content_hash": "h1", "file_path": "/blobs/h1.pdf", "document_type": "pdf"}
+    assert chunk == {"chunk_index": 3}
+    assert split_metadata({"chunk_index": 1}) == ({}, {"chunk_index": 1})
+
+
+def test_register_is_idempotent_per_version(tmp_path):
+    catalog = DocumentCatalog(str(tmp_path))
+    fields = {"source": "a.pdf", "content_hash": "h1"}
+
+    created = set()
+    doc_id = catalog.register("papers", fields, created)
+    assert catalog.register("papers", fields, created) == doc_id
+    assert created == {doc_id}
+
+    newer = catalog.register("papers", {"source": "a.pdf", "content_hash": "h2"})
+    assert newer != doc_id
+    assert catalog.doc_ids("papers", source="a.pdf") == [doc_id, newer]
+    assert [document["content_hash"] for document in catalog.list_documents("papers")] == ["h2"]
+    assert catalog.lookup([doc_id, newer, 12345]) == {
+        doc_id: fields, newer: {"source": "a.pdf", "content_hash": "h2"}
+    }
+
+
+def test_chunks_store_only_the_doc_id_and_results_are_joined(store):
+    store.ingest_documents(chunks("a.pdf", "h1"))
+
+    stored = [metadata for metadata in store._metadatas if metadata is not None]
+    assert stored and all("source" not in metadata and "doc_id" in metadata for metadata in stored)
+
+    hit = store.query_similar_documents("graph attention", top_k=1)[0]
+    assert hit["metadata"]["source"] == "a.pdf"
+    assert hit["metadata"]["content_hash"] == "h1"
+    assert "chunk_index" in hit["metadata"]
+
+
+def test_rename_moves_the_document_and_its_joined_results(store):
+    store.ingest_documents(chunks("a.pdf", "h1"))
+    store.query_similar_documents("graph attention", top_k=1)
+
+    assert store.rename_document("a.pdf", "b.pdf") == 1
+
+    assert [document["source"] for document in store.list_documents()] == ["b.pdf"]
+    assert store.query_similar_documents("graph attention", top_k=1)[0]["metadata"]["source"] == "b.pdf"
+    assert store.delete_document("b.pdf") == 3
+
+
+def test_failed_ingest_takes_back_its_catalog_rows(store, monkeypatch):
+    monkeypatch.setattr(Config, "INGEST_WRITE_RETRIES", 0)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(store, "_upsert", fail)
+    result = store.ingest_documents(chunks("a.pdf", "h1"))
+
+    assert result["status"] != "success"
+    assert store.catalog.count("papers") == 0
+    assert store.list_documents() == []
+
+
+def test_chunks_written_before_the_catalog_still_join(store, encoder):
+    legacy = {"source": "old.pdf", "content_hash": "h0", "chunk_index": 0}
+    store._upsert(["legacy-0"], encoder.encode(["legacy graph text"]).tolist(), ["legacy graph text"], [legacy])
+    store._adjust_count(1)
+
+    assert [document["source"] for document in store.list_documents()] == ["old.pdf"]
+    assert store.get_document_ids("h0") == ["legacy-0"]
+    assert store.query_similar_documents("legacy graph", top_k=1)[0]["metadata"]["source"] == "old.pdf"
+
+
+def test_renaming_onto_an_existing_version_merges_the_rows(tmp_path):
+    catalog = DocumentCatalog(str(tmp_path))
+    old = catalog.register("papers", {"source": "a.pdf", "content_hash": "h1"})
+    existing = catalog.register("papers", {"source": "b.pdf", "content_hash": "h1"})
+
+    assert catalog.rename_source("papers", "a.pdf", "b.pdf") == 1
+
+    assert [document["source"] for document in catalog.list_documents("papers")] == ["b.pdf"]
+    assert catalog.doc_ids("papers", source="a.pdf") == []
+    assert catalog.doc_ids("papers", source="b.pdf") == [old, existing]
+    assert catalog.lookup([old])[old]["source"] == "b.pdf"
+
+    catalog.remove("papers", "b.pdf")
+    assert catalog.lookup([old, existing]) == {}
+    assert catalog.count("papers") == 0
+
+
+def test_rename_onto_an_existing_source_keeps_chunks_joined_and_deletable(store):
+    store.ingest_documents(chunks("a.pdf", "h1"))
+    store.catalog.register("papers", {"source": "b.pdf", "content_hash": "h1"})
+
+    assert store.rename_document("a.pdf", "b.pdf") == 1
+
+    assert [document["source"] for document in store.list_documents()] == ["b.pdf"]
+    assert store.query_similar_documents("graph attention", top_k=1)[0]["metadata"]["source"] == "b.pdf"
+    assert store.delete_document("b.pdf") == 3
+    assert store.catalog.count("papers") == 0
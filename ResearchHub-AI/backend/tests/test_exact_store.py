@@ -0,0 +1,95 @@
+"""int8 quantization of the exact store: codes, candidate scan and exact re-scoring."""
+
+import random
+
+import numpy as np
+import pytest
+
+from config import Config
+from synthetic_corpus import synthetic_query, synthetic_text
+from utils.exact_store import ExactVectorStore, quantize_int8
+
+
+@pytest.fixture
+def corpus():
+    rng = random.Random(7)
+    return [
+        (synthetic_text(rng, 40), {"source": f"paper_{i % 10}.pdf", "content_hash": f"h{i % 10}", "chunk_index": i})
+        for i in range(200)
+    ]
+
+
+@pytest.fixture
+def queries():
+    rng = random.Random(11)
+    return [synthetic_query(rng) for _ in range(10)]
+
+
+def open_store(tmp_path, encoder, quantization, **kwargs):
+    return ExactVectorStore(str(tmp_path), "papers", encoder, quantization=quantization, **kwargs)
+
+
+def test_quantize_int8_error_is_within_half_a_step():
+    vectors = np.random.default_rng(0).standard_normal((50, 16)).astype(np.float32)
+
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8 and scales.dtype == np.float32
+    assert np.all(np.abs(codes.astype(np.float32) * scales[:, None] - vectors) <= scales[:, None] / 2 + 1e-6)
+
+
+def test_int8_search_matches_float_search_after_rescoring(tmp_path, encoder, corpus, queries):
+    exact = open_store(tmp_path / "float", encoder, "none")
+    quantized = open_store(tmp_path / "int8", encoder, "int8")
+    exact.ingest_documents(corpus)
+    quantized.ingest_documents(corpus)
+
+    for query in queries:
+        expected = exact.query_similar_documents(query, top_k=5)
+        found = quantized.query_similar_documents(query, top_k=5)
+        # Re-scored against the float vectors, so the scores are exact too
+        # (bag-of-words vectors tie often, so equal scores may swap ids)
+        assert [hit["similarity"] for hit in found] == [hit["similarity"] for hit in expected]
+        cutoff = expected[-1]["similarity"]
+        assert {hit["id"] for hit in found if hit["similarity"] > cutoff} == {
+            hit["id"] for hit in expected if hit["similarity"] > cutoff
+        }
+
+
+def test_rescoring_reads_only_the_shortlist(tmp_path, encoder, corpus, monkeypatch):
+    monkeypatch.setattr(Config, "QUANTIZATION_RESCORE_FACTOR", 2)
+    store = open_store(tmp_path, encoder, "int8")
+    store.ingest_documents(corpus)
+    query = encoder.encode(["transformer attention retrieval"])[0]
+
+    hits = store._search(query.tolist(), top_k=3)
+
+    assert len(hits) == 3
+    for chunk_id, _, _, distance in hits:
+        row = store._row_of[chunk_id]
+        assert distance == pytest.approx(1.0 - float(store._matrix[row] @ query), abs=1e-6)
+    assert [hit[3] for hit in hits] == sorted(hit[3] for hit in hits)
+
+
+def test_switching_to_int8_rebuilds_codes_for_stored_vectors(tmp_path, encoder, corpus, queries):
+    open_store(tmp_path, encoder, "none").ingest_documents(corpus)
+
+    store = open_store(tmp_path, encoder, "int8")
+
+    assert store._codes is not None
+    codes, scales = quantize_int8(np.asarray(store._matrix[:store._rows]))
+    assert np.array_equal(np.asarray(store._codes[:store._rows]), codes)
+    assert np.allclose(np.asarray(store._scales[:store._rows]), scales)
+    assert len(store.query_similar_documents(queries[0], top_k=5)) == 5
+
+
+def test_read_only_store_uses_the_writers_mode(tmp_path, encoder, corpus, queries):
+    writer = open_store(tmp_path, encoder, "int8")
+    writer.ingest_documents(corpus)
+
+    reader = open_store(tmp_path, encoder, "none", read_only=True)
+
+    assert reader.quantization == "int8"
+    assert [hit["id"] for hit in reader.query_similar_documents(queries[0], top_k=5)] == [
+        hit["id"] for hit in writer.query_similar_documents(queries[0], top_k=5)
+    ]
@@ -0,0 +1,84 @@
+"""Several exact-store instances writing one collection (e.g. after a workspace was evicted and reopened)."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from utils.exact_store import ExactVectorStore
+
+
+def open_store(tmp_path, encoder, **kwargs):
+    return ExactVectorStore(str(tmp_path), "papers", encoder, quantization="none", **kwargs)
+
+
+def chunks(source, count=5):
+    return [
+        (f"{source} chunk {i} about topic{source}{i} and shared words", {"source": source, "content_hash": source, "chunk_index": i})
+        for i in range(count)
+    ]
+
+
+def assert_intact(store, encoder):
+    """Every stored row holds the vector of its own text."""
+    stored = [(row, text) for row, text in enumerate(store._documents) if text is not None]
+    vectors = encoder.encode([text for _, text in stored])
+    assert np.allclose(store._matrix[[row for row, _ in stored]], vectors, atol=1e-6)
+    assert len({row for row, _ in stored}) == len(stored)
+
+
+def test_interleaved_writers_never_share_rows(tmp_path, encoder):
+    first = open_store(tmp_path, encoder)
+    second = open_store(tmp_path, encoder)
+
+    first.ingest_documents(chunks("a"))
+    second.ingest_documents(chunks("b"))
+    first.ingest_documents(chunks("c"))
+    second.delete_document("a")
+
+    reopened = open_store(tmp_path, encoder)
+    assert reopened._count_stored() == 10
+    assert sorted(document["source"] for document in reopened.list_documents()) == ["b", "c"]
+    assert_intact(reopened, encoder)
+    # Writers follow each other's records on their next write or refresh
+    first.refresh()
+    assert first._count_stored() == second._count_stored() == 10
+
+
+def test_concurrent_writers_from_threads(tmp_path, encoder):
+    stores = [open_store(tmp_path, encoder) for _ in range(3)]
+    threads = [
+        threading.Thread(target=store.ingest_documents, args=(chunks(name, 20),))
+        for store, name in zip(stores, "xyz")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    reopened = open_store(tmp_path, encoder)
+    assert reopened._count_stored() == 60
+    assert_intact(reopened, encoder)
+
+
+def test_writer_follows_a_clear_by_another_store(tmp_path, encoder):
+    first = open_store(tmp_path, encoder)
+    second = open_store(tmp_path, encoder)
+    first.ingest_documents(chunks("a"))
+    second.ingest_documents(chunks("b"))
+
+    assert first.clear_collection()
+    second.ingest_documents(chunks("c"))
+
+    reopened = open_store(tmp_path, encoder)
+    assert [document["source"] for document in reopened.list_documents()] == ["c"]
+    assert reopened._count_stored() == 5
+    assert_intact(reopened, encoder)
+
+
+def test_read_only_store_refuses_writes(tmp_path, encoder):
+    open_store(tmp_path, encoder).ingest_documents(chunks("a"))
+    reader = open_store(tmp_path, encoder, read_only=True)
+
+    with pytest.raises(RuntimeError):
+        reader._delete_ids(reader._chunk_ids(source="a"))
@@ -0,0 +1,126 @@
+"""Sandboxed extraction: per-file limits, worker recycling and quarantine of failing PDFs."""
+
+import os
+
+import pytest
+
+from config import Config
+from routers import papers
+from synthetic_corpus import make_pdf
+from utils import extraction_sandbox
+from utils.blob_store import hash_bytes
+from utils.extraction_sandbox import ExtractionSandbox
+from utils.pdf_extractors import ExtractionError
+
+GOOD = make_pdf(["retrieval of transformer embeddings " * 40, "graph attention networks " * 60])
+BROKEN = b"%PDF-1.4\nthis is not really a pdf\n%%EOF\n"
+
+
+@pytest.fixture
+def sandbox():
+    pool = ExtractionSandbox("pypdf", timeout=20, max_rss_mb=1024, max_files_per_worker=2)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def hanging_pdf(tmp_path):
+    """A FIFO nobody writes to: opening it blocks the extractor forever."""
+    if not hasattr(os, "mkfifo"):
+        pytest.skip("needs named pipes")
+    path = tmp_path / "hang.pdf"
+    os.mkfifo(path)
+    return str(path)
+
+
+@pytest.fixture
+def sandboxed_client(request, monkeypatch):
+    monkeypatch.setattr(Config, "EXTRACTION_SANDBOX", True)
+    monkeypatch.setattr(Config, "EXTRACTION_TIMEOUT", 20.0)
+    client = request.getfixturevalue("papers_client")
+    yield client
+    papers.document_loader.sandbox.close()
+
+
+def test_extracts_pages_in_a_worker(sandbox, tmp_path):
+    pdf = tmp_path / "good.pdf"
+    pdf.write_bytes(GOOD)
+
+    pages, extractor = sandbox.extract(str(pdf))
+
+    assert extractor == "pypdf"
+    assert len(pages) == 2 and "graph attention" in pages[1]
+
+
+def test_hanging_extractor_times_out_and_the_worker_is_replaced(sandbox, hanging_pdf, tmp_path):
+    sandbox.timeout = 1.0
+    with pytest.raises(ExtractionError) as error:
+        sandbox.extract(hanging_pdf)
+    assert error.value.reason == "timeout"
+    assert sandbox._idle == []
+
+    pdf = tmp_path / "good.pdf"
+    pdf.write_bytes(GOOD)
+    assert len(sandbox.extract(str(pdf))[0]) == 2
+
+
+def test_worker_over_the_rss_limit_is_killed(sandbox, hanging_pdf, monkeypatch):
+    monkeypatch.setattr(extraction_sandbox, "_rss_bytes", lambda pid: 2 * sandbox.max_rss_bytes)
+
+    with pytest.raises(ExtractionError) as error:
+        sandbox.extract(hanging_pdf)
+
+    assert error.value.reason == "memory_limit"
+    assert sandbox._idle == []
+
+
+def test_workers_are_recycled_after_max_files(sandbox, tmp_path):
+    pdf = tmp_path / "good.pdf"
+    pdf.write_bytes(GOOD)
+
+    sandbox.extract(str(pdf))
+    first = sandbox._idle[0]
+    sandbox.extract(str(pdf))
+    assert sandbox._idle == [] and first.process.poll() is not None
+
+    sandbox.extract(str(pdf))
+    assert sandbox._idle[0].process.pid != first.process.pid
+
+
+def test_failing_pdf_is_reported_without_stopping_the_worker(sandbox, tmp_path):
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(BROKEN)
+
+    with pytest.raises(ExtractionError) as error:
+        sandbox.extract(str(broken))
+    assert error.value.reason == "invalid_pdf"
+    # An error reply is an ordinary answer; the worker stays in the pool
+    assert len(sandbox._idle) == 1
+
+
+def test_directory_ingest_quarantines_a_failing_pdf_and_continues(sandboxed_client, tmp_path):
+    data = tmp_path / "data"
+    (data / "good.pdf").write_bytes(GOOD)
+    (data / "broken.pdf").write_bytes(BROKEN)
+
+    response = sandboxed_client.post("/api/v1/papers/ingest")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["documents_ingested"] > 0
+    assert [entry["source"] for entry in papers.get_workspace_store("default").list_documents()] == ["good.pdf"]
+    assert papers.quarantine.contains(hash_bytes(BROKEN))
+    assert not (data / "broken.pdf").exists()
+
+    # Later ingests neither see nor retry it
+    assert sandboxed_client.post("/api/v1/papers/ingest").json()["documents_ingested"] == 0
+
+
+def test_failing_upload_is_quarantined_and_rejected(sandboxed_client):
+    response = sandboxed_client.post(
+        "/api/v1/papers/upload", files={"file": ("broken.pdf", BROKEN, "application/pdf")}
+    )
+
+    assert response.status_code == 422
+    assert papers.quarantine.contains(hash_bytes(BROKEN))
+    assert papers.blob_store.resolve("broken.pdf") is None
+    assert sandboxed_client.get("/api/v1/papers/quarantine").json()["count"] == 1
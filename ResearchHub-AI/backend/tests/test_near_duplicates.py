@@ -0,0 +1,107 @@
+"""MinHash/LSH near-duplicate detection: linking, skipping and restoring orphans."""
+
+import random
+
+import pytest
+
+from config import Config
+from synthetic_corpus import synthetic_text
+from utils.exact_store import ExactVectorStore
+from utils.near_duplicates import NearDuplicateIndex, optimal_bands
+
+RNG = random.Random(5)
+TEXTS = [synthetic_text(RNG, 120) for _ in range(3)]
+OTHER = [synthetic_text(RNG, 120) for _ in range(3)]
+
+
+def document(source, texts, suffix=""):
+    return [
+        (text + suffix, {"source": source, "content_hash": f"hash-{source}", "chunk_index": i})
+        for i, text in enumerate(texts)
+    ]
+
+
+def open_store(tmp_path, encoder, monkeypatch, action="link"):
+    monkeypatch.setattr(Config, "NEAR_DUPLICATE_THRESHOLD", 0.8)
+    monkeypatch.setattr(Config, "NEAR_DUPLICATE_ACTION", action)
+    return ExactVectorStore(str(tmp_path), "papers", encoder, quantization="none")
+
+
+def test_optimal_bands_fit_the_permutations():
+    bands, rows = optimal_bands(0.8, 64)
+    assert bands * rows <= 64
+    # A pair at the threshold is likely to share a band
+    assert 1 - (1 - 0.8 ** rows) ** bands > 0.5
+
+
+def test_find_matches_near_duplicates_of_other_documents_only(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "index.jsonl"), threshold=0.8)
+    index.add("a-0", "a.pdf", index.signature(TEXTS[0]))
+
+    match = index.find(index.signature(TEXTS[0] + " appendix"), "b.pdf")
+    assert match is not None and match[0] == "a-0" and match[1] >= 0.8
+    assert index.find(index.signature(OTHER[0]), "b.pdf") is None
+    assert index.find(index.signature(TEXTS[0]), "a.pdf") is None
+
+
+def test_near_duplicate_chunks_are_linked_instead_of_stored(tmp_path, encoder, monkeypatch):
+    store = open_store(tmp_path, encoder, monkeypatch)
+    store.ingest_documents(document("a.pdf", TEXTS))
+
+    result = store.ingest_documents(document("b.pdf", TEXTS, " revised") + document("c.pdf", OTHER))
+
+    assert result["near_duplicates"] == 3
+    assert store._count_stored() == 6
+    assert store.has_document("hash-b.pdf")
+    assert [entry["source"] for entry in store.list_documents()] == ["a.pdf", "b.pdf", "c.pdf"]
+    report = store.near_duplicates.report()
+    assert report["duplicate_chunks"] == 3
+    assert report["documents"][0]["duplicates_of"] == {"a.pdf": 3}
+
+    # The links survive a reopen (the log is replayed)
+    reopened = open_store(tmp_path, encoder, monkeypatch)
+    assert reopened.near_duplicates.has_document("hash-b.pdf")
+
+
+def test_deleting_the_canonical_document_restores_its_duplicates(tmp_path, encoder, monkeypatch):
+    store = open_store(tmp_path, encoder, monkeypatch)
+    store.ingest_documents(document("a.pdf", TEXTS))
+    store.ingest_documents(document("b.pdf", TEXTS, " revised"))
+    assert store._count_stored() == 3
+
+    assert store.delete_document("a.pdf") == 3
+
+    assert store._count_stored() == 3
+    assert [entry["source"] for entry in store.list_documents()] == ["b.pdf"]
+    hits = store.query_similar_documents(TEXTS[0], top_k=3)
+    assert hits and all(hit["metadata"]["source"] == "b.pdf" for hit in hits)
+    assert store.near_duplicates.report()["duplicate_chunks"] == 0
+
+
+def test_deleting_a_duplicate_document_drops_only_its_links(tmp_path, encoder, monkeypatch):
+    store = open_store(tmp_path, encoder, monkeypatch)
+    store.ingest_documents(document("a.pdf", TEXTS))
+    store.ingest_documents(document("b.pdf", TEXTS, " revised"))
+
+    store.delete_document("b.pdf")
+
+    assert store._count_stored() == 3
+    assert not store.has_document("hash-b.pdf")
+    assert [entry["source"] for entry in store.list_documents()] == ["a.pdf"]
+
+
+def test_skip_mode_counts_duplicates_without_keeping_them(tmp_path, encoder, monkeypatch):
+    store = open_store(tmp_path, encoder, monkeypatch, action="skip")
+    store.ingest_documents(document("a.pdf", TEXTS))
+    result = store.ingest_documents(document("b.pdf", TEXTS, " revised"))
+
+    assert result["near_duplicates"] == 3
+    assert store._count_stored() == 3
+
+    store.delete_document("a.pdf")
+    assert store._count_stored() == 0
+
+
+def test_unknown_action_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(str(tmp_path / "index.jsonl"), action="merge")
@@ -0,0 +1,132 @@
+"""Snapshot publishing of the Chroma store: generations, folding and orphan cleanup."""
+
+import pytest
+
+chromadb = pytest.importorskip("chromadb")
+
+from utils.vector_store import VectorStore, _SEGMENT_FOLDER
+
+
+def chunks(source, count, topic="retrieval"):
+    return [
+        (f"{topic} chunk {i} of {source} about {topic} models", {"source": source, "content_hash": source, "chunk_index": i})
+        for i in range(count)
+    ]
+
+
+def wait_for_folds():
+    _SEGMENT_FOLDER.submit(lambda: None).result()
+
+
+def collection_names(client):
+    # Chroma returns Collection objects in 0.4/0.5 and names afterwards
+    return {getattr(collection, "name", collection) for collection in client.list_collections()}
+
+
+@pytest.fixture
+def client(tmp_path):
+    return chromadb.PersistentClient(path=str(tmp_path))
+
+
+@pytest.fixture
+def make_store(tmp_path, client, encoder):
+    def make(**kwargs):
+        return VectorStore(str(tmp_path), "papers", encoder, client=client, **kwargs)
+    return make
+
+
+def test_ingest_publishes_a_generation_and_folds_into_one_segment(make_store):
+    store = make_store()
+    generation = store._snapshot.generation
+
+    store.ingest_documents(chunks("a.pdf", 5))
+    store.ingest_documents(chunks("b.pdf", 5, topic="graphs"))
+    wait_for_folds()
+
+    assert store._snapshot.generation > generation
+    assert len(store.segments) == 1
+    assert store._count_stored() == 10
+    assert store.query_similar_documents("graphs models", top_k=1)[0]["metadata"]["source"] == "b.pdf"
+
+
+def test_reingest_keeps_one_copy_of_each_chunk(make_store):
+    store = make_store()
+    store.ingest_documents(chunks("a.pdf", 5))
+    store.ingest_documents(chunks("a.pdf", 5), skip_existing=False)
+    wait_for_folds()
+
+    assert store._count_stored() == 5
+    assert len(store._chunk_ids(source="a.pdf")) == 5
+
+
+def test_open_drops_orphaned_segments(make_store, client):
+    make_store()
+    client.create_collection("papers.99")
+
+    make_store()
+
+    assert "papers.99" not in collection_names(client)
+
+
+def test_open_keeps_another_stores_staging_segment(make_store, client, encoder):
+    writer = make_store()
+    writer._begin_ingest()
+    try:
+        embedding = encoder.encode(["staged chunk"])[0].tolist()
+        writer._upsert(["staged"], [embedding], ["staged chunk"], [{"source": "s.pdf"}])
+        staging = writer._staging.name
+
+        make_store()
+
+        assert staging in collection_names(client)
+    finally:
+        writer._end_ingest(publish=True)
+    wait_for_folds()
+    assert writer._get_chunks(["staged"])
+
+
+def test_writes_follow_a_generation_published_by_another_store(make_store):
+    first = make_store()
+    second = make_store()
+
+    first.ingest_documents(chunks("a.pdf", 3))
+    second.ingest_documents(chunks("b.pdf", 3, topic="graphs"))
+    wait_for_folds()
+    first.refresh()
+
+    for store in (first, second):
+        assert store._snapshot.generation == second._snapshot.generation
+        assert {hit["metadata"]["source"] for hit in store.query_similar_documents("chunk models", top_k=6)} == {
+            "a.pdf", "b.pdf"
+        }
+
+
+def test_read_only_open_never_creates_or_cleans_up(make_store, client):
+    with pytest.raises(ValueError):
+        make_store(read_only=True)
+
+    make_store().ingest_documents(chunks("a.pdf", 3))
+    wait_for_folds()
+    client.create_collection("papers.99")
+
+    reader = make_store(read_only=True)
+
+    assert "papers.99" in collection_names(client)
+    assert len(reader.query_similar_documents("retrieval", top_k=3)) == 3
+    with pytest.raises(RuntimeError):
+        reader.ingest_documents(chunks("b.pdf", 1))
+
+
+def test_retired_segments_are_dropped_after_their_readers_finish(make_store, client):
+    store = make_store()
+    store.ingest_documents(chunks("a.pdf", 3))
+    wait_for_folds()
+    old_segments = set(store._snapshot.names)
+
+    with store._reading() as snapshot:
+        assert store.clear_collection()
+        assert old_segments <= collection_names(client)
+        assert snapshot.segments[0].count() == 3
+
+    assert not old_segments & collection_names(client)
+    assert store._count_stored() == 0
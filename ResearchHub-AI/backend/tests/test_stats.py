@@ -0,0 +1,46 @@
+"""Maintained counters: /stats ETags and a search path without catalog queries."""
+
+from routers import papers
+from synthetic_corpus import make_pdf
+
+STATS = "/api/v1/papers/stats"
+
+
+def test_stats_etag_answers_304_until_the_collection_changes(papers_client):
+    first = papers_client.get(STATS)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    unchanged = papers_client.get(STATS, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.content == b""
+
+    pdf = make_pdf(["retrieval of transformer embeddings " * 40])
+    papers_client.post("/api/v1/papers/upload", files={"file": ("a.pdf", pdf, "application/pdf")})
+
+    changed = papers_client.get(STATS, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["document_count"] == papers.get_workspace_store("default").count() > 0
+
+
+def test_stats_of_an_unknown_workspace_is_404(papers_client):
+    assert papers_client.get(STATS, params={"workspace": "teamB"}).status_code == 404
+    assert "teamB" not in papers_client.get("/api/v1/papers/workspaces").json()["workspaces"]
+
+
+def test_search_joins_documents_without_querying_the_catalog(papers_client):
+    pdf = make_pdf(["graph attention networks " * 60])
+    papers_client.post("/api/v1/papers/upload", files={"file": ("a.pdf", pdf, "application/pdf")})
+    store = papers.get_workspace_store("default")
+    store.query_similar_documents("graph attention", top_k=3)
+
+    statements = []
+    store.catalog._conn.set_trace_callback(statements.append)
+    try:
+        results = store.query_similar_documents("graph attention", top_k=3)
+    finally:
+        store.catalog._conn.set_trace_callback(None)
+
+    assert results and results[0]["metadata"]["source"] == "a.pdf"
+    assert statements == []
@@ -0,0 +1,108 @@
+"""Uploads are stored by content hash; names are references to the content."""
+
+from routers import papers
+from synthetic_corpus import make_pdf
+
+UPLOAD = "/api/v1/papers/upload"
+DOCUMENTS = "/api/v1/papers/documents"
+
+FIRST = make_pdf(["retrieval of transformer embeddings " * 40, "graph attention networks " * 60])
+SECOND = make_pdf(["convolution kernels and dropout regularization " * 30])
+
+
+def upload(client, name, content, workspace="default"):
+    response = client.post(UPLOAD, files={"file": (name, content, "application/pdf")}, params={"workspace": workspace})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def store(workspace="default"):
+    return papers.get_workspace_store(workspace)
+
+
+def sources(workspace="default"):
+    return sorted(document["source"] for document in store(workspace).list_documents())
+
+
+def test_new_content_under_same_name_replaces_the_document(papers_client):
+    first = upload(papers_client, "a.pdf", FIRST)
+    second = upload(papers_client, "a.pdf", SECOND)
+
+    assert second["content_hash"] != first["content_hash"]
+    assert sources() == ["a.pdf"]
+    assert store()._count_stored() == second["documents_ingested"]
+    assert not papers.blob_store.exists(first["content_hash"])
+
+
+def test_identical_upload_under_new_name_is_deduplicated(papers_client):
+    first = upload(papers_client, "a.pdf", FIRST)
+    duplicate = upload(papers_client, "b.pdf", FIRST)
+
+    assert duplicate["duplicate"] is True
+    assert duplicate["document_ids"] == first["document_ids"]
+    assert papers.blob_store.refcount(first["content_hash"]) == 2
+
+
+def test_content_stays_until_its_last_name_is_deleted(papers_client):
+    first = upload(papers_client, "a.pdf", FIRST)
+    upload(papers_client, "b.pdf", FIRST)
+    chunks = first["documents_ingested"]
+
+    response = papers_client.delete(f"{DOCUMENTS}/a.pdf")
+    assert response.status_code == 200
+    assert response.json()["documents_deleted"] == 0
+    assert store()._count_stored() == chunks
+    assert sources() == ["b.pdf"]
+    results = papers_client.get("/api/v1/papers/search", params={"query": "graph attention"}).json()["results"]
+    assert results and all(result["metadata"]["source"] == "b.pdf" for result in results)
+
+    response = papers_client.delete(f"{DOCUMENTS}/b.pdf")
+    assert response.status_code == 200
+    assert response.json()["documents_deleted"] == chunks
+    assert store()._count_stored() == 0
+    assert not papers.blob_store.exists(first["content_hash"])
+
+
+def test_replacing_a_shared_name_keeps_the_other_names_content(papers_client):
+    first = upload(papers_client, "a.pdf", FIRST)
+    upload(papers_client, "b.pdf", FIRST)
+    second = upload(papers_client, "a.pdf", SECOND)
+
+    assert sources() == ["a.pdf", "b.pdf"]
+    assert store()._count_stored() == first["documents_ingested"] + second["documents_ingested"]
+    assert papers.blob_store.exists(first["content_hash"])
+
+
+def test_deleting_an_unknown_document_is_404(papers_client):
+    assert papers_client.delete(f"{DOCUMENTS}/missing.pdf").status_code == 404
+
+
+def test_same_name_in_another_workspace_is_a_separate_document(papers_client):
+    first = upload(papers_client, "a.pdf", FIRST)
+    second = upload(papers_client, "a.pdf", SECOND, workspace="teamb")
+
+    assert second["message"] == "File uploaded and ingested successfully"
+    assert papers.blob_store.exists(first["content_hash"])
+    assert store()._count_stored() == first["documents_ingested"]
+
+    response = papers_client.delete(f"{DOCUMENTS}/a.pdf")
+    assert response.status_code == 200
+    assert not papers.blob_store.exists(first["content_hash"])
+    assert papers.blob_store.exists(second["content_hash"])
+    assert sources("teamb") == ["a.pdf"]
+    assert store("teamb")._count_stored() == second["documents_ingested"]
+
+
+def test_identical_content_in_two_workspaces_shares_one_blob(papers_client):
+    first = upload(papers_client, "a.pdf", FIRST)
+    other = upload(papers_client, "a.pdf", FIRST, workspace="teamb")
+
+    assert other["duplicate"] is False
+    assert papers.blob_store.refcount(first["content_hash"]) == 2
+
+    assert papers_client.delete(f"{DOCUMENTS}/a.pdf", params={"workspace": "teamb"}).status_code == 200
+    assert papers.blob_store.exists(first["content_hash"])
+    assert sources() == ["a.pdf"]
+
+    assert papers_client.post("/api/v1/papers/clear").status_code == 200
+    assert not papers.blob_store.exists(first["content_hash"])
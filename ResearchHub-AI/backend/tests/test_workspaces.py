@@ -0,0 +1,85 @@
+"""Workspace stores: lazy creation, isolation, listing and LRU eviction of handles."""
+
+import pytest
+
+import utils.shared_model
+from utils.workspaces import WorkspaceManager, WorkspaceNotFoundError
+
+
+@pytest.fixture
+def make_manager(tmp_path, monkeypatch, encoder):
+    monkeypatch.setattr(utils.shared_model, "load_embedding_model", lambda *args, **kwargs: encoder)
+
+    def make(**kwargs):
+        return WorkspaceManager(db_path=str(tmp_path / "vector_db"), backend="exact", **kwargs)
+    return make
+
+
+def chunks(source, topic):
+    return [
+        (f"{topic} chunk {i} of {source}", {"source": source, "content_hash": f"{source}-{topic}", "chunk_index": i})
+        for i in range(3)
+    ]
+
+
+def test_reading_an_unknown_workspace_creates_nothing(make_manager):
+    manager = make_manager()
+
+    with pytest.raises(WorkspaceNotFoundError):
+        manager.get("alpha")
+
+    assert not manager.exists("alpha")
+    assert manager.list_workspaces() == []
+    assert manager.exists("default")
+
+
+def test_invalid_workspace_names_are_rejected(make_manager):
+    manager = make_manager()
+    for name in ("", "-alpha", "a/b", "x" * 40):
+        with pytest.raises(ValueError):
+            manager.get(name, create=True)
+
+
+def test_workspaces_are_isolated_and_listed(make_manager):
+    manager = make_manager()
+    manager.get("alpha", create=True).ingest_documents(chunks("a.pdf", "graph"))
+    manager.get("beta", create=True).ingest_documents(chunks("a.pdf", "kernel"))
+
+    assert manager.list_workspaces() == ["alpha", "beta"]
+    assert manager.collection_name_for("default") == "research_papers"
+    assert manager.collection_name_for("alpha") == "research_papers__alpha"
+    for workspace, topic in (("alpha", "graph"), ("beta", "kernel")):
+        hits = manager.get(workspace).query_similar_documents(topic, top_k=10)
+        assert len(hits) == 3 and all(topic in hit["document"] for hit in hits)
+
+    # A new manager finds the workspaces on disk
+    assert make_manager().get("beta").count() == 3
+
+
+def test_least_recently_used_handles_are_evicted(make_manager):
+    manager = make_manager(max_open=2)
+    alpha = manager.get("alpha", create=True)
+    manager.get("beta", create=True)
+    manager.get("alpha")
+    manager.get("gamma", create=True)
+
+    assert sorted(manager.open_stores()) == ["alpha", "gamma"]
+    assert manager.get("alpha") is alpha
+    assert manager.list_workspaces() == ["alpha", "beta", "gamma"]
+
+
+def test_evicted_workspace_reopens_with_its_data(make_manager):
+    manager = make_manager(max_open=1)
+    evicted = manager.get("alpha", create=True)
+    evicted.ingest_documents(chunks("a.pdf", "graph"))
+    manager.get("beta", create=True)
+
+    reopened = manager.get("alpha")
+    assert reopened is not evicted
+    assert reopened._count_stored() == 3
+
+    # A request still holding the evicted handle writes alongside the new one
+    evicted.ingest_documents(chunks("b.pdf", "graph"))
+    reopened.ingest_documents(chunks("c.pdf", "graph"))
+    assert sorted(entry["source"] for entry in make_manager().get("alpha").list_documents()) == ["a.pdf", "b.pdf", "c.pdf"]
+    assert make_manager().get("alpha")._count_stored() == 9
@@ -0,0 +1,52 @@
+"""Write jobs in single-process mode run off the event loop, one at a time."""
+
+import threading
+
+from routers import papers
+
+SEARCH = "/api/v1/papers/search"
+
+
+def test_searches_are_served_while_a_write_job_runs(papers_client, monkeypatch):
+    started, release, finished = threading.Event(), threading.Event(), threading.Event()
+
+    def slow_clear(workspace):
+        started.set()
+        release.wait(10)
+        finished.set()
+        return {"status": "success", "workspace": workspace}
+
+    monkeypatch.setitem(papers.WRITE_JOBS, "clear", (slow_clear, "Clear failed"))
+    writer = threading.Thread(target=papers_client.post, args=("/api/v1/papers/clear",))
+    writer.start()
+    try:
+        assert started.wait(10)
+        response = papers_client.get(SEARCH, params={"query": "graph attention"})
+        assert response.status_code == 200
+        assert not finished.is_set()
+    finally:
+        release.set()
+        writer.join(10)
+
+
+def test_write_jobs_do_not_overlap(papers_client, monkeypatch):
+    running, overlaps = [], []
+
+    def job(workspace):
+        running.append(workspace)
+        overlaps.append(len(running))
+        threading.Event().wait(0.05)
+        running.remove(workspace)
+        return {"status": "success", "workspace": workspace}
+
+    monkeypatch.setitem(papers.WRITE_JOBS, "clear", (job, "Clear failed"))
+    writers = [
+        threading.Thread(target=papers_client.post, args=("/api/v1/papers/clear",), kwargs={"params": {"workspace": name}})
+        for name in ("a", "b", "c")
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join(10)
+
+    assert len(overlaps) == 3 and max(overlaps) == 1
@@ -0,0 +1,1012 @@
+"""
+Base Store Module
+Backend-independent part of the vector store: embeddings, chunk ids,
+batched ingestion and result formatting.
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
+
+from sentence_transformers import SentenceTransformer
+
+from config import Config
+from utils.blob_store import hash_bytes
+from utils.diversity import mmr_select
+from utils.document_catalog import DocumentCatalog, split_metadata
+from utils.metrics import (
+    EMBEDDING_BATCH_SECONDS,
+    EMBEDDING_ITEM_SECONDS,
+    INGEST_BATCHES_IN_FLIGHT,
+    VECTOR_QUERY_SECONDS,
+    VECTOR_WRITE_SECONDS,
+)
+from utils.near_duplicates import create_near_duplicate_index
+from utils.profiling import profiled
+from utils.tracing import traced
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Re-reads backend chunk counts for every store, off the request path
+_COUNT_RECONCILER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="count-reconcile")
+
+
+@contextmanager
+def file_lock(path: Path, exclusive: bool = True, blocking: bool = True):
+    """
+    Hold an advisory lock on `path` (created if missing).
+
+    Locks taken through separate calls conflict even within one process,
+    so every store instance is a separate lock holder.
+
+    Args:
+        path: Lock file
+        exclusive: Exclusive lock, otherwise shared
+        blocking: Wait for the lock, otherwise give up if it is held
+
+    Yields:
+        Whether the lock is held (False only for a failed non-blocking
+        attempt, or any non-blocking attempt where locking is unavailable)
+    """
+    if fcntl is None:
+        yield blocking
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+") as f:
+        flags = (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | (0 if blocking else fcntl.LOCK_NB)
+        try:
+            fcntl.flock(f, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def make_chunk_id(text: str, metadata: dict) -> str:
+    """
+    Build a deterministic id for a chunk.
+
+    The id is derived from the source document's content hash, the chunker
+    version, chunking and cleaning settings, and the chunk index, so re-ingesting the same PDF
+    with the same chunker always produces the same ids. Chunks without a content hash
+    fall back to hashing their source name and text.
+
+    Args:
+        text: Chunk text
+        metadata: Chunk metadata from DocumentLoader
+
+    Returns:
+        Stable chunk id
+    """
+    metadata = metadata if isinstance(metadata, dict) else {}
+    content_hash = metadata.get("content_hash")
+    if not content_hash:
+        source = metadata.get("source", "document")
+        content_hash = hash_bytes(f"{source}\0{text}".encode("utf-8"))
+    version = metadata.get("chunker_version", 0)
+    if "chunk_size" in metadata:
+        # Chunk boundaries move with the chunking and cleaning settings, so they are part of the id
+        version = f"{version}.{metadata['chunk_size']}.{metadata.get('chunk_overlap', 0)}"
+        if metadata.get("cleaning"):
+            version = f"{version}.{metadata['cleaning']}"
+    chunk_index = metadata.get("chunk_index", 0)
+    return f"{content_hash}-v{version}-{chunk_index}"
+
+
+def document_key(metadata: dict) -> str:
+    """Identify a chunk's source document (content hash, else source name)."""
+    if not isinstance(metadata, dict):
+        return "document"
+    return metadata.get("content_hash") or metadata.get("source") or "document"
+
+
+class BaseVectorStore:
+    """
+    Common vector store behaviour shared by all index backends.
+
+    Subclasses implement the storage hooks (`_existing_ids`, `_upsert`,
+    `_ids_where`, `_metadatas_where`, `_get_chunks`, `_delete_ids`,
+    `_search`, `_count_stored`, `clear_collection`);
+    everything callers use - ingestion, search, document lookups and
+    deletion - is implemented here on top of them. Backends that stage
+    ingests before making them visible also override `_begin_ingest` and
+    `_end_ingest`. Backends set `db_path` before calling `__init__`; the
+    document catalog and near-duplicate index live under it.
+
+    `count()` is served from an in-memory counter updated by ingest,
+    delete and clear, and reconciled with `_count_stored()` in the
+    background, so readers (stats, metrics) never wait on the backend.
+
+    Chunks are stored with `doc_id` and `chunk_index` only; the document
+    fields they came with are kept once in the DocumentCatalog and joined
+    back onto results.
+    """
+
+    backend_name = "base"
+
+    def __init__(
+        self,
+        collection_name: str,
+        embedding_model: Union[str, SentenceTransformer] = "all-MiniLM-L6-v2",
+        batch_size: Optional[int] = None
+    ):
+        """
+        Initialize the shared state.
+
+        Args:
+            collection_name: Name of the collection to work with
+            embedding_model: Name of the sentence-transformer model, or an
+                already loaded model to share between stores
+            batch_size: Chunks embedded and written per batch
+                (defaults to Config.INGEST_BATCH_SIZE)
+        """
+        self.collection_name = collection_name
+        self.batch_size = max(1, batch_size or Config.INGEST_BATCH_SIZE)
+        # Resolve labelled metric children once, off the hot path
+        self._query_seconds = VECTOR_QUERY_SECONDS.labels(self.backend_name)
+        self._write_seconds = VECTOR_WRITE_SECONDS.labels(self.backend_name)
+
+        # Initialize embedding model (reuse a shared instance when given one)
+        if isinstance(embedding_model, str):
+            logger.info(f"Loading embedding model: {embedding_model}")
+            self.embedding_model = SentenceTransformer(embedding_model)
+            logger.info(f"Embedding model loaded successfully")
+        else:
+            self.embedding_model = embedding_model
+
+        self.catalog = DocumentCatalog(self.db_path)
+        self.near_duplicates = create_near_duplicate_index(self.db_path, collection_name)
+        self._embedding_dimension: Optional[int] = None
+
+        # Maintained chunk counter; `_count_mutations` lets a reconcile
+        # detect a write that raced with its read of the backend
+        self._count_lock = threading.Lock()
+        self._chunk_count = 0
+        self._count_mutations = 0
+        self._count_reconciling = False
+        self._count_reconciled_at = 0.0
+        self._reconcile_count()
+
+    # ------------------------------------------------------------------
+    # Storage hooks implemented by each backend
+    # ------------------------------------------------------------------
+
+    def _existing_ids(self, ids: List[str]) -> Set[str]:
+        """Return the subset of `ids` already stored."""
+        raise NotImplementedError
+
+    def _upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        texts: List[str],
+        metadatas: List[dict]
+    ) -> None:
+        """Insert or overwrite one batch of pre-embedded chunks."""
+        raise NotImplementedError
+
+    def _ids_where(self, field: str, value: Any, limit: Optional[int] = None) -> List[str]:
+        """Return ids of chunks whose metadata `field` equals `value`."""
+        raise NotImplementedError
+
+    def _metadatas_where(self, field: str, value: Any) -> List[dict]:
+        """Return metadata of chunks whose metadata `field` equals `value`."""
+        raise NotImplementedError
+
+    def _delete_ids(self, ids: List[str]) -> None:
+        """Delete chunks by id."""
+        raise NotImplementedError
+
+    def _get_chunks(self, ids: List[str]) -> List[Tuple[str, str, dict]]:
+        """Return (id, document, metadata) of the stored chunks among `ids`."""
+        raise NotImplementedError
+
+    def _search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        with_embeddings: bool = False
+    ) -> List[tuple]:
+        """
+        Return up to `top_k` (id, document, metadata, cosine distance) tuples, best first.
+
+        With `with_embeddings` each tuple also ends with the chunk's embedding.
+        """
+        raise NotImplementedError
+
+    def _count_stored(self) -> int:
+        """Return the number of stored chunks, as the backend reports it."""
+        raise NotImplementedError
+
+    def clear_collection(self) -> bool:
+        """Remove every chunk from the collection."""
+        raise NotImplementedError
+
+    def _begin_ingest(self) -> None:
+        """Called before an ingest writes its first batch."""
+
+    def _end_ingest(self, publish: bool) -> None:
+        """
+        Called after an ingest, successful or not.
+
+        Args:
+            publish: Whether any chunks were written and should become visible
+        """
+
+    # ------------------------------------------------------------------
+    # Chunk counter
+    # ------------------------------------------------------------------
+
+    def _adjust_count(self, delta: int) -> None:
+        """
+        Apply a write to the maintained counter.
+
+        Deltas are best-effort (an upsert may overwrite existing chunks), so
+        the counter is also marked for reconciliation on the next read.
+        """
+        with self._count_lock:
+            self._chunk_count = max(0, self._chunk_count + delta)
+            self._count_mutations += 1
+            self._count_reconciled_at = 0.0
+
+    def _reset_count(self) -> None:
+        """Zero the maintained counter after the collection was cleared."""
+        with self._count_lock:
+            self._chunk_count = 0
+            self._count_mutations += 1
+
+    def _reconcile_count(self) -> int:
+        """
+        Replace the maintained counter with the backend's count.
+
+        The result is dropped if a write was applied while the backend was
+        read; the counter then stays stale, so the next read schedules
+        another reconcile.
+
+        Returns:
+            The maintained count afterwards
+        """
+        with self._count_lock:
+            mutations = self._count_mutations
+        try:
+            stored = self._count_stored()
+        except Exception as e:
+            logger.warning(f"Could not reconcile chunk count of '{self.collection_name}': {str(e)}")
+            stored = None
+        with self._count_lock:
+            self._count_reconciling = False
+            if stored is None:
+                # Retry after the usual interval rather than on every read
+                self._count_reconciled_at = time.monotonic()
+            elif mutations == self._count_mutations:
+                self._count_reconciled_at = time.monotonic()
+                if stored != self._chunk_count:
+                    logger.debug(f"Chunk count of '{self.collection_name}' reconciled: {self._chunk_count} -> {stored}")
+                self._chunk_count = stored
+            return self._chunk_count
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def count(self) -> int:
+        """
+        Return the number of stored chunks.
+
+        Reads the maintained counter; when it was last reconciled more than
+        COUNT_RECONCILE_SECONDS ago (or a write happened since), a
+        background task re-reads the backend's count.
+        """
+        with self._count_lock:
+            stale = (
+                not self._count_reconciling
+                and time.monotonic() - self._count_reconciled_at >= Config.COUNT_RECONCILE_SECONDS
+            )
+            if stale:
+                self._count_reconciling = True
+            count = self._chunk_count
+        if stale:
+            _COUNT_RECONCILER.submit(self._reconcile_count)
+        return count
+
+    @property
+    def embedding_dimension(self) -> int:
+        """Output dimension of the embedding model (asked once, then cached)."""
+        if self._embedding_dimension is None:
+            self._embedding_dimension = self.embedding_model.get_sentence_embedding_dimension()
+        return self._embedding_dimension
+
+    @profiled
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for a list of texts.
+
+        Args:
+            texts: List of text strings
+
+        Returns:
+            List of embedding vectors
+        """
+        try:
+            # Newer SentenceTransformer.encode may return a numpy array and
+            # does not accept `convert_to_list`. Convert to list explicitly.
+            start = time.perf_counter()
+            embeddings = self.embedding_model.encode(texts)
+            elapsed = time.perf_counter() - start
+            EMBEDDING_BATCH_SECONDS.observe(elapsed)
+            if texts:
+                EMBEDDING_ITEM_SECONDS.observe(elapsed / len(texts))
+            try:
+                # If it's a numpy array
+                embeddings_list = embeddings.tolist()
+            except Exception:
+                embeddings_list = list(embeddings)
+
+            logger.info(f"Generated embeddings for {len(texts)} text(s)")
+            return embeddings_list
+        except Exception as e:
+            logger.error(f"Error generating embeddings: {str(e)}")
+            raise
+
+    def ingest_documents(
+        self,
+        documents: List[tuple[str, dict]],
+        skip_existing: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Ingest documents into the vector store.
+
+        Chunks are upserted under deterministic ids, so ingesting the same
+        document twice is idempotent. Work is split into `batch_size`
+        batches so no single call exceeds the backend's limit, and embedding
+        of the next batch overlaps the write of the current one. Chunks
+        that are near-duplicates of another document's chunks are linked to
+        them instead of being embedded (see utils.near_duplicates).
+
+        Args:
+            documents: List of (text, metadata) tuples from DocumentLoader
+            skip_existing: Skip embedding chunks whose id is already stored
+
+        Returns:
+            Dictionary with ingestion statistics; `documents` maps each
+            source document (content hash, or source name) to its chunk,
+            token, near-duplicate and embedding/write time figures. Batch
+            times are split across documents by their share of the batch's chunks.
+        """
+        if not documents:
+            logger.warning("No documents provided for ingestion")
+            return {"status": "failed", "message": "No documents provided", "count": 0}
+
+        # Deduplicate by id, keeping the last occurrence
+        prepared: Dict[str, tuple[str, dict]] = {}
+        for text, metadata in documents:
+            prepared[make_chunk_id(text, metadata)] = (text, metadata)
+        ids = list(prepared.keys())
+        written = 0
+        per_document: Dict[str, Dict[str, Any]] = {}
+        for chunk_id in ids:
+            stats = per_document.setdefault(document_key(prepared[chunk_id][1]), {
+                "chunks": 0, "chunks_written": 0, "tokens": 0, "truncated_chunks": 0, "near_duplicates": 0,
+                "embedding_seconds": 0.0, "write_seconds": 0.0,
+            })
+            stats["chunks"] += 1
+
+        linked = 0
+        succeeded = False
+        doc_ids: Dict[str, int] = {}
+        created_doc_ids: Set[int] = set()
+        self._begin_ingest()
+        try:
+            pending = ids
+            if skip_existing:
+                existing = self._stored_ids(ids)
+                pending = [chunk_id for chunk_id in ids if chunk_id not in existing]
+                if existing:
+                    logger.info(f"Skipping {len(existing)} chunk(s) already in the collection")
+            if self.near_duplicates is not None:
+                embed_count = len(pending)
+                pending = self._link_near_duplicates(pending, prepared, per_document)
+                linked = embed_count - len(pending)
+                if linked:
+                    logger.info(f"Linked {linked} near-duplicate chunk(s) instead of embedding them")
+
+            # Two-stage pipeline: batch N+1 is embedded on this thread while
+            # batch N is written by a single writer thread.
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="store-writer") as writer:
+                in_flight: Optional[Tuple[Future, List[str]]] = None
+                for start in range(0, len(pending), self.batch_size):
+                    batch_ids = pending[start:start + self.batch_size]
+                    texts = [prepared[chunk_id][0] for chunk_id in batch_ids]
+                    metadatas = [prepared[chunk_id][1] for chunk_id in batch_ids]
+                    batch_keys = [document_key(metadata) for metadata in metadatas]
+                    stored_metadatas = self._normalize_metadatas(metadatas, doc_ids, created_doc_ids)
+
+                    # Generate embeddings
+                    logger.info(f"Generating embeddings for {len(texts)} documents...")
+                    embed_start = time.perf_counter()
+                    embeddings = self.generate_embeddings(texts)
+                    self._attribute(per_document, batch_keys, "embedding_seconds", time.perf_counter() - embed_start)
+                    self._count_tokens(per_document, batch_keys, texts)
+
+                    if in_flight is not None:
+                        written += self._collect_write(per_document, *in_flight)
+                    INGEST_BATCHES_IN_FLIGHT.inc()
+                    # Run in this thread's context so profiling and tracing follow the batch
+                    future = writer.submit(
+                        contextvars.copy_context().run, self._timed_write, batch_ids, embeddings, texts, stored_metadatas
+                    )
+                    future.add_done_callback(lambda _: INGEST_BATCHES_IN_FLIGHT.dec())
+                    in_flight = (future, batch_keys)
+
+                if in_flight is not None:
+                    written += self._collect_write(per_document, *in_flight)
+
+            logger.info(f"Successfully ingested {written} document chunks")
+            succeeded = True
+            return {
+                "status": "success",
+                "message": f"Ingested {written} document chunks",
+                "count": written,
+                "near_duplicates": linked,
+                "ids": ids,
+                "documents": per_document
+            }
+
+        except Exception as e:
+            logger.error(f"Error ingesting documents after {written} chunk(s): {str(e)}")
+            return {
+                "status": "failed",
+                "message": str(e),
+                "count": written
+            }
+        finally:
+            # Chunks already written stay, as the partial count reports
+            self._end_ingest(publish=written > 0)
+            if written:
+                self._adjust_count(written)
+            if self.near_duplicates is not None:
+                self.near_duplicates.commit(None if succeeded else self._stored_ids(ids))
+            if not succeeded and created_doc_ids:
+                self._forget_unwritten_documents(created_doc_ids)
+
+    def _normalize_metadatas(
+        self,
+        metadatas: List[dict],
+        doc_ids: Dict[str, int],
+        created: Optional[Set[int]] = None
+    ) -> List[dict]:
+        """
+        Replace each chunk's document fields with the document's catalog id.
+
+        Args:
+            metadatas: Chunk metadata as given to ingest_documents
+            doc_ids: Doc ids already registered by this ingest, by encoded fields
+            created: Collects the doc ids whose catalog rows this call created
+
+        Returns:
+            Metadata to store (`doc_id`, `chunk_index` and any other chunk fields)
+        """
+        normalized = []
+        for metadata in metadatas:
+            document, chunk = split_metadata(metadata)
+            if document:
+                key = json.dumps(document, sort_keys=True)
+                if key not in doc_ids:
+                    doc_ids[key] = self.catalog.register(self.collection_name, document, created)
+                chunk["doc_id"] = doc_ids[key]
+            normalized.append(chunk)
+        return normalized
+
+    def _forget_unwritten_documents(self, doc_ids: Set[int]) -> None:
+        """Remove catalog rows a failed ingest created but wrote no chunks for."""
+        try:
+            unwritten = [doc_id for doc_id in doc_ids if not self._ids_where("doc_id", doc_id, limit=1)]
+            if unwritten:
+                self.catalog.remove_ids(unwritten)
+                logger.info(f"Removed {len(unwritten)} catalog row(s) of a failed ingest")
+        except Exception as e:
+            logger.error(f"Error removing catalog rows of a failed ingest: {str(e)}")
+
+    def _join_documents(self, metadatas: List[dict]) -> List[dict]:
+        """Merge the catalog's document fields into stored chunk metadata (one lookup, usually from memory)."""
+        doc_ids = [metadata["doc_id"] for metadata in metadatas if "doc_id" in metadata]
+        if not doc_ids:
+            return metadatas
+        documents = self.catalog.lookup(doc_ids)
+        return [
+            {**documents.get(metadata["doc_id"], {}), **metadata} if "doc_id" in metadata else metadata
+            for metadata in metadatas
+        ]
+
+    def _chunk_ids(
+        self,
+        source: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[str]:
+        """Ids of the chunks of a document, by source name or content hash."""
+        ids: List[str] = []
+        for doc_id in self.catalog.doc_ids(self.collection_name, source=source, content_hash=content_hash):
+            ids.extend(self._ids_where("doc_id", doc_id, limit=limit))
+            if limit and len(ids) >= limit:
+                return ids[:limit]
+        # Chunks written before the catalog carry their document fields inline
+        field, value = ("source", source) if source is not None else ("content_hash", content_hash)
+        ids.extend(self._ids_where(field, value, limit=limit))
+        return ids[:limit] if limit else ids
+
+    def _stored_ids(self, ids: List[str]) -> Set[str]:
+        """The subset of ids present in the collection, looked up in batches."""
+        stored: Set[str] = set()
+        for start in range(0, len(ids), self.batch_size):
+            stored.update(self._existing_ids(ids[start:start + self.batch_size]))
+        return stored
+
+    def _link_near_duplicates(
+        self,
+        ids: List[str],
+        prepared: Dict[str, tuple[str, dict]],
+        per_document: Dict[str, Dict[str, Any]]
+    ) -> List[str]:
+        """
+        Link chunks that near-duplicate another document's chunk instead of embedding them.
+
+        Chunks are checked in order, so duplicates between documents of the
+        same ingest are caught as well.
+
+        Returns:
+            Ids still to embed (registered as canonical chunks)
+        """
+        index = self.near_duplicates
+        remaining = []
+        for chunk_id in ids:
+            text, metadata = prepared[chunk_id]
+            if index.is_linked(chunk_id):
+                per_document[document_key(metadata)]["near_duplicates"] += 1
+                continue
+            signature = index.signature(text)
+            if signature is None:
+                remaining.append(chunk_id)
+                continue
+            source = metadata.get("source", "document")
+            match = index.find(signature, source)
+            if match is None:
+                index.add(chunk_id, source, signature)
+                remaining.append(chunk_id)
+            else:
+                index.link(chunk_id, match[0], match[1], text, metadata)
+                per_document[document_key(metadata)]["near_duplicates"] += 1
+        return remaining
+
+    @staticmethod
+    def _attribute(per_document: Dict[str, Dict[str, Any]], keys: List[str], field: str, seconds: float) -> None:
+        """Split a batch's time across its documents by chunk count."""
+        share = seconds / len(keys)
+        for key in keys:
+            per_document[key][field] += share
+
+    def _count_tokens(self, per_document: Dict[str, Dict[str, Any]], keys: List[str], texts: List[str]) -> None:
+        """
+        Record token counts and chunks longer than the model's input limit.
+
+        Over-long chunks are silently truncated by the encoder, so their
+        tail never reaches the index. Skipped when ingest reports are off
+        or the model has no tokenizer.
+        """
+        tokenizer = getattr(self.embedding_model, "tokenizer", None)
+        if not Config.INGEST_REPORTS_ENABLED or tokenizer is None:
+            return
+        try:
+            encoded = tokenizer(texts, add_special_tokens=True, truncation=False)["input_ids"]
+        except Exception as e:
+            logger.debug(f"Token counting failed: {str(e)}")
+            return
+        max_tokens = getattr(self.embedding_model, "max_seq_length", None)
+        for key, input_ids in zip(keys, encoded):
+            per_document[key]["tokens"] += len(input_ids)
+            if max_tokens and len(input_ids) > max_tokens:
+                per_document[key]["truncated_chunks"] += 1
+
+    def _timed_write(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        texts: List[str],
+        metadatas: List[dict]
+    ) -> Tuple[int, float]:
+        """Run _write_batch, returning (chunks written, seconds)."""
+        start = time.perf_counter()
+        written = self._write_batch(ids, embeddings, texts, metadatas)
+        return written, time.perf_counter() - start
+
+    def _collect_write(self, per_document: Dict[str, Dict[str, Any]], future: Future, keys: List[str]) -> int:
+        """Wait for a batch write and attribute its time and chunks to documents."""
+        written, seconds = future.result()
+        self._attribute(per_document, keys, "write_seconds", seconds)
+        for key in keys:
+            per_document[key]["chunks_written"] += 1
+        return written
+
+    @profiled
+    def _write_batch(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        texts: List[str],
+        metadatas: List[dict]
+    ) -> int:
+        """
+        Upsert one pre-embedded batch, retrying transient failures.
+
+        Embeddings are computed once by the caller and reused across
+        retries.
+
+        Returns:
+            Number of chunks written
+        """
+        attempts = max(1, Config.INGEST_WRITE_RETRIES + 1)
+        for attempt in range(1, attempts + 1):
+            try:
+                logger.info(f"Upserting {len(ids)} documents into collection...")
+                with self._write_seconds.time():
+                    self._upsert(ids, embeddings, texts, metadatas)
+                return len(ids)
+            except Exception as e:
+                if attempt == attempts:
+                    raise
+                delay = Config.INGEST_RETRY_BACKOFF * (2 ** (attempt - 1))
+                logger.warning(
+                    f"Batch write failed (attempt {attempt}/{attempts}): {str(e)}; retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+        return 0
+
+    def delete_document(self, source: str) -> int:
+        """
+        Delete every chunk belonging to one source document.
+
+        Other documents' near-duplicates of the deleted chunks are ingested
+        again in their own right.
+
+        Args:
+            source: Source filename recorded in chunk metadata
+
+        Returns:
+            Number of chunks deleted (including linked near-duplicates)
+        """
+        try:
+            ids = self._chunk_ids(source=source)
+            if ids:
+                self._delete_ids(ids)
+                self._adjust_count(-len(ids))
+            self.catalog.remove(self.collection_name, source)
+            linked = self._forget_near_duplicates(ids, source)
+            logger.info(f"Deleted {len(ids)} chunk(s) and {linked} near-duplicate link(s) for '{source}'")
+            return len(ids) + linked
+        except Exception as e:
+            logger.error(f"Error deleting document {source}: {str(e)}")
+            raise
+
+    def rename_document(self, source: str, new_source: str) -> int:
+        """
+        Hand a document's chunks over to another source name.
+
+        Used when the name a document was uploaded under goes away while
+        another name still refers to the same content, so the chunks stay
+        searchable and are deleted with that name instead. Chunks stored
+        before the catalog keep their inline source.
+
+        Args:
+            source: Current source name
+            new_source: Source name taking the document over
+
+        Returns:
+            Number of document versions renamed
+        """
+        renamed = self.catalog.rename_source(self.collection_name, source, new_source)
+        if self.near_duplicates is not None:
+            self.near_duplicates.rename_source(source, new_source)
+        if renamed:
+            logger.info(f"Document '{source}' is now owned by '{new_source}'")
+        return renamed
+
+    def replace_document(
+        self,
+        source: str,
+        documents: List[tuple[str, dict]]
+    ) -> Dict[str, Any]:
+        """
+        Replace the chunks of one source document.
+
+        New chunks are upserted first, then stale chunks of the same source
+        that are not part of the new version are deleted, so searches never
+        see the document missing. Replacing a document with identical
+        content embeds nothing.
+
+        Args:
+            source: Source filename recorded in chunk metadata
+            documents: New (text, metadata) tuples for the document
+
+        Returns:
+            Dictionary with ingestion statistics plus `removed`
+        """
+        result = self.ingest_documents(documents)
+        if result["status"] != "success":
+            return result
+
+        try:
+            keep = set(result["ids"])
+            stale = [chunk_id for chunk_id in self._chunk_ids(source=source) if chunk_id not in keep]
+            if stale:
+                self._delete_ids(stale)
+                self._adjust_count(-len(stale))
+            versions = {}
+            for _, metadata in documents:
+                fields = split_metadata(metadata)[0]
+                versions[json.dumps(fields, sort_keys=True)] = fields
+            current = {self.catalog.find(self.collection_name, fields) for fields in versions.values()}
+            self.catalog.remove(self.collection_name, source, keep=current - {None})
+            self._forget_near_duplicates(stale, source, keep)
+            logger.info(f"Replaced '{source}': {result['count']} new chunk(s), {len(stale)} removed")
+            return {**result, "removed": len(stale)}
+        except Exception as e:
+            logger.error(f"Error replacing document {source}: {str(e)}")
+            return {"status": "failed", "message": str(e), "count": 0}
+
+    def _forget_near_duplicates(self, ids: List[str], source: str, keep: Set[str] = frozenset()) -> int:
+        """
+        Drop deleted chunks and the source's stale links from the near-duplicate index.
+
+        Duplicates (from other documents) of the deleted chunks are re-ingested.
+
+        Returns:
+            Number of the source's links removed
+        """
+        if self.near_duplicates is None:
+            return 0
+        linked, restored = self.near_duplicates.remove(ids, source=source, keep=keep)
+        if restored:
+            result = self.ingest_documents(restored)
+            if result["status"] != "success":
+                logger.error(f"Re-ingesting {len(restored)} orphaned near-duplicate(s) failed: {result['message']}")
+        return linked
+
+    @profiled
+    def query_similar_documents(
+        self,
+        query: str,
+        top_k: int = 5,
+        diversify: Optional[bool] = None,
+        mmr_lambda: Optional[float] = None,
+        max_per_source: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the vector store for similar documents.
+
+        Args:
+            query: Query string
+            top_k: Number of top results to return
+            diversify, mmr_lambda, max_per_source: Result diversification
+                (see query_by_embedding)
+
+        Returns:
+            List of similar documents with scores
+        """
+
+        with traced("vector_store.query_similar_documents", timing_key="retrieval", top_k=top_k):
+            try:
+                # Generate query embedding (encode returns array; make plain list)
+                with traced("vector_store.embed_query", timing_key="embed_query"):
+                    query_embedding = self.embedding_model.encode([query])
+                try:
+                    query_embedding = query_embedding.tolist()[0]
+                except Exception:
+                    query_embedding = list(query_embedding)[0]
+
+                return self.query_by_embedding(
+                    query_embedding,
+                    top_k=top_k,
+                    diversify=diversify,
+                    mmr_lambda=mmr_lambda,
+                    max_per_source=max_per_source
+                )
+
+            except Exception as e:
+                logger.error(f"Error querying documents: {str(e)}")
+                return []
+
+    def query_by_embedding(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        diversify: Optional[bool] = None,
+        mmr_lambda: Optional[float] = None,
+        max_per_source: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the vector store with a pre-computed embedding.
+
+        With diversification, top_k * MMR_FETCH_FACTOR candidates are
+        fetched with their embeddings in the same store call and the
+        results are picked from them by maximal marginal relevance
+        (utils.diversity), at most `max_per_source` per source document.
+
+        Args:
+            query_embedding: Query vector
+            top_k: Number of top results to return
+            diversify: Re-rank by MMR (defaults to Config.MMR_ENABLED)
+            mmr_lambda: Relevance weight against novelty, 0-1 (defaults to Config.MMR_LAMBDA)
+            max_per_source: Most results from one source, 0 for no cap
+                (defaults to Config.MAX_CHUNKS_PER_SOURCE)
+
+        Returns:
+            List of similar documents with scores
+        """
+        diversify = Config.MMR_ENABLED if diversify is None else diversify
+        max_per_source = Config.MAX_CHUNKS_PER_SOURCE if max_per_source is None else max_per_source
+        rerank = diversify or max_per_source > 0
+        fetch_k = top_k * max(1, Config.MMR_FETCH_FACTOR) if rerank else top_k
+
+        with traced("vector_store.search", timing_key="vector_search", backend=self.backend_name) as span:
+            start = time.perf_counter()
+            hits = self._search(query_embedding, fetch_k, with_embeddings=rerank)
+            self._query_seconds.observe(time.perf_counter() - start)
+            span.set_attribute("results", len(hits))
+        metadatas = self._join_documents([hit[2] for hit in hits])
+
+        if rerank and hits:
+            with traced("vector_store.diversify", timing_key="diversify", candidates=len(hits)):
+                selected = mmr_select(
+                    [hit[4] for hit in hits],
+                    [1 - hit[3] for hit in hits],
+                    top_k,
+                    mmr_lambda=(Config.MMR_LAMBDA if mmr_lambda is None else mmr_lambda) if diversify else 1.0,
+                    sources=[metadata.get("source", metadata.get("doc_id")) for metadata in metadatas],
+                    max_per_source=max_per_source
+                )
+            hits = [hits[index] for index in selected]
+            metadatas = [metadatas[index] for index in selected]
+
+        # Format results
+        formatted_results = []
+        for idx, ((chunk_id, doc, _, distance, *_), metadata) in enumerate(zip(hits, metadatas)):
+            # Convert distance to similarity (for cosine, 1 - distance)
+            similarity = 1 - distance
+
+            formatted_results.append({
+                "id": chunk_id,
+                "rank": idx + 1,
+                "document": doc,
+                "metadata": metadata,
+                "similarity": round(similarity, 4),
+                "distance": round(distance, 4)
+            })
+
+        logger.info(f"Query returned {len(formatted_results)} results")
+        return formatted_results
+
+    def get_chunks(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch stored chunks by id, with their document fields.
+
+        Args:
+            ids: Chunk ids (e.g. from search results)
+
+        Returns:
+            One {"id", "document", "metadata"} dict per stored id, in the
+            order requested; unknown ids are left out
+        """
+        hits = {chunk_id: (document, metadata) for chunk_id, document, metadata in self._get_chunks(ids)}
+        found = [chunk_id for chunk_id in dict.fromkeys(ids) if chunk_id in hits]
+        metadatas = self._join_documents([hits[chunk_id][1] for chunk_id in found])
+        return [
+            {"id": chunk_id, "document": hits[chunk_id][0], "metadata": metadata}
+            for chunk_id, metadata in zip(found, metadatas)
+        ]
+
+    def get_document_ids(self, content_hash: str) -> List[str]:
+        """
+        Get the chunk ids stored for a document.
+
+        Args:
+            content_hash: Content hash of the source PDF
+
+        Returns:
+            List of chunk ids (empty if the document is not ingested)
+        """
+        try:
+            return self._chunk_ids(content_hash=content_hash)
+        except Exception as e:
+            logger.error(f"Error looking up document {content_hash}: {str(e)}")
+            return []
+
+    def has_document(self, content_hash: str) -> bool:
+        """
+        Check whether a document with the given content hash is ingested.
+
+        Args:
+            content_hash: Content hash of the source PDF
+
+        Returns:
+            True if at least one chunk references the hash
+        """
+        try:
+            if self.near_duplicates is not None and self.near_duplicates.has_document(content_hash):
+                return True
+            return bool(self._chunk_ids(content_hash=content_hash, limit=1))
+        except Exception as e:
+            logger.error(f"Error looking up document {content_hash}: {str(e)}")
+            return False
+
+    def list_documents(self) -> List[dict]:
+        """
+        List the source documents in the collection.
+
+        Returns:
+            Document fields (source, content hash, file path, chunker
+            settings, doc id) of the newest version of each source; documents
+            whose first chunk was linked as a near-duplicate count too
+        """
+        documents: Dict[str, dict] = {
+            fields["source"]: fields for fields in self.catalog.list_documents(self.collection_name)
+        }
+        # Chunks written before the catalog carry their document fields inline
+        for metadata in self._metadatas_where("chunk_index", 0):
+            if "source" in metadata:
+                documents.setdefault(metadata["source"], metadata)
+        if self.near_duplicates is not None:
+            for metadata in self.near_duplicates.first_chunks():
+                documents.setdefault(metadata.get("source", "document"), metadata)
+        return [documents[source] for source in sorted(documents)]
+
+    def rebuild_index(self, **index_params: Any) -> Dict[str, Any]:
+        """Re-index the collection; backends without a tunable index report success."""
+        return {"status": "success", "collection_name": self.collection_name, "count": self.count()}
+
+    def refresh(self) -> None:
+        """
+        Pick up writes made by another process.
+
+        Backends that read live only need their counter re-read, which the
+        next `count()` schedules, cached document fields dropped and the
+        near-duplicate index checked for a rewritten log.
+        """
+        self.catalog.invalidate()
+        if self.near_duplicates is not None:
+            self.near_duplicates.refresh()
+        with self._count_lock:
+            self._count_reconciled_at = 0.0
+
+    def get_collection_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the current collection.
+
+        Returns:
+            Dictionary with collection statistics
+        """
+        try:
+            return {
+                "collection_name": self.collection_name,
+                "document_count": self.count(),
+                "embedding_model": self.embedding_dimension,
+                "backend": self.backend_name
+            }
+        except Exception as e:
+            logger.error(f"Error getting collection stats: {str(e)}")
+            return {}
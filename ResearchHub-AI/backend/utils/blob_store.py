@@ -0,0 +1,221 @@
+"""
+Blob Store Module
+Content-addressed storage for uploaded PDFs with a per-workspace
+filename-to-hash index.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Read size used when hashing files from disk
+HASH_READ_SIZE = 1024 * 1024
+
+
+def hash_bytes(content: bytes) -> str:
+    """Return the SHA-256 hex digest of an in-memory payload."""
+    return hashlib.sha256(content).hexdigest()
+
+
+def hash_file(file_path: str) -> str:
+    """Return the SHA-256 hex digest of a file, streamed from disk."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """
+    Content-addressed PDF storage.
+
+    Features:
+    - Store each distinct PDF exactly once, keyed by its SHA-256 hash
+    - Map uploaded filenames to content hashes, separately per workspace
+    - Reference-count (workspace, name) pairs per blob; a blob is deleted
+      with its last name in any workspace
+    - Persist the name index as JSON next to the blobs
+    """
+
+    def __init__(self, data_dir: str):
+        """
+        Initialize BlobStore.
+
+        Args:
+            data_dir: Data directory; blobs are kept in its `blobs` subfolder
+        """
+        self.root = Path(data_dir).resolve() / "blobs"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.json"
+
+        self._lock = threading.Lock()
+        # workspace -> name -> content hash
+        self._names: Dict[str, Dict[str, str]] = self._load_index()
+        self._refcounts: Counter = Counter(
+            content_hash for names in self._names.values() for content_hash in names.values()
+        )
+        logger.info(f"BlobStore initialized at {self.root} ({sum(self._refcounts.values())} names)")
+
+    def _load_index(self) -> Dict[str, Dict[str, str]]:
+        """Load the workspace -> name -> hash index from disk."""
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading blob index {self.index_path}: {str(e)}")
+            return {}
+
+        # Indexes written before workspaces were tracked map name -> hash;
+        # those uploads all went to the default workspace
+        legacy = {name: value for name, value in index.items() if isinstance(value, str)}
+        if legacy:
+            index = {name: value for name, value in index.items() if isinstance(value, dict)}
+            index.setdefault(Config.DEFAULT_WORKSPACE, {}).update(legacy)
+        return index
+
+    def _save_index(self) -> None:
+        """Atomically write the workspace -> name -> hash index to disk."""
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._names, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def blob_path(self, content_hash: str) -> Path:
+        """Return the on-disk location of a blob."""
+        return self.root / content_hash[:2] / f"{content_hash}.pdf"
+
+    def exists(self, content_hash: str) -> bool:
+        """Check whether a blob with the given hash is stored."""
+        return self.blob_path(content_hash).exists()
+
+    def put(self, content: bytes, name: str, workspace: str = Config.DEFAULT_WORKSPACE) -> Tuple[str, Path, bool]:
+        """
+        Store a PDF payload and record its name.
+
+        Args:
+            content: Raw PDF bytes
+            name: Sanitized filename the payload was uploaded as
+            workspace: Workspace the name belongs to
+
+        Returns:
+            Tuple of (content_hash, blob_path, created) where `created` is
+            False if an identical blob was already stored
+        """
+        content_hash = hash_bytes(content)
+        path = self.blob_path(content_hash)
+        created = False
+
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".part")
+                with open(tmp_path, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+                created = True
+
+            if self._names.get(workspace, {}).get(name) != content_hash:
+                self._set_name(workspace, name, content_hash)
+                self._save_index()
+
+        return content_hash, path, created
+
+    def _set_name(self, workspace: str, name: str, content_hash: Optional[str]) -> Optional[str]:
+        """Point (or with None, unpoint) a name, keeping the refcounts; returns the old hash."""
+        names = self._names.setdefault(workspace, {})
+        previous = names.pop(name, None)
+        if previous is not None:
+            self._refcounts[previous] -= 1
+            if self._refcounts[previous] <= 0:
+                del self._refcounts[previous]
+        if content_hash is not None:
+            names[name] = content_hash
+            self._refcounts[content_hash] += 1
+        elif not names:
+            del self._names[workspace]
+        return previous
+
+    def _release(self, content_hashes) -> None:
+        """Delete the blobs no name refers to any more (caller holds the lock)."""
+        for content_hash in content_hashes:
+            if not self._refcounts[content_hash]:
+                self.blob_path(content_hash).unlink(missing_ok=True)
+
+    def remove(self, name: str, workspace: str = Config.DEFAULT_WORKSPACE) -> Optional[str]:
+        """
+        Forget a filename, deleting its blob once no other name refers to it.
+
+        Args:
+            name: Filename to remove from the index
+            workspace: Workspace the name belongs to
+
+        Returns:
+            The content hash the name pointed to, or None if unknown
+        """
+        with self._lock:
+            content_hash = self._set_name(workspace, name, None)
+            if content_hash is None:
+                return None
+            self._save_index()
+            self._release([content_hash])
+        return content_hash
+
+    def remove_workspace(self, workspace: str) -> int:
+        """
+        Forget every filename of a workspace (e.g. after clearing it).
+
+        Returns:
+            Number of names removed
+        """
+        with self._lock:
+            names = self._names.get(workspace, {})
+            removed = [self._set_name(workspace, name, None) for name in list(names)]
+            if removed:
+                self._save_index()
+                self._release(set(removed))
+        return len(removed)
+
+    def link(self, name: str, content_hash: str, workspace: str = Config.DEFAULT_WORKSPACE) -> None:
+        """
+        Point a filename at an already stored blob (e.g. to restore the
+        previous version after a failed replace).
+
+        Args:
+            name: Filename to record
+            content_hash: Hash of a stored blob
+            workspace: Workspace the name belongs to
+        """
+        with self._lock:
+            if not self.blob_path(content_hash).exists():
+                raise FileNotFoundError(f"No blob stored for {content_hash}")
+            self._set_name(workspace, name, content_hash)
+            self._save_index()
+
+    def resolve(self, name: str, workspace: str = Config.DEFAULT_WORKSPACE) -> Optional[str]:
+        """Return the content hash recorded for a filename in a workspace, if any."""
+        with self._lock:
+            return self._names.get(workspace, {}).get(name)
+
+    def names_for(self, content_hash: str, workspace: str = Config.DEFAULT_WORKSPACE) -> List[str]:
+        """Return every filename in a workspace that maps to the given content hash."""
+        with self._lock:
+            return sorted(name for name, h in self._names.get(workspace, {}).items() if h == content_hash)
+
+    def refcount(self, content_hash: str) -> int:
+        """Return how many filenames, across all workspaces, refer to a blob."""
+        with self._lock:
+            return self._refcounts[content_hash]
@@ -0,0 +1,90 @@
+"""
+Diversity Module
+Maximal-marginal-relevance selection of search results.
+
+Chunks overlap (see chunk_overlap), so the nearest neighbours of a query
+are often consecutive chunks of one paper repeating each other. The store
+over-fetches candidates with their embeddings and this module picks the
+final results: each step takes the candidate that is relevant to the query
+but least similar to what was already picked, optionally with at most
+`max_per_source` chunks from any one source document.
+"""
+
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+
+
+def validate_diversity(mmr_lambda: Optional[float] = None, max_per_source: Optional[int] = None) -> None:
+    """
+    Check per-request diversity settings.
+
+    Raises:
+        ValueError: If `mmr_lambda` is outside [0, 1] or `max_per_source` is negative
+    """
+    if mmr_lambda is not None and not 0.0 <= mmr_lambda <= 1.0:
+        raise ValueError(f"mmr_lambda must be between 0 and 1, got {mmr_lambda}")
+    if max_per_source is not None and max_per_source < 0:
+        raise ValueError(f"max_per_source must be 0 (no cap) or more, got {max_per_source}")
+
+
+def mmr_select(
+    embeddings: Sequence[Sequence[float]],
+    relevance: Sequence[float],
+    k: int,
+    mmr_lambda: float = 0.5,
+    sources: Optional[Sequence[Any]] = None,
+    max_per_source: int = 0
+) -> List[int]:
+    """
+    Pick up to `k` candidates by maximal marginal relevance.
+
+    The candidate-candidate cosine similarities are one matrix product;
+    each step then only updates every candidate's similarity to its
+    nearest selected result.
+
+    Args:
+        embeddings: Candidate embeddings, one row per candidate
+        relevance: Cosine similarity of each candidate to the query
+        k: Number of results to select
+        mmr_lambda: Weight of relevance against novelty (1.0 ranks by
+            relevance alone, applying only the per-source cap)
+        sources: Source document of each candidate (for the cap)
+        max_per_source: Most results taken from one source; 0 for no cap
+
+    Returns:
+        Indexes of the selected candidates, in selection order (fewer than
+        `k` when the cap excludes the rest)
+    """
+    count = len(relevance)
+    if count == 0 or k <= 0:
+        return []
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    vectors = np.asarray(embeddings, dtype=np.float32).reshape(count, -1)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = vectors @ vectors.T
+
+    if sources is not None and max_per_source > 0:
+        _, source_codes = np.unique(np.asarray([str(source) for source in sources]), return_inverse=True)
+        taken = np.zeros(source_codes.max() + 1, dtype=np.int32)
+    else:
+        source_codes = None
+
+    available = np.ones(count, dtype=bool)
+    # Similarity to the closest result selected so far (none yet)
+    redundancy = np.zeros(count, dtype=np.float32)
+    selected: List[int] = []
+    while len(selected) < k and available.any():
+        scores = mmr_lambda * relevance - (1.0 - mmr_lambda) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        if source_codes is not None:
+            code = source_codes[best]
+            taken[code] += 1
+            if taken[code] >= max_per_source:
+                available[source_codes == code] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return selected
@@ -0,0 +1,303 @@
+"""
+Document Catalog Module
+SQLite table of ingested documents, referenced from chunks by integer id.
+
+Per-document facts (source name, content hash, file path, type, chunker
+settings) used to be copied into the metadata of every chunk. The catalog
+keeps them once per document version; chunks only carry `doc_id` and
+`chunk_index`, and results are joined back to their document in one
+batched lookup. Document-level operations (find by source or hash, list,
+delete) become indexed queries instead of scans over chunk metadata.
+
+A row is one version of a document: a new upload or re-chunk of the same
+source gets a new row, so chunks of the outgoing version keep joining to
+their own facts until they are deleted. Renaming a version onto one the
+new name already has merges the two rows; the merged-away doc id stays
+an alias, since chunks may still carry it.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = "document_catalog.sqlite3"
+# Metadata fields stored once per document; anything else stays on the chunk
+DOCUMENT_FIELDS = (
+    "source", "content_hash", "file_path", "document_type",
+    "chunker_version", "chunk_size", "chunk_overlap", "cleaning",
+)
+# SQLite's default limit on host parameters is 999 in older builds
+MAX_QUERY_PARAMS = 900
+
+
+def split_metadata(metadata: dict) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Split chunk metadata into (document fields, chunk fields).
+
+    Metadata without a source has no document and is kept whole on the
+    chunk. A `doc_id` carried over from a listing is dropped; the store
+    assigns it.
+    """
+    if not isinstance(metadata, dict) or "source" not in metadata:
+        return {}, dict(metadata or {})
+    document = {field: metadata[field] for field in DOCUMENT_FIELDS if field in metadata}
+    chunk = {
+        field: value for field, value in metadata.items()
+        if field not in DOCUMENT_FIELDS and field != "doc_id"
+    }
+    return document, chunk
+
+
+class DocumentCatalog:
+    """
+    Documents of every collection under one vector database root.
+
+    Features:
+    - Integer doc id per document version, unique per collection
+    - Indexed lookups by source and content hash
+    - Merged document versions keep their doc id as an alias
+    - Batched id -> document fields lookup for joining results, served
+      from memory once a doc id was looked up (searches skip SQLite)
+    - WAL mode, so reader processes query while the writer inserts
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize DocumentCatalog.
+
+        Args:
+            db_path: Vector database root; the catalog is `document_catalog.sqlite3` in it
+        """
+        self.path = Path(db_path).resolve() / CATALOG_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # doc id -> fields; a version's fields only change when its source is
+        # renamed, and doc ids are never reused (AUTOINCREMENT)
+        self._fields_cache: Dict[int, Dict[str, Any]] = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    collection TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    content_hash TEXT,
+                    fields TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    UNIQUE (collection, fields)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS documents_source ON documents (collection, source)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS documents_hash ON documents (collection, content_hash)"
+            )
+            # Doc ids of versions merged into another row by rename_source
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS aliases (doc_id INTEGER PRIMARY KEY, target INTEGER NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS aliases_target ON aliases (target)")
+
+    @staticmethod
+    def _encode(fields: Dict[str, Any]) -> str:
+        return json.dumps(fields, sort_keys=True, separators=(",", ":"))
+
+    def register(self, collection: str, fields: Dict[str, Any], created: Optional[Set[int]] = None) -> int:
+        """
+        Get the doc id of a document version, creating its row if needed.
+
+        Args:
+            collection: Collection the document is ingested into
+            fields: Document fields from `split_metadata`
+            created: Set the doc id is added to when the row is new, so a
+                failed ingest can take back the rows it created
+
+        Returns:
+            Integer doc id
+        """
+        encoded = self._encode(fields)
+        with self._lock, self._conn:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO documents (collection, source, content_hash, fields, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (collection, fields["source"], fields.get("content_hash"), encoded, time.time())
+            ).rowcount
+            row = self._conn.execute(
+                "SELECT doc_id FROM documents WHERE collection = ? AND fields = ?", (collection, encoded)
+            ).fetchone()
+        if inserted and created is not None:
+            created.add(int(row[0]))
+        return int(row[0])
+
+    def find(self, collection: str, fields: Dict[str, Any]) -> Optional[int]:
+        """Doc id of a document version, or None if it was never registered."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc_id FROM documents WHERE collection = ? AND fields = ?",
+                (collection, self._encode(fields))
+            ).fetchone()
+        return int(row[0]) if row else None
+
+    def lookup(self, doc_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Document fields of many doc ids.
+
+        Ids seen before are answered from memory; the rest take one query
+        per 900 ids.
+
+        Returns:
+            Mapping of doc id to document fields (unknown ids are missing;
+            the dicts are shared, so do not modify them)
+        """
+        found: Dict[int, Dict[str, Any]] = {}
+        missing: List[int] = []
+        with self._lock:
+            for doc_id in dict.fromkeys(doc_ids):
+                fields = self._fields_cache.get(doc_id)
+                if fields is None:
+                    missing.append(doc_id)
+                else:
+                    found[doc_id] = fields
+            for start in range(0, len(missing), MAX_QUERY_PARAMS):
+                batch = missing[start:start + MAX_QUERY_PARAMS]
+                rows = self._conn.execute(
+                    f"SELECT doc_id, fields FROM documents WHERE doc_id IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                rows += self._conn.execute(
+                    "SELECT aliases.doc_id, documents.fields FROM aliases JOIN documents "
+                    f"ON documents.doc_id = aliases.target WHERE aliases.doc_id IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+                for doc_id, fields in rows:
+                    found[doc_id] = self._fields_cache[doc_id] = json.loads(fields)
+        return found
+
+    def invalidate(self) -> None:
+        """Forget looked-up fields (after another process renamed or removed documents)."""
+        with self._lock:
+            self._fields_cache.clear()
+
+    def doc_ids(self, collection: str, source: Optional[str] = None, content_hash: Optional[str] = None) -> List[int]:
+        """Doc ids (and aliases) of the versions of a document, by source name or content hash."""
+        column, value = ("source", source) if source is not None else ("content_hash", content_hash)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT doc_id FROM documents WHERE collection = ? AND {column} = ? "
+                "UNION SELECT aliases.doc_id FROM aliases JOIN documents ON documents.doc_id = aliases.target "
+                f"WHERE documents.collection = ? AND documents.{column} = ? ORDER BY doc_id",
+                (collection, value, collection, value)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def list_documents(self, collection: str) -> List[Dict[str, Any]]:
+        """Fields of the newest version of each source in a collection, by source name."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc_id, fields FROM documents WHERE doc_id IN "
+                "(SELECT MAX(doc_id) FROM documents WHERE collection = ? GROUP BY source) ORDER BY source",
+                (collection,)
+            ).fetchall()
+        return [{**json.loads(fields), "doc_id": doc_id} for doc_id, fields in rows]
+
+    def remove(self, collection: str, source: str, keep: Iterable[int] = ()) -> int:
+        """
+        Forget the versions of a document.
+
+        Args:
+            collection: Collection of the document
+            source: Source name
+            keep: Doc ids to keep (the current version during a replace)
+
+        Returns:
+            Number of rows removed
+        """
+        keep = list(keep)
+        where = "collection = ? AND source = ?"
+        if keep:
+            where += f" AND doc_id NOT IN ({','.join('?' * len(keep))})"
+        with self._lock, self._conn:
+            self._fields_cache.clear()
+            self._conn.execute(
+                f"DELETE FROM aliases WHERE target IN (SELECT doc_id FROM documents WHERE {where})",
+                (collection, source, *keep)
+            )
+            return self._conn.execute(f"DELETE FROM documents WHERE {where}", (collection, source, *keep)).rowcount
+
+    def rename_source(self, collection: str, source: str, new_source: str) -> int:
+        """
+        Record the versions of a document under another source name.
+
+        A version the new name already has a row for is merged into that
+        row: its own row is deleted and its doc id (with any aliases of
+        it) becomes an alias of the surviving one.
+
+        Returns:
+            Number of versions renamed or merged
+        """
+        with self._lock, self._conn:
+            self._fields_cache.clear()
+            rows = self._conn.execute(
+                "SELECT doc_id, fields FROM documents WHERE collection = ? AND source = ?", (collection, source)
+            ).fetchall()
+            for doc_id, fields in rows:
+                encoded = self._encode({**json.loads(fields), "source": new_source})
+                existing = self._conn.execute(
+                    "SELECT doc_id FROM documents WHERE collection = ? AND fields = ?", (collection, encoded)
+                ).fetchone()
+                if existing is None:
+                    self._conn.execute(
+                        "UPDATE documents SET source = ?, fields = ? WHERE doc_id = ?", (new_source, encoded, doc_id)
+                    )
+                    continue
+                self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+                self._conn.execute("UPDATE aliases SET target = ? WHERE target = ?", (existing[0], doc_id))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO aliases (doc_id, target) VALUES (?, ?)", (doc_id, existing[0])
+                )
+        return len(rows)
+
+    def remove_ids(self, doc_ids: Iterable[int]) -> int:
+        """Forget document versions by doc id; returns the number of rows removed."""
+        doc_ids = list(doc_ids)
+        removed = 0
+        with self._lock, self._conn:
+            self._fields_cache.clear()
+            for start in range(0, len(doc_ids), MAX_QUERY_PARAMS):
+                batch = doc_ids[start:start + MAX_QUERY_PARAMS]
+                placeholders = ','.join('?' * len(batch))
+                self._conn.execute(f"DELETE FROM aliases WHERE doc_id IN ({placeholders})", batch)
+                self._conn.execute(f"DELETE FROM aliases WHERE target IN ({placeholders})", batch)
+                removed += self._conn.execute(
+                    f"DELETE FROM documents WHERE doc_id IN ({placeholders})", batch
+                ).rowcount
+        return removed
+
+    def clear(self, collection: str) -> None:
+        """Forget every document of a collection."""
+        with self._lock, self._conn:
+            self._fields_cache.clear()
+            self._conn.execute(
+                "DELETE FROM aliases WHERE target IN (SELECT doc_id FROM documents WHERE collection = ?)", (collection,)
+            )
+            self._conn.execute("DELETE FROM documents WHERE collection = ?", (collection,))
+
+    def count(self, collection: str) -> int:
+        """Number of document versions in a collection."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM documents WHERE collection = ?", (collection,)
+            ).fetchone()[0]
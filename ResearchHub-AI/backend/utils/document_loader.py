@@ -5,14 +5,32 @@ Handles PDF loading, text extraction, and document chunking for the research sys
 
 import os
 import logging
-from typing import List, Tuple
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
-from pypdf import PdfReader
+
+from utils.blob_store import hash_file
+from utils.metrics import CHUNKING_SECONDS, PDF_PARSE_SECONDS
+from utils.extraction_sandbox import ExtractionSandbox
+from utils.pdf_extractors import (
+    FALLBACK_EXTRACTOR,
+    ExtractionError,
+    PdfExtractor,
+    extract_with_fallback,
+    extractor_chain,
+)
+from utils.profiling import profiled
+from utils.quarantine import Quarantine
+from utils.text_cache import TextCache
+from utils.text_cleaner import TextCleaner
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump whenever chunk boundaries change so re-chunked documents get new ids
+CHUNKER_VERSION = 1
+
 
 class DocumentLoader:
     """
@@ -20,16 +38,25 @@ class DocumentLoader:
     
     Features:
     - Load PDF files from specified directory
-    - Extract text from PDFs
+    - Extract text from PDFs with a pluggable extractor, falling back to pypdf
+    - Optionally extract in resource-limited worker processes and
+      quarantine PDFs that fail
+    - Optionally strip boilerplate (headers, footers, references) before chunking
     - Chunk documents into manageable pieces
     - Preserve metadata for chunks
+    - Cache extracted page texts so re-chunking skips PDF parsing
     """
     
     def __init__(
         self, 
         data_dir: str = "./data",
         chunk_size: int = 1000,
-        chunk_overlap: int = 200
+        chunk_overlap: int = 200,
+        text_cache: Optional[TextCache] = None,
+        extractor: str = FALLBACK_EXTRACTOR,
+        sandbox: Optional[ExtractionSandbox] = None,
+        quarantine: Optional[Quarantine] = None,
+        cleaner: Optional[TextCleaner] = None
     ):
         """
         Initialize DocumentLoader.
@@ -38,28 +65,50 @@ class DocumentLoader:
             data_dir: Directory containing PDF files
             chunk_size: Maximum number of characters per chunk
             chunk_overlap: Number of overlapping characters between chunks
+            text_cache: Optional cache of extracted page texts
+            extractor: PDF extractor name ("pypdf", "pymupdf" or "pdfium")
+            sandbox: Optional worker pool that extracts out of process
+            quarantine: Optional quarantine for PDFs whose extraction fails
+            cleaner: Optional boilerplate stripping between extraction and chunking
         """
         self.data_dir = Path(data_dir)
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.text_cache = text_cache
+        self.extractors: List[PdfExtractor] = extractor_chain(extractor)
+        self.sandbox = sandbox
+        self.quarantine = quarantine
+        self.cleaner = cleaner
         
         # Create data directory if it doesn't exist
         self.data_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"DocumentLoader initialized with data_dir: {self.data_dir}")
     
-    def load_pdf(self, file_path: str) -> str:
+    @profiled
+    def load_pdf(
+        self,
+        file_path: str,
+        stats: Optional[Dict[str, Any]] = None,
+        content_hash: Optional[str] = None
+    ) -> str:
         """
         Load and extract text from a PDF file.
         
         Args:
             file_path: Path to the PDF file
+            stats: Optional dict filled with `pages`, `empty_pages`,
+                `characters`, `extraction_seconds`, `extractor`, `text_cache`
+                and, with a cleaner, the characters, bytes and time cleaning took
+            content_hash: Content hash of the PDF; when given, page texts
+                are read from and written to the text cache
             
         Returns:
             Extracted text from the PDF
             
         Raises:
             FileNotFoundError: If PDF file doesn't exist
-            Exception: If PDF reading fails
+            ExtractionError: If every extractor failed (or the sandboxed
+                worker timed out, ran out of memory or crashed)
         """
         pdf_path = Path(file_path)
         
@@ -67,15 +116,24 @@ class DocumentLoader:
             raise FileNotFoundError(f"PDF file not found: {file_path}")
         
         try:
-            text = ""
-            pdf_reader = PdfReader(pdf_path)
-            logger.info(f"Loading PDF: {pdf_path.name} ({len(pdf_reader.pages)} pages)")
-            
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                page_text = page.extract_text()
-                if page_text:
-                    text += f"\n--- Page {page_num} ---\n{page_text}"
+            start_time = time.perf_counter()
+            cached = self.cached_pages(content_hash) if content_hash else None
+            cache_hit = cached is not None
+            if cache_hit:
+                pages, extractor = cached
+            else:
+                pages, extractor = self.extract_pages(pdf_path)
+                PDF_PARSE_SECONDS.observe(time.perf_counter() - start_time)
+                if self.text_cache and content_hash:
+                    self._cache_pages(content_hash, extractor, pages)
+            extraction_seconds = time.perf_counter() - start_time
+            text = self._prepare_text(pages, stats)
             
+            if stats is not None:
+                self._page_stats(pages, text, extraction_seconds, stats)
+                stats["extractor"] = extractor.name
+                if self.text_cache and content_hash:
+                    stats["text_cache"] = "hit" if cache_hit else "miss"
             logger.info(f"Successfully extracted text from {pdf_path.name}")
             return text
         
@@ -83,6 +141,99 @@ class DocumentLoader:
             logger.error(f"Error loading PDF {file_path}: {str(e)}")
             raise
     
+    def extract_pages(self, pdf_path: Path) -> Tuple[List[str], PdfExtractor]:
+        """
+        Parse a PDF and return the text of each page.
+        
+        Extractors are tried in order; a failing extractor falls back to
+        the next one (ending with pypdf). With a sandbox, this happens in a
+        worker process under its time and memory limits.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            
+        Returns:
+            Tuple of (one string per page, extractor that produced them)
+            
+        Raises:
+            ExtractionError: If the PDF could not be extracted
+        """
+        if self.sandbox:
+            pages, name = self.sandbox.extract(str(pdf_path))
+            extractor = next((e for e in self.extractors if e.name == name), self.extractors[-1])
+        else:
+            pages, extractor = extract_with_fallback(self.extractors, str(pdf_path))
+        logger.info(f"Loaded PDF: {pdf_path.name} ({len(pages)} pages, {extractor.name})")
+        return pages, extractor
+    
+    @staticmethod
+    def join_pages(pages: List[str]) -> str:
+        """Concatenate page texts with page markers, skipping pages without text."""
+        text = ""
+        for page_num, page_text in enumerate(pages, 1):
+            if page_text:
+                text += f"\n--- Page {page_num} ---\n{page_text}"
+        return text
+    
+    def _prepare_text(self, pages: List[str], stats: Optional[Dict[str, Any]] = None) -> str:
+        """Clean (if configured) and join page texts, recording what cleaning saved."""
+        if not self.cleaner:
+            return self.join_pages(pages)
+        
+        start_time = time.perf_counter()
+        cleaned, cleaning = self.cleaner.clean(pages)
+        text = self.join_pages(cleaned)
+        if stats is not None:
+            raw_text = self.join_pages(pages)
+            stats.update(cleaning)
+            stats["cleaning_seconds"] = time.perf_counter() - start_time
+            stats["raw_characters"] = len(raw_text)
+            stats["cleaning_bytes_saved"] = len(raw_text.encode("utf-8")) - len(text.encode("utf-8"))
+        return text
+    
+    @staticmethod
+    def _page_stats(pages: List[str], text: str, elapsed: float, stats: Dict[str, Any]) -> None:
+        stats.update(
+            pages=len(pages),
+            empty_pages=sum(1 for page_text in pages if not page_text.strip()),
+            characters=len(text),
+            extraction_seconds=elapsed
+        )
+    
+    def cached_pages(self, content_hash: str) -> Optional[Tuple[List[str], PdfExtractor]]:
+        """
+        Read a document's page texts from the text cache.
+        
+        Texts from any extractor in the chain are accepted, preferring the
+        configured one.
+        
+        Args:
+            content_hash: Content hash of the source PDF
+            
+        Returns:
+            Tuple of (page texts, extractor that produced them), or None if
+            caching is off or no entry exists
+        """
+        if not self.text_cache:
+            return None
+        for extractor in self.extractors:
+            try:
+                pages = self.text_cache.get(content_hash, extractor.version)
+            except OSError as e:
+                logger.warning(f"Text cache read failed for {content_hash}: {str(e)}")
+                return None
+            if pages is not None:
+                return pages, extractor
+        return None
+    
+    def _cache_pages(self, content_hash: str, extractor: PdfExtractor, pages: List[str]) -> None:
+        try:
+            self.text_cache.put(content_hash, extractor.version, pages)
+        except OSError as e:
+            # Caching is an optimisation; ingestion goes on without it
+            logger.warning(f"Text cache write failed for {content_hash}: {str(e)}")
+    
+    @profiled
     def chunk_text(self, text: str, metadata: dict = None) -> List[Tuple[str, dict]]:
         """
         Split text into overlapping chunks with metadata preservation.
@@ -98,12 +249,19 @@ class DocumentLoader:
             logger.warning("Empty text provided for chunking")
             return []
         
+        with CHUNKING_SECONDS.time():
+            chunks = self._split(text, metadata or {})
+        
+        logger.info(f"Created {len(chunks)} chunks from text")
+        return chunks
+    
+    def _split(self, text: str, metadata: dict) -> List[Tuple[str, dict]]:
+        """Cut text into overlapping, word-aligned chunks."""
         chunks = []
-        metadata = metadata or {}
         
         # Calculate number of chunks needed
         if len(text) <= self.chunk_size:
-            chunks.append((text, {**metadata, "chunk_index": 0}))
+            chunks.append((text, {**metadata, "chunk_index": 0, **self.chunker_settings()}))
             return chunks
         
         # Create overlapping chunks
@@ -122,20 +280,115 @@ class DocumentLoader:
                     chunk = text[start:end]
             
             if chunk.strip():  # Only add non-empty chunks
-                chunk_metadata = {**metadata, "chunk_index": chunk_index}
+                chunk_metadata = {
+                    **metadata,
+                    "chunk_index": chunk_index,
+                    **self.chunker_settings()
+                }
                 chunks.append((chunk.strip(), chunk_metadata))
                 chunk_index += 1
             
             # Move start position with overlap
             start = end - self.chunk_overlap
         
-        logger.info(f"Created {len(chunks)} chunks from text")
         return chunks
     
-    def load_documents_from_directory(self) -> List[Tuple[str, dict]]:
+    def chunker_settings(self) -> Dict[str, int]:
+        """Chunker version and settings recorded in every chunk's metadata."""
+        return {
+            "chunker_version": CHUNKER_VERSION,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "cleaning": self.cleaner.signature if self.cleaner else "none"
+        }
+    
+    def process_pdf(self, file_path: str, metadata: dict) -> Tuple[List[Tuple[str, dict]], Dict[str, Any]]:
+        """
+        Extract and chunk one PDF, measuring each step.
+        
+        Args:
+            file_path: Path to the PDF file
+            metadata: Document metadata attached to every chunk
+            
+        Returns:
+            Tuple of (chunks, stats) where stats holds the source, size,
+            page and character counts, chunk count and step timings
+        """
+        stats: Dict[str, Any] = {
+            "source": metadata.get("source"),
+            "content_hash": metadata.get("content_hash"),
+            "file_bytes": os.path.getsize(file_path),
+        }
+        text = self.load_pdf(file_path, stats=stats, content_hash=metadata.get("content_hash"))
+        return self._chunk_with_stats(text, metadata, stats)
+    
+    def rechunk_from_cache(self, metadata: dict) -> Optional[Tuple[List[Tuple[str, dict]], Dict[str, Any]]]:
+        """
+        Re-chunk an ingested document from its cached page texts.
+        
+        The PDF itself is never opened, so only chunking (and later
+        embedding) is paid for.
+        
+        Args:
+            metadata: Document metadata; must include `content_hash`
+            
+        Returns:
+            Tuple of (chunks, stats) like process_pdf, or None on a cache miss
+        """
+        content_hash = metadata.get("content_hash")
+        start_time = time.perf_counter()
+        cached = self.cached_pages(content_hash) if content_hash else None
+        if cached is None:
+            return None
+        
+        pages, extractor = cached
+        stats: Dict[str, Any] = {"source": metadata.get("source"), "content_hash": content_hash}
+        extraction_seconds = time.perf_counter() - start_time
+        text = self._prepare_text(pages, stats)
+        self._page_stats(pages, text, extraction_seconds, stats)
+        stats["extractor"] = extractor.name
+        stats["text_cache"] = "hit"
+        return self._chunk_with_stats(text, metadata, stats)
+    
+    def _chunk_with_stats(
+        self,
+        text: str,
+        metadata: dict,
+        stats: Dict[str, Any]
+    ) -> Tuple[List[Tuple[str, dict]], Dict[str, Any]]:
+        start_time = time.perf_counter()
+        chunks = self.chunk_text(text, metadata)
+        stats["chunking_seconds"] = time.perf_counter() - start_time
+        stats["chunks"] = len(chunks)
+        if "raw_characters" in stats:
+            # Estimated rather than chunking the raw text a second time: the
+            # cleaned text's chunks per character, scaled to the raw length
+            raw_characters = stats["raw_characters"]
+            if text:
+                raw_chunks = round(len(chunks) * raw_characters / len(text))
+            else:
+                stride = max(1, self.chunk_size - self.chunk_overlap)
+                raw_chunks = -(-max(0, raw_characters - self.chunk_overlap) // stride)
+            stats["cleaning_chunks_saved"] = max(0, raw_chunks - len(chunks))
+        return chunks, stats
+    
+    def load_documents_from_directory(
+        self,
+        skip_hash: Optional[Callable[[str], bool]] = None,
+        reports: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Tuple[str, dict]]:
         """
         Load all PDF documents from the data directory and chunk them.
         
+        Args:
+            skip_hash: Optional predicate on a file's content hash; files for
+                which it returns True are not parsed (e.g. already ingested)
+            reports: Optional list receiving each processed file's stats from
+                process_pdf (or its `error` if processing failed)
+        
+        PDFs whose extraction fails are moved to the quarantine (when one
+        is configured), so later ingests neither see nor retry them.
+        
         Returns:
             List of (chunk_text, metadata) tuples
         """
@@ -150,24 +403,48 @@ class DocumentLoader:
         
         for pdf_file in pdf_files:
             try:
-                # Load PDF
-                text = self.load_pdf(str(pdf_file))
+                # Skip unchanged documents before paying for extraction
+                content_hash = hash_file(str(pdf_file))
+                if skip_hash and skip_hash(content_hash):
+                    logger.info(f"Skipping {pdf_file.name}: content already ingested")
+                    continue
+                if self.quarantine and self.quarantine.contains(content_hash):
+                    logger.info(f"Skipping {pdf_file.name}: quarantined")
+                    continue
                 
                 # Create metadata for the document
                 metadata = {
                     "source": pdf_file.name,
                     "file_path": str(pdf_file),
-                    "document_type": "pdf"
+                    "document_type": "pdf",
+                    "content_hash": content_hash
                 }
                 
-                # Chunk the document
-                chunks = self.chunk_text(text, metadata)
+                # Load and chunk the document
+                chunks, stats = self.process_pdf(str(pdf_file), metadata)
                 all_chunks.extend(chunks)
+                if reports is not None:
+                    reports.append(stats)
                 
                 logger.info(f"Processed {pdf_file.name}: {len(chunks)} chunks created")
             
+            except ExtractionError as e:
+                logger.error(f"Failed to extract {pdf_file.name}: {str(e)}")
+                if self.quarantine:
+                    self.quarantine.add(str(pdf_file), pdf_file.name, content_hash, e, move=True)
+                if reports is not None:
+                    reports.append({
+                        "source": pdf_file.name,
+                        "content_hash": content_hash,
+                        "error": str(e),
+                        "quarantined": self.quarantine is not None,
+                    })
+                continue
+            
             except Exception as e:
                 logger.error(f"Failed to process {pdf_file.name}: {str(e)}")
+                if reports is not None:
+                    reports.append({"source": pdf_file.name, "error": str(e)})
                 continue
         
         logger.info(f"Total chunks created: {len(all_chunks)}")
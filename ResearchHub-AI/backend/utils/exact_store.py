@@ -0,0 +1,687 @@
+"""
+Exact Store Module
+Brute-force vector search over a memory-mapped float32 matrix.
+
+Intended for small and medium workspaces, where one matrix-vector product
+is both faster and more accurate than an HNSW graph and avoids loading
+ChromaDB altogether. Optionally keeps int8 codes of every vector so the
+scan touches a quarter of the bytes; the float matrix is then only read
+for re-scoring the best candidates.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from config import Config
+from utils.base_store import BaseVectorStore, file_lock
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows reserved when the matrix file is first created; it doubles as needed
+INITIAL_CAPACITY = 1024
+# Metadata fields with an in-memory lookup table (document-level operations;
+# source and content_hash only appear on chunks written before the catalog)
+INDEXED_FIELDS = ("doc_id", "source", "content_hash")
+# Rows per block when scanning int8 codes (bounds the float32 temporary)
+SCAN_BLOCK_ROWS = 65536
+QUANTIZATION_MODES = ("none", "int8")
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization.
+
+    Args:
+        vectors: (n, dim) float32 matrix
+
+    Returns:
+        Tuple of (int8 codes, float32 per-row scales) with
+        vectors ~= codes * scales[:, None]
+    """
+    peaks = np.max(np.abs(vectors), axis=1)
+    scales = np.maximum(peaks, 1e-12) / 127.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class ExactVectorStore(BaseVectorStore):
+    """
+    Exact (brute-force) vector store backed by memory-mapped files.
+
+    Layout of `<db_path>/exact/<collection_name>/`:
+    - header.json: embedding dimension and matrix capacity
+    - embeddings.f32: row-major float32 matrix of L2-normalized embeddings
+    - records.jsonl: append-only log of row puts and deletes (id, text, metadata)
+    - codes.i8 / scales.f32: int8 codes and per-row scales (int8 mode only)
+
+    Search is one matrix-vector product plus `argpartition`, so results are
+    exact and latency grows linearly with the number of chunks. In int8
+    mode the product runs over the codes (asymmetric: the query stays
+    float) and the top candidates are re-scored exactly.
+
+    A store opened with `read_only=True` maps the files without write
+    access and follows another process's writes through `refresh()`, so
+    any number of server processes can share one copy of the vectors.
+    Writers take an exclusive file lock and first replay what other
+    writers (stores or processes) appended, so rows are never handed out
+    twice.
+    """
+
+    backend_name = "exact"
+
+    def __init__(
+        self,
+        db_path: str,
+        collection_name: str = "research_papers",
+        embedding_model: Union[str, SentenceTransformer] = "all-MiniLM-L6-v2",
+        batch_size: Optional[int] = None,
+        quantization: Optional[str] = None,
+        read_only: bool = False
+    ):
+        """
+        Initialize ExactVectorStore.
+
+        Args:
+            db_path: Root directory for vector data
+            collection_name: Name of the collection to work with
+            embedding_model: Name of the sentence-transformer model, or an
+                already loaded model to share between stores
+            batch_size: Chunks embedded and written per batch
+            quantization: "none" or "int8" (defaults to Config.VECTOR_QUANTIZATION);
+                read-only stores use whatever mode the writer stored
+            read_only: Map the files read-only and never write (reader processes)
+        """
+        self.quantization = (quantization or Config.VECTOR_QUANTIZATION).lower()
+        if self.quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization '{self.quantization}', expected one of {QUANTIZATION_MODES}")
+
+        self.db_path = Path(db_path).resolve()
+        self.store_dir = self.db_path / "exact" / collection_name
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.header_path = self.store_dir / "header.json"
+        self.matrix_path = self.store_dir / "embeddings.f32"
+        self.records_path = self.store_dir / "records.jsonl"
+        self.codes_path = self.store_dir / "codes.i8"
+        self.scales_path = self.store_dir / "scales.f32"
+        # Outside store_dir, which clear_collection removes
+        self.lock_path = self.store_dir.with_name(f"{collection_name}.lock")
+        self.read_only = read_only
+
+        self._lock = threading.RLock()
+        # Nesting depth of _writing() (the file lock is taken once)
+        self._write_depth = 0
+        self._reset_state()
+        self._load()
+        logger.info(f"[ExactVectorStore] '{collection_name}' ready with {self._count_stored()} chunks at {self.store_dir}")
+
+        super().__init__(collection_name, embedding_model, batch_size)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _reset_state(self) -> None:
+        """Drop all in-memory state."""
+        self.dim: Optional[int] = None
+        self._capacity = 0
+        self._matrix: Optional[np.memmap] = None
+        self._codes: Optional[np.memmap] = None
+        self._scales: Optional[np.memmap] = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._rows = 0
+        self._ids: List[Optional[str]] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[dict]] = []
+        self._row_of: Dict[str, int] = {}
+        self._index: Dict[str, Dict[Any, Set[str]]] = {field: defaultdict(set) for field in INDEXED_FIELDS}
+        # Bytes of the record log applied so far, and which file they came from
+        self._log_offset = 0
+        self._log_identity: Optional[Tuple[int, int]] = None
+
+    def _load(self) -> None:
+        """Open the matrix and replay the record log."""
+        if not self.header_path.exists():
+            return
+
+        header = self._read_header()
+        self.dim = int(header["dim"])
+        if self.read_only:
+            self.quantization = header.get("quantization", "none")
+        self._open_matrix(int(header["capacity"]))
+        self._replay_log()
+
+        # Codes are derived data: rebuild them whenever the store was last
+        # written in another mode, since they may be missing or stale
+        if not self.read_only and header.get("quantization", "none") != self.quantization:
+            with self._writing(follow=False):
+                if self.quantization == "int8":
+                    self._quantize_rows(0, self._rows)
+                self._write_header()
+
+    def _read_header(self) -> Dict[str, Any]:
+        with open(self.header_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _replay_log(self) -> None:
+        """Apply records appended to the log since the last replay."""
+        try:
+            f = open(self.records_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            stat = os.fstat(f.fileno())
+            self._log_identity = (stat.st_dev, stat.st_ino)
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Still being appended by the writer, or torn by a crash
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring malformed record in {self.records_path}")
+                    self._log_offset += len(line)
+                    continue
+                if record["row"] >= self._capacity:
+                    # The writer grew the matrix after we last read the header
+                    self._open_matrix(int(self._read_header()["capacity"]))
+                    if record["row"] >= self._capacity:
+                        # Matrix file not grown yet; retry on the next refresh
+                        break
+                self._log_offset += len(line)
+                if record["op"] == "put":
+                    self._set_row(record["row"], record["id"], record["document"], record["metadata"])
+                elif record["op"] == "del":
+                    self._kill_row(record["row"])
+
+        # A torn final line was never acknowledged; drop it so the next
+        # append starts on a fresh line (only under the write lock: without
+        # it the line may be another writer's append in progress)
+        if self._write_depth and stat.st_size > self._log_offset:
+            logger.warning(f"Truncating incomplete record at the end of {self.records_path}")
+            os.truncate(self.records_path, self._log_offset)
+
+    def refresh(self) -> None:
+        """
+        Pick up changes another process wrote since the last load.
+
+        Appended records are applied incrementally. A cleared or compacted
+        store (new log file, or a shorter one) is reloaded from scratch;
+        searches already running keep using the previous mapping.
+        """
+        self._follow_log()
+        # Sources may have been renamed or removed along with the records
+        self.catalog.invalidate()
+        if self.near_duplicates is not None:
+            self.near_duplicates.refresh()
+        # Counting live rows is free here, so reconcile right away
+        self._reconcile_count()
+
+    def _follow_log(self) -> bool:
+        """
+        Apply records appended since the last load, reloading from scratch
+        after a clear or compaction (new log file, or a shorter one).
+
+        Returns:
+            True if the in-memory state may have changed
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.records_path)
+                identity = (stat.st_dev, stat.st_ino)
+                size = stat.st_size
+            except FileNotFoundError:
+                identity, size = None, 0
+            if self.dim is None or identity != self._log_identity or size < self._log_offset:
+                self._reset_state()
+                self._load()
+                return True
+            if size > self._log_offset:
+                self._replay_log()
+                return True
+            return False
+
+    def _require_writable(self) -> None:
+        if self.read_only:
+            raise RuntimeError(f"Collection '{self.collection_name}' is open read-only")
+
+    @contextmanager
+    def _writing(self, follow: bool = True):
+        """
+        Serialize a write with every other writer of the collection.
+
+        The first (outermost) call takes the cross-process file lock and
+        replays records other writers appended, so row slots are allocated
+        after the last row anyone wrote.
+
+        Raises:
+            RuntimeError: If the store was opened read-only
+        """
+        self._require_writable()
+        with self._lock:
+            if self._write_depth:
+                self._write_depth += 1
+                try:
+                    yield
+                finally:
+                    self._write_depth -= 1
+                return
+            with file_lock(self.lock_path):
+                self._write_depth = 1
+                try:
+                    if follow and self._follow_log():
+                        # Let the counter pick up the other writers' chunks
+                        self._adjust_count(0)
+                    if follow and self.header_path.exists():
+                        capacity = int(self._read_header()["capacity"])
+                        if capacity > self._capacity:
+                            self._open_matrix(capacity)
+                    yield
+                finally:
+                    self._write_depth = 0
+
+    def _write_header(self) -> None:
+        tmp_path = self.header_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "dim": self.dim,
+                "capacity": self._capacity,
+                "quantization": self.quantization,
+                "version": 1
+            }, f)
+        os.replace(tmp_path, self.header_path)
+
+    def _open_matrix(self, capacity: int) -> None:
+        """(Re)map the matrix file with the given row capacity, growing it if needed."""
+        if self.read_only:
+            # Never map past the end of a file the writer is still replacing
+            available = self.matrix_path.stat().st_size // (self.dim * 4) if self.matrix_path.exists() else 0
+            capacity = min(capacity, available)
+            self._matrix = np.memmap(
+                self.matrix_path, dtype=np.float32, mode="r", shape=(capacity, self.dim)
+            ) if capacity else None
+        else:
+            size = capacity * self.dim * 4
+            if not self.matrix_path.exists() or self.matrix_path.stat().st_size < size:
+                with open(self.matrix_path, "ab") as f:
+                    f.truncate(size)
+            self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        if self.quantization == "int8" and capacity:
+            self._codes = self._open_sidecar(self.codes_path, np.int8, (capacity, self.dim))
+            self._scales = self._open_sidecar(self.scales_path, np.float32, (capacity,))
+            if self._codes is None or self._scales is None:
+                # Incomplete codes: scan the float matrix instead
+                self._codes = self._scales = None
+        alive = np.zeros(capacity, dtype=bool)
+        kept = min(len(self._alive), capacity)
+        alive[:kept] = self._alive[:kept]
+        self._alive = alive
+        self._capacity = capacity
+
+    def _open_sidecar(self, path: Path, dtype: Any, shape: Tuple[int, ...]) -> Optional[np.memmap]:
+        """Map a per-row sidecar array, growing its file to `shape` (None if a reader finds it short)."""
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if not path.exists() or path.stat().st_size < size:
+            if self.read_only:
+                return None
+            with open(path, "ab") as f:
+                f.truncate(size)
+        return np.memmap(path, dtype=dtype, mode="r" if self.read_only else "r+", shape=shape)
+
+    def _quantize_rows(self, start: int, end: int) -> None:
+        """Recompute int8 codes for rows [start, end) from the float matrix."""
+        for block in range(start, end, SCAN_BLOCK_ROWS):
+            stop = min(block + SCAN_BLOCK_ROWS, end)
+            codes, scales = quantize_int8(np.asarray(self._matrix[block:stop]))
+            self._codes[block:stop] = codes
+            self._scales[block:stop] = scales
+        if end > start:
+            self._codes.flush()
+            self._scales.flush()
+
+    def _ensure_capacity(self, rows: int) -> None:
+        if rows <= self._capacity:
+            return
+        capacity = max(INITIAL_CAPACITY, self._capacity)
+        while capacity < rows:
+            capacity *= 2
+        for array in (self._matrix, self._codes, self._scales):
+            if array is not None:
+                array.flush()
+        self._open_matrix(capacity)
+        self._write_header()
+
+    def _append_records(self, records: List[dict]) -> None:
+        with open(self.records_path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+
+    # ------------------------------------------------------------------
+    # In-memory bookkeeping
+    # ------------------------------------------------------------------
+
+    def _set_row(self, row: int, chunk_id: str, document: str, metadata: dict) -> None:
+        while len(self._ids) <= row:
+            self._ids.append(None)
+            self._documents.append(None)
+            self._metadatas.append(None)
+        if self._ids[row] is not None:
+            self._unindex(row)
+        self._ids[row] = chunk_id
+        self._documents[row] = document
+        self._metadatas[row] = metadata
+        self._row_of[chunk_id] = row
+        self._alive[row] = True
+        self._rows = max(self._rows, row + 1)
+        for field in INDEXED_FIELDS:
+            if field in metadata:
+                self._index[field][metadata[field]].add(chunk_id)
+
+    def _unindex(self, row: int) -> None:
+        chunk_id = self._ids[row]
+        metadata = self._metadatas[row] or {}
+        for field in INDEXED_FIELDS:
+            if field in metadata:
+                bucket = self._index[field].get(metadata[field])
+                if bucket is not None:
+                    bucket.discard(chunk_id)
+                    if not bucket:
+                        del self._index[field][metadata[field]]
+        self._row_of.pop(chunk_id, None)
+
+    def _kill_row(self, row: int) -> None:
+        if row < len(self._ids) and self._ids[row] is not None:
+            self._unindex(row)
+            self._ids[row] = None
+            self._documents[row] = None
+            self._metadatas[row] = None
+        if row < self._capacity:
+            self._alive[row] = False
+
+    # ------------------------------------------------------------------
+    # Storage hooks
+    # ------------------------------------------------------------------
+
+    def _existing_ids(self, ids: List[str]) -> Set[str]:
+        """Return the subset of `ids` already stored."""
+        return {chunk_id for chunk_id in ids if chunk_id in self._row_of}
+
+    def _upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        texts: List[str],
+        metadatas: List[dict]
+    ) -> None:
+        """Insert or overwrite one batch of pre-embedded chunks."""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+
+        with self._writing():
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store dimension {self.dim}")
+
+            rows = []
+            next_row = self._rows
+            for chunk_id in ids:
+                row = self._row_of.get(chunk_id)
+                if row is None:
+                    row = next_row
+                    next_row += 1
+                rows.append(row)
+            self._ensure_capacity(next_row)
+
+            # Matrix first, then the log: a row only exists once it is logged
+            self._matrix[rows] = vectors
+            self._matrix.flush()
+            if self.quantization == "int8":
+                codes, scales = quantize_int8(vectors)
+                self._codes[rows] = codes
+                self._scales[rows] = scales
+                self._codes.flush()
+                self._scales.flush()
+            records = [
+                {"op": "put", "row": row, "id": chunk_id, "document": text, "metadata": metadata}
+                for row, chunk_id, text, metadata in zip(rows, ids, texts, metadatas)
+            ]
+            self._append_records(records)
+            for row, chunk_id, text, metadata in zip(rows, ids, texts, metadatas):
+                self._set_row(row, chunk_id, text, metadata)
+
+    def _ids_where(self, field: str, value: Any, limit: Optional[int] = None) -> List[str]:
+        """Return ids of chunks whose metadata `field` equals `value`."""
+        with self._lock:
+            if field in self._index:
+                ids = sorted(self._index[field].get(value, ()))
+            else:
+                ids = [
+                    chunk_id
+                    for chunk_id, metadata in zip(self._ids, self._metadatas)
+                    if chunk_id is not None and metadata.get(field) == value
+                ]
+        return ids[:limit] if limit else ids
+
+    def _metadatas_where(self, field: str, value: Any) -> List[dict]:
+        """Return metadata of chunks whose metadata `field` equals `value`."""
+        with self._lock:
+            return [
+                dict(metadata)
+                for chunk_id, metadata in zip(self._ids, self._metadatas)
+                if chunk_id is not None and metadata.get(field) == value
+            ]
+
+    def _delete_ids(self, ids: List[str]) -> None:
+        """Delete chunks by id."""
+        with self._writing():
+            rows = [self._row_of[chunk_id] for chunk_id in ids if chunk_id in self._row_of]
+            if not rows:
+                return
+            self._append_records([{"op": "del", "row": row} for row in rows])
+            for row in rows:
+                self._kill_row(row)
+
+            dead = self._rows - self._count_stored()
+            if dead > max(INITIAL_CAPACITY, self._count_stored()):
+                self._compact()
+
+    def _get_chunks(self, ids: List[str]) -> List[Tuple[str, str, dict]]:
+        """Return (id, document, metadata) of the stored chunks among `ids`."""
+        with self._lock:
+            rows = [(chunk_id, self._row_of.get(chunk_id)) for chunk_id in ids]
+            return [
+                (chunk_id, self._documents[row], self._metadatas[row])
+                for chunk_id, row in rows
+                if row is not None
+            ]
+
+    def _search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        with_embeddings: bool = False
+    ) -> List[tuple]:
+        """Exact cosine top-k by one matrix-vector product (rows of the float matrix on request)."""
+        with self._lock:
+            rows = self._rows
+            live = self._count_stored()
+            if rows == 0 or live == 0:
+                logger.warning("Collection is empty, no documents to query")
+                return []
+            matrix = self._matrix
+            codes = self._codes
+            scales = self._scales
+            alive = self._alive[:rows].copy()
+            ids = self._ids
+            documents = self._documents
+            metadatas = self._metadatas
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        k = min(top_k, live)
+
+        if codes is not None:
+            # Asymmetric scan over int8 codes, then exact re-score of the best candidates
+            approx = np.empty(rows, dtype=np.float32)
+            for block in range(0, rows, SCAN_BLOCK_ROWS):
+                stop = min(block + SCAN_BLOCK_ROWS, rows)
+                # einsum avoids materialising a widened copy of the block
+                approx[block:stop] = np.einsum("ij,j->i", codes[block:stop], query) * scales[block:stop]
+            approx[~alive] = -np.inf
+            shortlist = min(live, k * max(1, Config.QUANTIZATION_RESCORE_FACTOR))
+            if shortlist < rows:
+                candidates = np.argpartition(-approx, shortlist - 1)[:shortlist]
+            else:
+                candidates = np.flatnonzero(alive)
+            candidates = np.sort(candidates)
+            sims = np.full(rows, -np.inf, dtype=np.float32)
+            sims[candidates] = matrix[candidates] @ query
+            if k < len(candidates):
+                candidates = candidates[np.argpartition(-sims[candidates], k - 1)[:k]]
+        else:
+            sims = matrix[:rows] @ query
+            sims[~alive] = -np.inf
+            if k < rows:
+                candidates = np.argpartition(-sims, k - 1)[:k]
+            else:
+                candidates = np.flatnonzero(alive)
+
+        order = candidates[np.argsort(-sims[candidates])]
+
+        # Rows deleted while the scan ran are dropped rather than returned empty
+        order = [row for row in order if documents[row] is not None]
+        if with_embeddings:
+            vectors = matrix[order]
+            return [
+                (ids[row], documents[row], metadatas[row], float(1.0 - sims[row]), vector)
+                for row, vector in zip(order, vectors)
+            ]
+        return [(ids[row], documents[row], metadatas[row], float(1.0 - sims[row])) for row in order]
+
+    def _count_stored(self) -> int:
+        """Return the number of stored chunks (live rows in memory)."""
+        return len(self._row_of)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _compact(self) -> None:
+        """Rewrite the matrix and log with only live rows."""
+        with self._writing():
+            live_rows = [row for row in range(self._rows) if self._ids[row] is not None]
+            logger.info(f"Compacting '{self.collection_name}': {self._rows} rows -> {len(live_rows)}")
+
+            capacity = max(INITIAL_CAPACITY, len(live_rows))
+            tmp_matrix = self.matrix_path.with_suffix(".compact")
+            tmp_records = self.records_path.with_suffix(".compact")
+
+            packed = np.memmap(tmp_matrix, dtype=np.float32, mode="w+", shape=(capacity, self.dim))
+            if live_rows:
+                packed[:len(live_rows)] = self._matrix[live_rows]
+            packed.flush()
+            del packed
+
+            with open(tmp_records, "w", encoding="utf-8") as f:
+                for new_row, row in enumerate(live_rows):
+                    f.write(json.dumps({
+                        "op": "put",
+                        "row": new_row,
+                        "id": self._ids[row],
+                        "document": self._documents[row],
+                        "metadata": self._metadatas[row]
+                    }, separators=(",", ":")) + "\n")
+
+            dim = self.dim
+            self._matrix = self._codes = self._scales = None
+            os.replace(tmp_matrix, self.matrix_path)
+            os.replace(tmp_records, self.records_path)
+            self._reset_state()
+            self.dim = dim
+            self._open_matrix(capacity)
+            if self.quantization == "int8":
+                self._quantize_rows(0, len(live_rows))
+            self._write_header()
+            self._load()
+
+    def rebuild_index(self, **index_params: Any) -> Dict[str, Any]:
+        """Compact the store; there is no approximate index to re-tune."""
+        try:
+            if self.dim is not None:
+                self._compact()
+            return {"status": "success", "collection_name": self.collection_name, "count": self.count()}
+        except Exception as e:
+            logger.error(f"Error compacting collection: {str(e)}")
+            return {"status": "failed", "message": str(e), "count": 0}
+
+    def get_collection_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the current collection.
+
+        Returns:
+            Dictionary with collection statistics
+        """
+        stats = super().get_collection_stats()
+        if stats:
+            stats["db_path"] = str(self.store_dir)
+            stats["quantization"] = self.quantization
+            stats.update(self.memory_footprint())
+        return stats
+
+    def memory_footprint(self) -> Dict[str, int]:
+        """
+        Report bytes used by live vectors.
+
+        `scan_bytes` is what each search streams through (the float matrix,
+        or the int8 codes plus scales); `float_bytes` is the full-precision
+        matrix, which int8 mode only touches for re-scoring.
+        """
+        rows = self._count_stored()
+        dim = self.dim or 0
+        float_bytes = rows * dim * 4
+        scan_bytes = rows * (dim + 4) if self.quantization == "int8" else float_bytes
+        return {
+            "float_bytes": float_bytes,
+            "scan_bytes": scan_bytes,
+            "index_file_bytes": sum(
+                p.stat().st_size for p in (self.matrix_path, self.codes_path, self.scales_path) if p.exists()
+            )
+        }
+
+    def clear_collection(self) -> bool:
+        """
+        Clear all documents from the collection.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            with self._writing(follow=False):
+                self._matrix = self._codes = self._scales = None
+                shutil.rmtree(self.store_dir, ignore_errors=True)
+                self.store_dir.mkdir(parents=True, exist_ok=True)
+                self._reset_state()
+            self._reset_count()
+            self.catalog.clear(self.collection_name)
+            if self.near_duplicates is not None:
+                self.near_duplicates.clear()
+            logger.info(f"Collection '{self.collection_name}' cleared")
+            return True
+        except Exception as e:
+            logger.error(f"Error clearing collection: {str(e)}")
+            return False
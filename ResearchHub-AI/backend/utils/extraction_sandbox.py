@@ -0,0 +1,232 @@
+"""
+Extraction Sandbox Module
+Runs PDF text extraction in resource-limited worker processes.
+
+A malformed or decompression-bomb PDF can make an extractor spin for
+minutes or allocate gigabytes. Extracting in a separate process lets the
+API (or writer) process enforce a wall-clock limit and an RSS limit per
+file by killing the worker, and recycling workers after a number of files
+contains the extractors' slow memory growth.
+
+Workers are plain subprocesses (`python -m utils.extraction_sandbox`)
+speaking JSON lines over stdin/stdout, so they can be started from
+daemonic processes such as serve.py's writer. RSS is measured through
+/proc and therefore only enforced on Linux; the wall-clock limit applies
+everywhere.
+"""
+
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from utils.pdf_extractors import ExtractionError, extract_with_fallback, extractor_chain
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# How often a waiting parent checks the worker's RSS
+POLL_INTERVAL = 0.1
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+class _Worker:
+    """One extraction subprocess and the thread draining its replies."""
+
+    def __init__(self, extractor: str, max_rss_bytes: int):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "utils.extraction_sandbox", extractor, str(max_rss_bytes)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=BACKEND_DIR,
+            text=True,
+            encoding="utf-8",
+        )
+        self.files = 0
+        self.replies: "queue.Queue[Optional[str]]" = queue.Queue()
+        threading.Thread(target=self._drain, daemon=True).start()
+
+    def _drain(self) -> None:
+        for line in self.process.stdout:
+            self.replies.put(line)
+        self.replies.put(None)
+
+    def kill(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+
+    def close(self) -> None:
+        """Ask the worker to exit, killing it if it does not."""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+
+class ExtractionSandbox:
+    """
+    Pool of extraction worker processes with per-file limits.
+
+    Features:
+    - Wall-clock limit per file (worker killed on expiry)
+    - RSS limit per file, polled while waiting (Linux), plus an address
+      space rlimit inside the worker as a backstop against sudden spikes
+    - Workers recycled after `max_files_per_worker` files
+    - Failures raised as ExtractionError with a reason
+    """
+
+    def __init__(
+        self,
+        extractor: str,
+        timeout: float = 120.0,
+        max_rss_mb: int = 1024,
+        max_files_per_worker: int = 50,
+        workers: int = 1
+    ):
+        """
+        Initialize ExtractionSandbox. Workers are started on first use.
+
+        Args:
+            extractor: PDF extractor name (falls back to pypdf in the worker)
+            timeout: Wall-clock seconds allowed per file
+            max_rss_mb: Resident memory allowed per worker (0 disables)
+            max_files_per_worker: Files extracted before a worker is replaced
+            workers: Maximum concurrent worker processes
+        """
+        self.extractor = extractor
+        self.timeout = timeout
+        self.max_rss_bytes = max(0, max_rss_mb) * 1024 * 1024
+        self.max_files_per_worker = max(1, max_files_per_worker)
+        self._slots = threading.BoundedSemaphore(max(1, workers))
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        logger.info(
+            f"Extraction sandbox: {extractor}, {timeout:g}s and {max_rss_mb} MB per file, "
+            f"recycle after {self.max_files_per_worker} files"
+        )
+
+    def extract(self, file_path: str) -> Tuple[List[str], str]:
+        """
+        Extract page texts in a worker process.
+
+        Args:
+            file_path: Path to the PDF file
+
+        Returns:
+            Tuple of (one string per page, name of the extractor used)
+
+        Raises:
+            ExtractionError: If the file failed, timed out, exceeded the
+                memory limit or crashed the worker
+        """
+        with self._slots:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            if worker is None or worker.process.poll() is not None:
+                worker = _Worker(self.extractor, self.max_rss_bytes)
+
+            try:
+                reply = self._run(worker, os.path.abspath(file_path))
+            except ExtractionError:
+                worker.kill()
+                raise
+
+            worker.files += 1
+            if worker.files >= self.max_files_per_worker:
+                logger.info(f"Recycling extraction worker {worker.process.pid} after {worker.files} files")
+                worker.close()
+            else:
+                with self._lock:
+                    self._idle.append(worker)
+
+        if "error" in reply:
+            raise ExtractionError(reply["error"], reply.get("detail", ""))
+        return reply["pages"], reply["extractor"]
+
+    def _run(self, worker: _Worker, file_path: str) -> dict:
+        """Send one file to a worker and wait for its reply within the limits."""
+        try:
+            worker.process.stdin.write(json.dumps({"path": file_path}) + "\n")
+            worker.process.stdin.flush()
+        except OSError as e:
+            raise ExtractionError("crashed", f"worker unavailable: {str(e)}")
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                line = worker.replies.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if time.monotonic() > deadline:
+                    raise ExtractionError("timeout", f"extraction exceeded {self.timeout:g}s")
+                rss = _rss_bytes(worker.process.pid) if self.max_rss_bytes else None
+                if rss is not None and rss > self.max_rss_bytes:
+                    raise ExtractionError(
+                        "memory_limit",
+                        f"worker RSS {rss // (1024 * 1024)} MB exceeded {self.max_rss_bytes // (1024 * 1024)} MB"
+                    )
+                continue
+            if line is None:
+                code = worker.process.wait()
+                raise ExtractionError("crashed", f"worker exited with code {code}")
+            return json.loads(line)
+
+    def close(self) -> None:
+        """Stop idle workers."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.close()
+
+
+def _serve(extractor: str, max_rss_bytes: int) -> None:
+    """Worker loop: read {"path"} requests from stdin, answer on the original stdout."""
+    # Keep the protocol stream private; anything printed by native code goes to stderr
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    if resource is not None and max_rss_bytes:
+        # Address space is larger than RSS, so leave headroom; the parent enforces RSS itself
+        limit = 2 * max_rss_bytes
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    extractors = extractor_chain(extractor)
+    for line in sys.stdin:
+        path = json.loads(line)["path"]
+        try:
+            pages, used = extract_with_fallback(extractors, path)
+            reply = {"pages": pages, "extractor": used.name}
+        except MemoryError:
+            reply = {"error": "memory_limit", "detail": "worker address space limit reached"}
+        except ExtractionError as e:
+            reply = {"error": e.reason, "detail": e.detail}
+        protocol.write(json.dumps(reply) + "\n")
+        protocol.flush()
+
+
+if __name__ == "__main__":
+    _serve(sys.argv[1], int(sys.argv[2]))
@@ -0,0 +1,125 @@
+"""
+Fast JSON Module
+Pre-shaped JSON responses for the high-volume endpoints.
+
+A dict returned from a FastAPI route is validated against the route's
+response model (re-validating every metadata dict and chunk text), walked
+by `jsonable_encoder` and only then encoded with the stdlib json module.
+Routes whose payload is already built from plain JSON types return
+`json_response(...)` instead, which FastAPI sends untouched: one orjson
+call (stdlib json when orjson is not installed) plus optional gzip or
+brotli compression of large bodies. Response models stay on the routes
+for the OpenAPI schema. Polled endpoints can add an ETag so unchanged
+payloads are answered with 304 Not Modified.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+from config import Config
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered without it
+    brotli = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain JSON types (numpy scalars and arrays too, with orjson) to UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header.
+
+    Returns:
+        "br" (when brotli is installed), "gzip", or None
+    """
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip()] = quality
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header."""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a response body with the configured level."""
+    if encoding == "br":
+        return brotli.compress(body, quality=Config.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=Config.GZIP_LEVEL)
+
+
+def json_response(
+    content: Any,
+    request: Optional[Request] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+    etag: bool = False
+) -> Response:
+    """
+    Build a JSON response without response-model validation.
+
+    Args:
+        content: Payload made of plain JSON types
+        request: Incoming request, used to negotiate compression
+        status_code: HTTP status code
+        headers: Extra response headers
+        etag: Add a weak ETag of the body; a request whose If-None-Match
+            holds it gets an empty 304 response
+
+    Returns:
+        Response with the encoded (and possibly compressed) body
+    """
+    body = dumps(content)
+    headers = dict(headers or {})
+    if etag:
+        headers["ETag"] = f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        if request is not None and etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+    if Config.RESPONSE_COMPRESSION and request is not None:
+        headers["Vary"] = "Accept-Encoding"
+        if len(body) >= Config.RESPONSE_COMPRESSION_MIN_BYTES:
+            encoding = accepted_encoding(request.headers.get("accept-encoding", ""))
+            if encoding is not None:
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
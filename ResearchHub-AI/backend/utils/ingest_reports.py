@@ -0,0 +1,216 @@
+"""
+Ingest Reports Module
+Per-document ingest cost reports, persisted per workspace.
+
+Each report combines what DocumentLoader measured (pages, extraction and
+chunking time, characters, chunks) with what the vector store measured
+(tokens, chunks truncated by the embedding model, near-duplicate chunks
+linked instead of embedded, embedding and write time). Documents that look pathological - slow to extract, nearly
+text-free (typically scanned pages), or mostly truncated - are flagged so
+the files that dominate ingest wall time are easy to find.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REPORT_DIR = "ingest_reports"
+# Report fields a listing can be sorted by (descending)
+SORT_FIELDS = (
+    "total_seconds", "extraction_seconds", "embedding_seconds", "write_seconds",
+    "pages", "chunks", "tokens", "truncated_chunks", "ingested_at",
+    "cleaning_bytes_saved", "cleaning_chunks_saved", "near_duplicate_chunks",
+)
+# Report fields summed over a workspace's listing
+TOTAL_FIELDS = (
+    "pages", "chunks", "tokens", "total_seconds", "cleaning_bytes_saved", "cleaning_chunks_saved",
+    "near_duplicate_chunks",
+)
+
+
+def flag_report(report: Dict[str, Any]) -> List[str]:
+    """
+    Name the reasons a document is pathological (empty if it is not).
+
+    Args:
+        report: Merged ingest report
+
+    Returns:
+        Flags among extraction_failed, slow_extraction, low_text_density
+        and truncated_chunks
+    """
+    if report.get("error"):
+        return ["extraction_failed"]
+
+    flags = []
+    pages = report.get("pages") or 0
+    extraction_seconds = report.get("extraction_seconds") or 0.0
+    if extraction_seconds >= Config.SLOW_EXTRACTION_SECONDS or (
+        pages and extraction_seconds / pages >= Config.SLOW_PAGE_SECONDS
+    ):
+        flags.append("slow_extraction")
+    if pages and (report.get("characters") or 0) / pages < Config.MIN_CHARS_PER_PAGE:
+        # Usually scanned or image-only pages without a text layer
+        flags.append("low_text_density")
+    chunks = report.get("chunks") or 0
+    if chunks and (report.get("truncated_chunks") or 0) / chunks > Config.MAX_TRUNCATED_FRACTION:
+        flags.append("truncated_chunks")
+    return flags
+
+
+def build_reports(
+    loader_stats: List[Dict[str, Any]],
+    store_stats: Optional[Dict[str, Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Merge loader and vector store measurements into one report per document.
+
+    Args:
+        loader_stats: Stats from DocumentLoader.process_pdf (or error entries)
+        store_stats: `documents` from BaseVectorStore.ingest_documents
+
+    Returns:
+        Reports with rounded timings, `total_seconds` and `flags`
+    """
+    store_stats = store_stats or {}
+    reports = []
+    for stats in loader_stats:
+        ingest = store_stats.get(stats.get("content_hash") or stats.get("source"), {})
+        report = {
+            **stats,
+            "chunks_written": ingest.get("chunks_written", 0),
+            "tokens": ingest.get("tokens", 0),
+            "truncated_chunks": ingest.get("truncated_chunks", 0),
+            "near_duplicate_chunks": ingest.get("near_duplicates", 0),
+            "embedding_seconds": ingest.get("embedding_seconds", 0.0),
+            "write_seconds": ingest.get("write_seconds", 0.0),
+        }
+        report["total_seconds"] = sum(
+            report.get(field) or 0.0
+            for field in (
+                "extraction_seconds", "cleaning_seconds", "chunking_seconds", "embedding_seconds", "write_seconds"
+            )
+        )
+        for field, value in list(report.items()):
+            if field.endswith("_seconds"):
+                report[field] = round(value, 4)
+        report["ingested_at"] = time.time()
+        report["flags"] = flag_report(report)
+        if report["flags"]:
+            logger.warning(f"Ingest of {report.get('source')} flagged: {', '.join(report['flags'])}")
+        reports.append(report)
+    return reports
+
+
+class IngestReportStore:
+    """
+    Latest ingest report per source document, one JSON file per workspace.
+
+    Features:
+    - Re-ingesting or replacing a document overwrites its report
+    - Atomic file replacement, so reader processes never see a torn file
+    - Listing filtered to flagged documents and sorted by any cost field
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize IngestReportStore.
+
+        Args:
+            db_path: Vector database root; reports live in `ingest_reports/`
+        """
+        self.root = Path(db_path).resolve() / REPORT_DIR
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, workspace: str) -> Path:
+        return self.root / f"{workspace}.json"
+
+    def _load(self, workspace: str) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._path(workspace), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable ingest reports for workspace '{workspace}': {str(e)}")
+            return {}
+
+    def _save(self, workspace: str, reports: Dict[str, Dict[str, Any]]) -> None:
+        path = self._path(workspace)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(reports, f)
+        os.replace(tmp_path, path)
+
+    def record(self, workspace: str, reports: List[Dict[str, Any]]) -> None:
+        """Store reports, replacing earlier ones for the same source."""
+        if not reports:
+            return
+        with self._lock:
+            stored = self._load(workspace)
+            for report in reports:
+                stored[report.get("source") or report.get("content_hash") or "document"] = report
+            self._save(workspace, stored)
+
+    def get(self, workspace: str, source: str) -> Optional[Dict[str, Any]]:
+        """Report for one source document, or None."""
+        return self._load(workspace).get(source)
+
+    def list_reports(
+        self,
+        workspace: str,
+        flagged_only: bool = False,
+        sort_by: str = "total_seconds",
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """
+        List reports, most expensive first.
+
+        Args:
+            workspace: Workspace name
+            flagged_only: Only return flagged documents
+            sort_by: One of SORT_FIELDS (descending)
+            limit: Maximum number of reports
+
+        Raises:
+            ValueError: If sort_by is not a known field
+        """
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by '{sort_by}', expected one of {', '.join(SORT_FIELDS)}")
+        reports = list(self._load(workspace).values())
+        if flagged_only:
+            reports = [r for r in reports if r.get("flags")]
+        reports.sort(key=lambda r: r.get(sort_by) or 0, reverse=True)
+        return reports[:max(0, limit)]
+
+    def totals(self, workspace: str) -> Dict[str, Any]:
+        """Sum TOTAL_FIELDS over every report of a workspace."""
+        reports = self._load(workspace).values()
+        totals: Dict[str, Any] = {"documents": len(reports)}
+        for field in TOTAL_FIELDS:
+            totals[field] = round(sum(report.get(field) or 0 for report in reports), 4)
+        return totals
+
+    def remove(self, workspace: str, source: str) -> None:
+        """Forget a deleted document's report."""
+        with self._lock:
+            stored = self._load(workspace)
+            if stored.pop(source, None) is not None:
+                self._save(workspace, stored)
+
+    def clear(self, workspace: str) -> None:
+        """Forget every report of a cleared workspace."""
+        with self._lock:
+            self._path(workspace).unlink(missing_ok=True)
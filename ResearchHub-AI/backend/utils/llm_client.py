@@ -1,7 +1,12 @@
 import os
 import logging
+import time
 from groq import Groq
 
+from config import Config
+from utils.metrics import LLM_REQUEST_SECONDS, LLM_TOKENS
+from utils.tracing import outgoing_headers, traced
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,10 +28,20 @@ class GroqClient:
         self.model = os.getenv("GROQ_MODEL", self.DEFAULT_MODEL)
         logger.info(f"Using Groq model: {self.model}")
         
+        # Optional alternative endpoint (e.g. a local fake server for load tests)
+        self.base_url = Config.GROQ_BASE_URL or None
+        if self.base_url:
+            logger.info(f"Using Groq-compatible endpoint: {self.base_url}")
+        
         try:
-            # Initialize Groq client - only pass api_key to avoid proxy issues
+            # Initialize Groq client - only pass api_key and endpoint settings to avoid proxy issues
             # Some environments may have HTTP_PROXY/HTTPS_PROXY set which can cause issues
-            self.client = Groq(api_key=api_key)
+            self.client = Groq(
+                api_key=api_key,
+                base_url=self.base_url,
+                max_retries=Config.GROQ_MAX_RETRIES,
+                timeout=Config.GROQ_TIMEOUT
+            )
             logger.info("Groq client initialized successfully")
         except TypeError as e:
             # Handle version compatibility issues
@@ -34,7 +49,7 @@ class GroqClient:
                 logger.warning("Groq SDK version may have compatibility issues. Trying alternative initialization...")
                 # Try without any extra arguments
                 try:
-                    self.client = Groq(api_key=api_key)
+                    self.client = Groq(api_key=api_key, base_url=self.base_url)
                     logger.info("Groq client initialized successfully (alternative method)")
                 except Exception as e2:
                     raise RuntimeError(f"Failed to initialize Groq client: {str(e2)}. Please check your API key and Groq SDK version.")
@@ -46,14 +61,32 @@ class GroqClient:
     def generate_response(self, prompt: str) -> str:
         # Use the model specified in initialization (default: llama-3.3-70b-versatile)
         # Alternative models: llama-3.1-8b-instant, llama-3.3-70b-specdec, qwen/qwen3-32b
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "You are an advanced research analysis AI."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3
-        )
+        with traced("llm.generate_response", timing_key="llm", model=self.model) as span:
+            start = time.perf_counter()
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": "You are an advanced research analysis AI."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3,
+                    # Lets an OpenTelemetry-aware gateway join the request's trace
+                    extra_headers=outgoing_headers() or None
+                )
+            except Exception:
+                LLM_REQUEST_SECONDS.labels(self.model, "error").observe(time.perf_counter() - start)
+                raise
+            LLM_REQUEST_SECONDS.labels(self.model, "success").observe(time.perf_counter() - start)
+
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+                completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+                LLM_TOKENS.labels(self.model, "prompt").observe(prompt_tokens)
+                LLM_TOKENS.labels(self.model, "completion").observe(completion_tokens)
+                span.set_attribute("llm.prompt_tokens", prompt_tokens)
+                span.set_attribute("llm.completion_tokens", completion_tokens)
 
         # Response structure returned by Groq SDK
         try:
@@ -0,0 +1,219 @@
+"""
+Metrics Module
+Prometheus metrics for the ingest, search and chat pipelines.
+
+Latencies are recorded as histograms at each pipeline stage; gauges that
+describe current state (collection sizes, cache hit ratios, queue depths)
+are computed from registered callbacks when /metrics is scraped, so they
+cost nothing on the request path. Under multi-process serving (serve.py
+sets PROMETHEUS_MULTIPROC_DIR) samples from every worker are aggregated.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Sub-millisecond to seconds: search, chunking, per-item embedding, HTTP
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+# Tens of milliseconds to minutes: PDF parsing, embedding batches, writes, LLM calls
+SLOW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+PDF_PARSE_SECONDS = Histogram(
+    "researchhub_pdf_parse_seconds", "Time to extract the text of one PDF", buckets=SLOW_BUCKETS
+)
+CHUNKING_SECONDS = Histogram(
+    "researchhub_chunking_seconds", "Time to chunk one document's text", buckets=FAST_BUCKETS
+)
+EMBEDDING_BATCH_SECONDS = Histogram(
+    "researchhub_embedding_batch_seconds", "Time to embed one batch of texts", buckets=SLOW_BUCKETS
+)
+EMBEDDING_ITEM_SECONDS = Histogram(
+    "researchhub_embedding_item_seconds", "Embedding time per text (batch time / batch size)",
+    buckets=FAST_BUCKETS
+)
+VECTOR_QUERY_SECONDS = Histogram(
+    "researchhub_vector_query_seconds", "Vector index query time", ["backend"], buckets=FAST_BUCKETS
+)
+VECTOR_WRITE_SECONDS = Histogram(
+    "researchhub_vector_write_seconds", "Time to write one batch to the vector index", ["backend"],
+    buckets=SLOW_BUCKETS
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "researchhub_llm_request_seconds", "LLM completion latency", ["model", "outcome"], buckets=SLOW_BUCKETS
+)
+LLM_TOKENS = Histogram(
+    "researchhub_llm_tokens", "Tokens per LLM completion", ["model", "kind"], buckets=TOKEN_BUCKETS
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "researchhub_http_request_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=FAST_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    "researchhub_cache_requests", "Cache lookups by outcome", ["cache", "result"]
+)
+INGEST_BATCHES_IN_FLIGHT = Gauge(
+    "researchhub_ingest_batches_in_flight", "Embedded batches queued for or being written",
+    multiprocess_mode="livesum"
+)
+
+GaugeCallback = Callable[[], Iterable[Tuple[Sequence[str], float]]]
+
+
+class _CallbackCollector:
+    """Collector that evaluates registered gauge callbacks at scrape time."""
+
+    def __init__(self):
+        self._gauges: Dict[str, Tuple[str, List[str], GaugeCallback]] = {}
+
+    def add(self, name: str, documentation: str, labelnames: List[str], callback: GaugeCallback) -> None:
+        self._gauges[name] = (documentation, labelnames, callback)
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        for name, (documentation, labelnames, callback) in list(self._gauges.items()):
+            family = GaugeMetricFamily(name, documentation, labels=labelnames)
+            try:
+                for label_values, value in callback():
+                    family.add_metric(list(label_values), value)
+            except Exception as e:
+                logger.warning(f"Metrics callback for {name} failed: {str(e)}")
+            yield family
+
+
+_callbacks = _CallbackCollector()
+REGISTRY.register(_callbacks)
+
+
+def register_gauge_callback(
+    name: str,
+    documentation: str,
+    labelnames: List[str],
+    callback: GaugeCallback
+) -> None:
+    """
+    Expose a gauge whose samples are computed when /metrics is scraped.
+
+    Args:
+        name: Metric name
+        documentation: Help text
+        labelnames: Label names, in the order the callback yields values
+        callback: Returns (label values, value) pairs; re-registering a
+            name replaces the previous callback
+    """
+    _callbacks.add(name, documentation, labelnames, callback)
+
+
+def cache_hit_ratios() -> Iterable[Tuple[Sequence[str], float]]:
+    """Hit ratio per cache, from the CACHE_REQUESTS counters."""
+    totals: Dict[str, Dict[str, float]] = {}
+    for metric in CACHE_REQUESTS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total"):
+                cache = totals.setdefault(sample.labels["cache"], {})
+                cache[sample.labels["result"]] = sample.value
+    for cache, counts in totals.items():
+        lookups = sum(counts.values())
+        if lookups:
+            yield (cache,), counts.get("hit", 0.0) / lookups
+
+
+register_gauge_callback(
+    "researchhub_cache_hit_ratio", "Fraction of cache lookups that hit (this process)", ["cache"],
+    cache_hit_ratios
+)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        Tuple of (payload, content type)
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Aggregate the per-process sample files written by every worker
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(_callbacks)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def route_template(scope: Dict[str, Any], cache: Dict[Any, str]) -> str:
+    """
+    Resolve the route template (e.g. /api/v1/papers/documents/{source}) a request matched.
+
+    Args:
+        scope: ASGI scope after routing
+        cache: Endpoint -> path map reused across calls by the caller
+
+    Returns:
+        Route template, or "unmatched"
+    """
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", "unmatched")
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    path = cache.get(endpoint)
+    if path is None:
+        app = scope.get("app")
+        for candidate in getattr(app, "routes", []):
+            cache[getattr(candidate, "endpoint", None)] = getattr(candidate, "path", "unmatched")
+        path = cache.setdefault(endpoint, "unmatched")
+    return path
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template.
+
+    Routes are labelled by their template (e.g. /api/v1/papers/documents/{source})
+    rather than the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._route_paths: Dict[Any, str] = {}
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route_template(scope, self._route_paths), str(status)).observe(
+                time.perf_counter() - start
+            )
@@ -0,0 +1,565 @@
+"""
+Near Duplicates Module
+MinHash/LSH index that finds near-duplicate chunks before they are embedded.
+
+Preprints, camera-ready versions and supplementary material repeat most of
+their text, so without this every copy is embedded, stored and retrieved,
+crowding diverse results out of the top k. Each chunk gets a MinHash
+signature over its word shingles; banded LSH buckets turn the lookup for a
+similar chunk into a few dict probes, and candidates are confirmed with the
+signature's Jaccard estimate.
+
+A near-duplicate of a chunk from another document is not embedded or
+stored. It is recorded as a link to its canonical chunk ("link" keeps its
+text and metadata so it can be restored if the canonical chunk's document
+is deleted; "skip" only counts it).
+
+The index is kept per collection as an append-only JSON-lines log under
+the vector database root, replayed on first use and compacted when most
+of it is dead.
+"""
+
+import base64
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = "near_duplicates"
+ACTIONS = ("link", "skip")
+# Universal hashing modulo the Mersenne prime 2^61 - 1, as in datasketch
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+WORD = re.compile(r"\w+")
+
+
+def optimal_bands(threshold: float, num_perm: int, false_positive_weight: float = 0.2) -> Tuple[int, int]:
+    """
+    Pick the LSH bands x rows split minimizing weighted false positives and negatives.
+
+    A pair with Jaccard similarity s shares at least one band with
+    probability 1 - (1 - s^rows)^bands. Candidates are confirmed against
+    their signatures, so a false positive only costs a comparison while a
+    false negative costs an embedding; misses are weighted accordingly.
+
+    Returns:
+        Tuple of (bands, rows)
+    """
+    best, best_error = (num_perm, 1), float("inf")
+    below = np.linspace(0.0, threshold, 64)
+    above = np.linspace(threshold, 1.0, 64)
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_positive = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+            false_negative = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+            error = false_positive_weight * false_positive + (1 - false_positive_weight) * false_negative
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    Incremental MinHash/LSH index of one collection's chunks.
+
+    Features:
+    - Word-shingle MinHash signatures computed with numpy
+    - Banded LSH buckets; candidates confirmed by estimated Jaccard
+    - Matches only across documents (a new version of a document never
+      links to the version it replaces)
+    - Duplicates linked to their canonical chunk and restored when it is deleted
+    - Per-collection duplication report
+    """
+
+    def __init__(
+        self,
+        path: str,
+        threshold: float = 0.85,
+        num_perm: int = 64,
+        shingle_size: int = 5,
+        action: str = "link",
+        seed: int = 1
+    ):
+        """
+        Initialize NearDuplicateIndex. The log is loaded on first use.
+
+        Args:
+            path: JSON-lines log file of the index
+            threshold: Estimated Jaccard similarity above which chunks are near-duplicates
+            num_perm: MinHash permutations per signature
+            shingle_size: Words per shingle
+            action: "link" (keep duplicates' text for restoring) or "skip"
+            seed: Seed of the hash permutations (changing it invalidates the log)
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown near-duplicate action '{action}', expected one of {ACTIONS}")
+        self.path = Path(path)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = max(1, shingle_size)
+        self.action = action
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)[:, None]
+        self._settings = [num_perm, self.shingle_size, seed]
+
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._offset = 0
+        self._inode: Optional[int] = None
+        # Written into the settings record of each new or compacted log, so
+        # another process can tell a rewritten log from an appended one
+        self._log_id: Optional[str] = None
+        self._dead_records = 0
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        # Canonical chunks: id -> (signature, source); band buckets -> ids
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._sources: Dict[str, str] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        # Duplicates: id -> link record; canonical id -> duplicate ids
+        self._links: Dict[str, Dict[str, Any]] = {}
+        self._linked: Dict[str, Set[str]] = {}
+        self._linked_hashes: Dict[str, int] = {}
+        # Log records of the ingest in progress, written by commit()
+        self._pending: List[Dict[str, Any]] = []
+
+    # ------------------------------------------------------------------
+    # Signatures
+    # ------------------------------------------------------------------
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature of a chunk's word shingles.
+
+        Returns:
+            uint32 array of `num_perm` values, or None for text without words
+        """
+        words = WORD.findall(text.lower())
+        if not words:
+            return None
+        size = min(self.shingle_size, len(words))
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        # uint64 wraparound in a * x is intended (datasketch does the same)
+        with np.errstate(over="ignore"):
+            permuted = ((self._a * hashes + self._b) % MERSENNE_PRIME) & MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        """Replay the log on first use, then any records appended by another process."""
+        with self._lock:
+            try:
+                stat = self.path.stat()
+                size, inode = stat.st_size, stat.st_ino
+            except FileNotFoundError:
+                size, inode = 0, None
+            if self._loaded and size == self._offset and inode == self._inode:
+                return
+            if size < self._offset or (self._offset and inode != self._inode):
+                # Compacted or cleared elsewhere
+                self._reset_state()
+                self._offset = self._dead_records = 0
+            self._inode = inode
+            if size > self._offset:
+                with open(self.path, "rb") as f:
+                    f.seek(self._offset)
+                    data = f.read()
+                # Ignore a record still being appended
+                complete = data[:data.rfind(b"\n") + 1]
+                for line in complete.decode("utf-8").splitlines():
+                    if line.strip():
+                        self._apply(json.loads(line))
+                self._offset += len(complete)
+            if not self._loaded:
+                self._loaded = True
+                logger.info(
+                    f"Near-duplicate index {self.path.name}: {len(self._signatures)} canonical chunk(s), "
+                    f"{len(self._links)} duplicate(s)"
+                )
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        """Apply one log record to the in-memory state."""
+        op = record["op"]
+        if op == "settings":
+            self._log_id = record.get("log_id")
+            if record["settings"] != self._settings:
+                # Signatures from other settings are not comparable; start over
+                logger.warning(f"Near-duplicate settings changed, discarding {self.path.name}")
+                self._reset_state()
+        elif op == "add":
+            signature = np.frombuffer(base64.b64decode(record["signature"]), dtype=np.uint32)
+            self._add(record["id"], record["source"], signature)
+        elif op == "link":
+            self._link(record)
+        elif op == "remove":
+            for chunk_id in record["ids"]:
+                self._remove(chunk_id)
+                self._dead_records += 2
+        elif op == "rename":
+            self._rename(record["source"], record["new_source"])
+            self._dead_records += 1
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._offset == 0:
+            self._log_id = uuid.uuid4().hex
+            records = [{"op": "settings", "settings": self._settings, "log_id": self._log_id}] + records
+        data = "".join(json.dumps(record) + "\n" for record in records)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._offset += len(data.encode("utf-8"))
+        self._inode = self.path.stat().st_ino
+
+    def _compact(self) -> None:
+        """Rewrite the log with only live records."""
+        self._log_id = uuid.uuid4().hex
+        records: List[Dict[str, Any]] = [{"op": "settings", "settings": self._settings, "log_id": self._log_id}]
+        for chunk_id, signature in self._signatures.items():
+            records.append(self._add_record(chunk_id, self._sources[chunk_id], signature))
+        records.extend(self._links.values())
+        tmp_path = self.path.with_suffix(".tmp")
+        data = "".join(json.dumps(record) + "\n" for record in records)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._offset = len(data.encode("utf-8"))
+        self._inode = self.path.stat().st_ino
+        self._dead_records = 0
+        logger.info(f"Compacted near-duplicate index {self.path.name} to {len(records)} record(s)")
+
+    @staticmethod
+    def _add_record(chunk_id: str, source: str, signature: np.ndarray) -> Dict[str, Any]:
+        return {
+            "op": "add", "id": chunk_id, "source": source,
+            "signature": base64.b64encode(signature.tobytes()).decode("ascii"),
+        }
+
+    # ------------------------------------------------------------------
+    # In-memory state
+    # ------------------------------------------------------------------
+
+    def _add(self, chunk_id: str, source: str, signature: np.ndarray) -> None:
+        self._signatures[chunk_id] = signature
+        self._sources[chunk_id] = source
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, set()).add(chunk_id)
+
+    def _link(self, record: Dict[str, Any]) -> None:
+        self._links[record["id"]] = record
+        self._linked.setdefault(record["canonical"], set()).add(record["id"])
+        content_hash = record.get("content_hash")
+        self._linked_hashes[content_hash] = self._linked_hashes.get(content_hash, 0) + 1
+
+    def _remove(self, chunk_id: str) -> None:
+        signature = self._signatures.pop(chunk_id, None)
+        if signature is not None:
+            self._sources.pop(chunk_id, None)
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(chunk_id)
+                    if not bucket:
+                        del self._buckets[key]
+        record = self._links.pop(chunk_id, None)
+        if record is not None:
+            duplicates = self._linked.get(record["canonical"])
+            if duplicates is not None:
+                duplicates.discard(chunk_id)
+                if not duplicates:
+                    del self._linked[record["canonical"]]
+            content_hash = record.get("content_hash")
+            self._linked_hashes[content_hash] -= 1
+            if not self._linked_hashes[content_hash]:
+                del self._linked_hashes[content_hash]
+
+    def _rename(self, source: str, new_source: str) -> bool:
+        changed = False
+        for chunk_id, owner in self._sources.items():
+            if owner == source:
+                self._sources[chunk_id] = new_source
+                changed = True
+        for record in self._links.values():
+            if record["source"] == source:
+                record["source"] = new_source
+                if "metadata" in record:
+                    record["metadata"] = {**record["metadata"], "source": new_source}
+                changed = True
+            if record.get("canonical_source") == source:
+                record["canonical_source"] = new_source
+                changed = True
+        return changed
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def is_linked(self, chunk_id: str) -> bool:
+        """Check whether a chunk id was recorded as a near-duplicate."""
+        self._ensure_loaded()
+        return chunk_id in self._links
+
+    def has_document(self, content_hash: str) -> bool:
+        """Check whether any duplicate of a document is recorded (its chunks may all be links)."""
+        self._ensure_loaded()
+        return content_hash in self._linked_hashes
+
+    def find(self, signature: np.ndarray, source: str) -> Optional[Tuple[str, float]]:
+        """
+        Find the most similar canonical chunk of another document.
+
+        Args:
+            signature: Signature of the new chunk
+            source: Source document of the new chunk (never matched)
+
+        Returns:
+            Tuple of (canonical chunk id, estimated Jaccard), or None
+        """
+        self._ensure_loaded()
+        candidates: Set[str] = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        best: Optional[Tuple[str, float]] = None
+        for chunk_id in candidates:
+            if self._sources[chunk_id] == source:
+                continue
+            similarity = float(np.count_nonzero(self._signatures[chunk_id] == signature)) / self.num_perm
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (chunk_id, similarity)
+        return best
+
+    def add(self, chunk_id: str, source: str, signature: np.ndarray) -> None:
+        """Register a chunk that is about to be stored as canonical (persisted by `commit`)."""
+        with self._lock:
+            self._add(chunk_id, source, signature)
+            self._pending.append(self._add_record(chunk_id, source, signature))
+
+    def link(self, chunk_id: str, canonical_id: str, similarity: float, text: str, metadata: dict) -> None:
+        """Record a chunk as a near-duplicate of a canonical chunk (persisted by `commit`)."""
+        record = {
+            "op": "link",
+            "id": chunk_id,
+            "canonical": canonical_id,
+            "canonical_source": self._sources.get(canonical_id),
+            "similarity": round(similarity, 4),
+            "source": metadata.get("source", "document"),
+            "content_hash": metadata.get("content_hash"),
+        }
+        if self.action == "link":
+            record["text"] = text
+            record["metadata"] = metadata
+        with self._lock:
+            self._link(record)
+            self._pending.append(record)
+
+    def commit(self, stored: Optional[Set[str]] = None) -> None:
+        """
+        Persist the chunks added and linked since the last commit.
+
+        Args:
+            stored: After a failed ingest, the added ids that were actually
+                stored; the others (and links to them) are dropped
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if stored is not None:
+                dropped = {record["id"] for record in pending if record["op"] == "add" and record["id"] not in stored}
+                kept = []
+                for record in pending:
+                    if record["id"] in dropped or record.get("canonical") in dropped:
+                        self._remove(record["id"])
+                    else:
+                        kept.append(record)
+                pending = kept
+            self._append(pending)
+
+    def first_chunks(self) -> List[dict]:
+        """Metadata of linked chunks that are the first chunk of their document."""
+        self._ensure_loaded()
+        return [
+            record["metadata"] for record in self._links.values()
+            if record.get("metadata", {}).get("chunk_index") == 0
+        ]
+
+    def remove(
+        self,
+        chunk_ids: Iterable[str],
+        source: Optional[str] = None,
+        keep: Iterable[str] = ()
+    ) -> Tuple[int, List[Tuple[str, dict]]]:
+        """
+        Forget deleted chunks.
+
+        Args:
+            chunk_ids: Stored chunks that were deleted
+            source: Also forget this document's links (except `keep`)
+            keep: Link ids of `source` that are still current
+
+        Returns:
+            Tuple of (links of `source` removed, (text, metadata) of other
+            documents' duplicates whose canonical chunk was deleted and must
+            be ingested again; empty in "skip" mode)
+        """
+        with self._lock:
+            self._ensure_loaded()
+            removed = set(chunk_ids) & set(self._signatures)
+            keep = set(keep)
+            own_links = [
+                chunk_id for chunk_id, record in self._links.items()
+                if record["source"] == source and chunk_id not in keep
+            ] if source is not None else []
+            orphans = [
+                self._links[duplicate]
+                for canonical_id in removed
+                for duplicate in self._linked.get(canonical_id, ())
+                if self._links[duplicate]["source"] != source
+            ]
+            ids = list(removed) + own_links + [record["id"] for record in orphans]
+            if not ids:
+                return 0, []
+            self._append([{"op": "remove", "ids": ids}])
+            for chunk_id in ids:
+                self._remove(chunk_id)
+            self._dead_records += 2 * len(ids)
+            if self._dead_records > len(self._signatures) + len(self._links):
+                self._compact()
+
+        restored = [(record["text"], record["metadata"]) for record in orphans if "text" in record]
+        if orphans:
+            logger.info(
+                f"{len(orphans)} near-duplicate(s) lost their canonical chunk; {len(restored)} will be re-ingested"
+            )
+        return len(own_links), restored
+
+    def rename_source(self, source: str, new_source: str) -> None:
+        """Record a document's chunks and links under another source name."""
+        with self._lock:
+            self._ensure_loaded()
+            if self._rename(source, new_source):
+                self._append([{"op": "rename", "source": source, "new_source": new_source}])
+                self._dead_records += 1
+
+    def clear(self) -> None:
+        """Forget every chunk."""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self._reset_state()
+            self._offset = self._dead_records = 0
+            self._inode = None
+            self._log_id = None
+            self._loaded = True
+
+    def refresh(self) -> None:
+        """
+        Follow a clear or compaction of the log by another process.
+
+        Appended records are picked up on the next use anyway. A log
+        rewritten in place of the loaded one can reuse its inode, so it is
+        recognized by its log id; reader processes check that whenever the
+        writer publishes a new generation, and reload on the next use.
+        """
+        with self._lock:
+            if not self._loaded:
+                return
+            try:
+                with open(self.path, "rb") as f:
+                    first = f.readline()
+                log_id = json.loads(first).get("log_id") if first.endswith(b"\n") else None
+                stale = log_id != self._log_id
+            except FileNotFoundError:
+                stale = self._offset > 0
+            except ValueError:
+                stale = True
+            if stale:
+                self._reset_state()
+                self._offset = self._dead_records = 0
+                self._inode = None
+                self._log_id = None
+                self._loaded = False
+
+    def report(self, limit: int = 50) -> Dict[str, Any]:
+        """
+        Summarize duplication across the collection.
+
+        Args:
+            limit: Documents listed (most duplicated first)
+
+        Returns:
+            Totals plus, per document with duplicates, how many of its
+            chunks were linked and to which other documents
+        """
+        self._ensure_loaded()
+        with self._lock:
+            links = list(self._links.values())
+            canonical = len(self._signatures)
+        documents: Dict[str, Dict[str, Any]] = {}
+        for record in links:
+            entry = documents.setdefault(record["source"], {
+                "source": record["source"], "content_hash": record.get("content_hash"),
+                "duplicate_chunks": 0, "duplicates_of": {},
+            })
+            entry["duplicate_chunks"] += 1
+            other = record.get("canonical_source") or "unknown"
+            entry["duplicates_of"][other] = entry["duplicates_of"].get(other, 0) + 1
+        ranked = sorted(documents.values(), key=lambda entry: entry["duplicate_chunks"], reverse=True)
+        total = canonical + len(links)
+        return {
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "rows": self.rows,
+            "shingle_size": self.shingle_size,
+            "action": self.action,
+            "canonical_chunks": canonical,
+            "duplicate_chunks": len(links),
+            "duplicate_fraction": round(len(links) / total, 4) if total else 0.0,
+            "documents_with_duplicates": len(ranked),
+            "documents": ranked[:max(0, limit)],
+        }
+
+
+def create_near_duplicate_index(db_path: Any, collection_name: str) -> Optional[NearDuplicateIndex]:
+    """Build a collection's index as configured by NEAR_DUPLICATE_* settings (None when disabled)."""
+    if db_path is None or Config.NEAR_DUPLICATE_THRESHOLD <= 0:
+        return None
+    return NearDuplicateIndex(
+        os.path.join(str(db_path), INDEX_DIR, f"{collection_name}.jsonl"),
+        threshold=Config.NEAR_DUPLICATE_THRESHOLD,
+        num_perm=Config.NEAR_DUPLICATE_NUM_PERM,
+        shingle_size=Config.NEAR_DUPLICATE_SHINGLE_SIZE,
+        action=Config.NEAR_DUPLICATE_ACTION,
+    )
@@ -0,0 +1,189 @@
+"""
+PDF Extractors Module
+Interchangeable page-text extraction backends for DocumentLoader.
+
+pypdf (pure Python) is always available and is the fallback. Faster
+native backends are optional:
+- pymupdf: MuPDF bindings (`pip install pymupdf`, AGPL licensed)
+- pdfium: PDFium bindings (`pip install pypdfium2`)
+
+Each extractor reports a version string; it keys the extracted-text cache,
+so switching backends or upgrading one never serves text produced by
+another.
+"""
+
+import logging
+from importlib import metadata
+from typing import List, Tuple
+
+from pypdf import PdfReader, __version__ as PYPDF_VERSION
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FALLBACK_EXTRACTOR = "pypdf"
+
+
+class ExtractionError(Exception):
+    """
+    A PDF could not be extracted.
+
+    `reason` is one of "invalid_pdf" (every extractor raised), "timeout",
+    "memory_limit" or "crashed" (the last three only in the sandbox).
+    """
+
+    def __init__(self, reason: str, detail: str):
+        super().__init__(f"{reason}: {detail}")
+        self.reason = reason
+        self.detail = detail
+
+
+class PdfExtractor:
+    """
+    Extracts the text of every page of a PDF.
+
+    Subclasses set `name` and `version` and implement `extract_pages`;
+    optional packages are imported in `__init__` so a missing dependency
+    surfaces as ImportError when the extractor is created.
+    """
+
+    name = "base"
+    version = "base"
+
+    def extract_pages(self, file_path: str) -> List[str]:
+        """
+        Extract page texts.
+
+        Args:
+            file_path: Path to the PDF file
+
+        Returns:
+            One string per page (empty for pages without text)
+        """
+        raise NotImplementedError
+
+
+class PypdfExtractor(PdfExtractor):
+    """Pure-Python extraction with pypdf (slow, always available)."""
+
+    name = "pypdf"
+    # Bump the suffix whenever this extractor's output changes
+    version = f"pypdf-{PYPDF_VERSION}-1"
+
+    def extract_pages(self, file_path: str) -> List[str]:
+        reader = PdfReader(file_path)
+        return [page.extract_text() or "" for page in reader.pages]
+
+
+class PymupdfExtractor(PdfExtractor):
+    """Native extraction with MuPDF."""
+
+    name = "pymupdf"
+
+    def __init__(self):
+        import pymupdf
+
+        self._pymupdf = pymupdf
+        self.version = f"pymupdf-{metadata.version('pymupdf')}-1"
+
+    def extract_pages(self, file_path: str) -> List[str]:
+        with self._pymupdf.open(file_path) as document:
+            return [page.get_text() or "" for page in document]
+
+
+class PdfiumExtractor(PdfExtractor):
+    """Native extraction with PDFium."""
+
+    name = "pdfium"
+
+    def __init__(self):
+        import pypdfium2
+
+        self._pdfium = pypdfium2
+        self.version = f"pdfium-{metadata.version('pypdfium2')}-1"
+
+    def extract_pages(self, file_path: str) -> List[str]:
+        document = self._pdfium.PdfDocument(file_path)
+        try:
+            pages = []
+            for page in document:
+                text_page = page.get_textpage()
+                try:
+                    pages.append(text_page.get_text_range().replace("\r\n", "\n"))
+                finally:
+                    text_page.close()
+                    page.close()
+            return pages
+        finally:
+            document.close()
+
+
+EXTRACTORS = {
+    "pypdf": PypdfExtractor,
+    "pymupdf": PymupdfExtractor,
+    "pdfium": PdfiumExtractor,
+}
+
+
+def create_extractor(name: str) -> PdfExtractor:
+    """
+    Instantiate an extractor by name.
+
+    Raises:
+        ValueError: If the name is unknown
+        ImportError: If the extractor's package is not installed
+    """
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor '{name}', expected one of {', '.join(EXTRACTORS)}")
+    return EXTRACTORS[name]()
+
+
+def extract_with_fallback(extractors: List[PdfExtractor], file_path: str) -> Tuple[List[str], PdfExtractor]:
+    """
+    Extract page texts with the first extractor that succeeds.
+
+    Args:
+        extractors: Extractors to try in order (see extractor_chain)
+        file_path: Path to the PDF file
+
+    Returns:
+        Tuple of (one string per page, extractor that produced them)
+
+    Raises:
+        ExtractionError: If every extractor failed
+    """
+    for extractor in extractors:
+        try:
+            return extractor.extract_pages(file_path), extractor
+        except MemoryError:
+            raise
+        except Exception as e:
+            if extractor is extractors[-1]:
+                raise ExtractionError("invalid_pdf", f"{type(e).__name__}: {str(e)}") from e
+            logger.warning(f"{extractor.name} failed on {file_path}, falling back: {str(e)}")
+    raise ExtractionError("invalid_pdf", "no extractor configured")
+
+
+def extractor_chain(name: str) -> List[PdfExtractor]:
+    """
+    Build the configured extractor followed by the pypdf fallback.
+
+    A configured extractor whose package is missing is skipped with a
+    warning, leaving pypdf alone.
+
+    Args:
+        name: Configured extractor name
+
+    Returns:
+        Extractors to try in order
+    """
+    chain: List[PdfExtractor] = []
+    if name != FALLBACK_EXTRACTOR:
+        try:
+            chain.append(create_extractor(name))
+        except ImportError as e:
+            logger.warning(f"PDF extractor '{name}' unavailable ({str(e)}), using {FALLBACK_EXTRACTOR}")
+    chain.append(create_extractor(FALLBACK_EXTRACTOR))
+    logger.info(f"PDF extraction: {' -> '.join(extractor.name for extractor in chain)}")
+    return chain
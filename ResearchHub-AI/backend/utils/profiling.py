@@ -0,0 +1,435 @@
+"""
+Profiling Module
+On-demand cProfile capture of selected HTTP requests and write jobs.
+
+A request is profiled when it carries an `X-Profile` header together with
+a valid admin token, or when its path matches a prefix switched on through
+the admin API; write jobs are profiled when their operation is switched on.
+Captures are rate limited (one at a time, PROFILING_MAX_PER_MINUTE per
+process) and saved as .prof files that load in pstats or snakeviz.
+
+cProfile only sees the thread it is enabled in, so the capture session is
+carried in a context variable and functions decorated with `@profiled`
+add their own thread's profile when they run inside a profiled request
+(e.g. a sync endpoint in the thread pool, or the ingest writer thread).
+
+When PROFILING_ENABLED is off the middleware is not installed and
+`@profiled` returns the function unchanged, so there is no overhead.
+"""
+
+import cProfile
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+ADMIN_TOKEN_HEADER = "x-admin-token"
+PROFILE_ID_HEADER = "x-profile-id"
+TOGGLES_FILE = "profiling.json"
+# Seconds between re-reads of the shared toggles file
+TOGGLES_POLL_INTERVAL = 1.0
+
+_session: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+_store: Optional["ProfileStore"] = None
+
+
+def admin_token_valid(token: Optional[str]) -> bool:
+    """True if admin access is configured and `token` matches ADMIN_TOKEN."""
+    return bool(Config.ADMIN_TOKEN) and token is not None and secrets.compare_digest(token, Config.ADMIN_TOKEN)
+
+
+class ProfileSession:
+    """cProfile captures from every thread that worked on one request or job."""
+
+    def __init__(self, kind: str, target: str):
+        self.kind = kind
+        self.target = target
+        self.profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{kind}-{uuid.uuid4().hex[:8]}"
+        self.started = time.perf_counter()
+        self._profiles: List[cProfile.Profile] = []
+        self._active_threads = set()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def capture(self) -> Iterator[None]:
+        """Profile the current thread for the duration of the block."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            nested = thread_id in self._active_threads
+            self._active_threads.add(thread_id)
+        if nested:
+            # An outer block in this thread is already profiling
+            yield
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler (e.g. a debugger) owns this thread
+            logger.warning(f"Could not start profiler: {str(e)}")
+            with self._lock:
+                self._active_threads.discard(thread_id)
+            yield
+            return
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._active_threads.discard(thread_id)
+                self._profiles.append(profile)
+
+    def stats(self) -> Optional[pstats.Stats]:
+        """Merged statistics of all captured threads."""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        merged = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            merged.add(profile)
+        return merged
+
+
+class _RateLimiter:
+    """Token bucket allowing one capture at a time and `per_minute` on average."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = max(1, per_minute)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.active = False
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60.0)
+            self.updated = now
+            if self.active or self.tokens < 1:
+                return False
+            self.tokens -= 1
+            self.active = True
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.active = False
+
+
+class ProfileStore:
+    """
+    Directory of saved profiles plus the toggles shared by all processes.
+
+    Features:
+    - Each capture is saved as `<id>.prof` with a `<id>.json` description
+    - Oldest captures are pruned beyond `max_files`
+    - Toggles live in `profiling.json`, so any worker's admin call applies
+      to every process (including the serve.py writer)
+    """
+
+    def __init__(self, profile_dir: str, max_files: Optional[int] = None, per_minute: Optional[int] = None):
+        """
+        Initialize ProfileStore.
+
+        Args:
+            profile_dir: Directory for dumps and the toggles file
+            max_files: Captures kept (defaults to Config.PROFILE_MAX_FILES)
+            per_minute: Captures allowed per minute in this process
+                (defaults to Config.PROFILING_MAX_PER_MINUTE)
+        """
+        self.root = Path(profile_dir).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_files = max(1, max_files or Config.PROFILE_MAX_FILES)
+        self.limiter = _RateLimiter(per_minute or Config.PROFILING_MAX_PER_MINUTE)
+        self._toggles: Dict[str, Any] = {}
+        self._toggles_mtime = None
+        self._next_poll = 0.0
+
+    # ------------------------------------------------------------------
+    # Toggles
+    # ------------------------------------------------------------------
+
+    def get_toggles(self) -> Dict[str, Any]:
+        """Current toggles, re-read from disk at most once per poll interval."""
+        now = time.monotonic()
+        if now >= self._next_poll:
+            self._next_poll = now + TOGGLES_POLL_INTERVAL
+            path = self.root / TOGGLES_FILE
+            try:
+                mtime = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                self._toggles, self._toggles_mtime = {}, None
+            else:
+                if mtime != self._toggles_mtime:
+                    try:
+                        with open(path, "r", encoding="utf-8") as f:
+                            self._toggles = json.load(f)
+                        self._toggles_mtime = mtime
+                    except (OSError, ValueError) as e:
+                        logger.warning(f"Ignoring unreadable profiling toggles: {str(e)}")
+        toggles = self._toggles
+        if toggles.get("expires_at") and time.time() > toggles["expires_at"]:
+            return {}
+        return toggles
+
+    def set_toggles(
+        self,
+        paths: List[str],
+        jobs: List[str],
+        sample_rate: float,
+        expires_in: Optional[float]
+    ) -> Dict[str, Any]:
+        """
+        Switch profiling on for path prefixes and write-job operations.
+
+        Args:
+            paths: Request path prefixes to profile (e.g. /api/v1/chat/chat)
+            jobs: Write-job operations to profile (e.g. upload, ingest_directory)
+            sample_rate: Fraction of matching requests/jobs to profile
+            expires_in: Seconds until the toggles lapse (None = no expiry)
+
+        Returns:
+            The stored toggles
+        """
+        toggles = {
+            "paths": paths,
+            "jobs": jobs,
+            "sample_rate": min(max(sample_rate, 0.0), 1.0),
+            "expires_at": time.time() + expires_in if expires_in else None,
+        }
+        tmp_path = self.root / f"{TOGGLES_FILE}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(toggles, f)
+        os.replace(tmp_path, self.root / TOGGLES_FILE)
+        self._next_poll = 0.0
+        return toggles
+
+    def clear_toggles(self) -> None:
+        """Switch all toggled profiling off."""
+        (self.root / TOGGLES_FILE).unlink(missing_ok=True)
+        self._next_poll = 0.0
+
+    def path_selected(self, path: str) -> bool:
+        toggles = self.get_toggles()
+        prefixes = toggles.get("paths") or []
+        return any(path.startswith(p) for p in prefixes) and random.random() < toggles.get("sample_rate", 1.0)
+
+    def job_selected(self, op: str) -> bool:
+        toggles = self.get_toggles()
+        return op in (toggles.get("jobs") or []) and random.random() < toggles.get("sample_rate", 1.0)
+
+    # ------------------------------------------------------------------
+    # Dumps
+    # ------------------------------------------------------------------
+
+    def save(self, session: ProfileSession, **details: Any) -> Optional[str]:
+        """
+        Write a finished session to disk.
+
+        Returns:
+            The profile id, or None if nothing was captured
+        """
+        stats = session.stats()
+        if stats is None:
+            return None
+        stats.dump_stats(str(self.root / f"{session.profile_id}.prof"))
+        description = {
+            "id": session.profile_id,
+            "kind": session.kind,
+            "target": session.target,
+            "created_at": time.time(),
+            "duration_ms": round((time.perf_counter() - session.started) * 1000, 3),
+            "pid": os.getpid(),
+            **details,
+        }
+        with open(self.root / f"{session.profile_id}.json", "w", encoding="utf-8") as f:
+            json.dump(description, f)
+        self._prune()
+        logger.info(f"Saved profile {session.profile_id} ({session.kind} {session.target})")
+        return session.profile_id
+
+    def _prune(self) -> None:
+        dumps = sorted(self.root.glob("*.prof"), key=lambda p: p.stat().st_mtime)
+        for path in dumps[:-self.max_files]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".json").unlink(missing_ok=True)
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Descriptions of saved profiles, newest first."""
+        profiles = []
+        for path in self.root.glob("*.json"):
+            if path.name == TOGGLES_FILE:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    description = json.load(f)
+                description["size_bytes"] = path.with_suffix(".prof").stat().st_size
+            except (OSError, ValueError):
+                continue
+            profiles.append(description)
+        return sorted(profiles, key=lambda p: p.get("created_at", 0), reverse=True)
+
+    def profile_path(self, profile_id: str) -> Path:
+        """
+        Path of a saved .prof file.
+
+        Raises:
+            FileNotFoundError: If the id is malformed or unknown
+        """
+        if not re.fullmatch(r"[A-Za-z0-9_-]+", profile_id):
+            raise FileNotFoundError(profile_id)
+        path = self.root / f"{profile_id}.prof"
+        if not path.exists():
+            raise FileNotFoundError(profile_id)
+        return path
+
+    def summary(self, profile_id: str, sort: str = "cumulative", limit: int = 50) -> str:
+        """Text report of a saved profile's top functions."""
+        output = io.StringIO()
+        stats = pstats.Stats(str(self.profile_path(profile_id)), stream=output)
+        stats.sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+def configure_profiling(profile_dir: str) -> Optional[ProfileStore]:
+    """
+    Set up the process-wide profile store (no-op unless PROFILING_ENABLED).
+
+    Args:
+        profile_dir: Directory for dumps and toggles, shared by all processes
+
+    Returns:
+        The store, or None when profiling is disabled
+    """
+    global _store
+    if not Config.PROFILING_ENABLED:
+        return None
+    _store = ProfileStore(profile_dir)
+    if not Config.ADMIN_TOKEN:
+        logger.warning("PROFILING_ENABLED is set but ADMIN_TOKEN is empty; profiles cannot be requested or downloaded")
+    return _store
+
+
+def get_profile_store() -> Optional[ProfileStore]:
+    return _store
+
+
+@contextmanager
+def _run_session(store: ProfileStore, kind: str, target: str, **details: Any) -> Iterator[ProfileSession]:
+    session = ProfileSession(kind, target)
+    token = _session.set(session)
+    try:
+        with session.capture():
+            yield session
+    finally:
+        _session.reset(token)
+        try:
+            store.save(session, **details)
+        finally:
+            store.limiter.release()
+
+
+@contextmanager
+def profile_job(op: str) -> Iterator[Optional[ProfileSession]]:
+    """
+    Profile a write job if its operation is toggled on and the rate limit allows.
+
+    Args:
+        op: Write-job operation name
+
+    Yields:
+        The capture session, or None when the job is not profiled
+    """
+    store = _store
+    if store is None or not store.job_selected(op) or not store.limiter.acquire():
+        yield None
+        return
+    with _run_session(store, "job", op) as session:
+        yield session
+
+
+def profiled(func: Callable) -> Callable:
+    """
+    Include a function's own thread in the current request's or job's profile.
+
+    Decorate functions that may run outside the thread that started the
+    capture (thread-pool endpoints, ingest writer threads). The check is a
+    single context-variable lookup; with PROFILING_ENABLED off the function
+    is returned undecorated.
+    """
+    if not Config.PROFILING_ENABLED:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        session = _session.get()
+        if session is None:
+            return func(*args, **kwargs)
+        with session.capture():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling selected requests.
+
+    A request is profiled if it sends `X-Profile: 1` with a valid
+    `X-Admin-Token`, or its path matches a toggled prefix. Profiled
+    responses carry `X-Profile-Id` naming the saved dump.
+    """
+
+    def __init__(self, app: Any, store: Optional[ProfileStore] = None):
+        self.app = app
+        self.store = store
+
+    def _requested(self, scope: Dict[str, Any]) -> bool:
+        headers = dict(scope["headers"])
+        flag = headers.get(PROFILE_HEADER.encode("latin-1"))
+        if flag and flag.decode("latin-1").lower() not in ("0", "false", "no"):
+            token = headers.get(ADMIN_TOKEN_HEADER.encode("latin-1"))
+            return admin_token_valid(token.decode("latin-1") if token else None)
+        return False
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        store = self.store or _store
+        if scope["type"] != "http" or store is None:
+            await self.app(scope, receive, send)
+            return
+        if not (self._requested(scope) or store.path_selected(scope["path"])) or not store.limiter.acquire():
+            await self.app(scope, receive, send)
+            return
+
+        target = f"{scope['method']} {scope['path']}"
+        with _run_session(store, "request", target) as session:
+
+            async def send_with_id(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (PROFILE_ID_HEADER.encode("latin-1"), session.profile_id.encode("latin-1"))
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_id)
@@ -0,0 +1,133 @@
+"""
+Quarantine Module
+Holds PDFs whose extraction failed, with the reason, so they are not retried.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils.pdf_extractors import ExtractionError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Quarantine:
+    """
+    Quarantined PDFs keyed by content hash.
+
+    Features:
+    - Keeps a copy (or the moved original) of each failing PDF
+    - Records the source name, failure reason and detail in an index
+    - Lets ingestion skip known-bad files without parsing them again
+    """
+
+    def __init__(self, data_dir: str):
+        """
+        Initialize Quarantine.
+
+        Args:
+            data_dir: Data directory; files are kept in its `quarantine` subfolder
+        """
+        self.root = Path(data_dir).resolve() / "quarantine"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading quarantine index {self.index_path}: {str(e)}")
+            return {}
+
+    def _save_index(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def add(
+        self,
+        file_path: str,
+        source: str,
+        content_hash: str,
+        error: ExtractionError,
+        move: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Quarantine a PDF.
+
+        Args:
+            file_path: Location of the failing PDF
+            source: Name the PDF was ingested as
+            content_hash: Content hash of the PDF
+            error: The extraction failure
+            move: Move the file out of its location instead of copying it
+
+        Returns:
+            The quarantine entry
+        """
+        target = self.root / f"{content_hash}.pdf"
+        try:
+            if move:
+                shutil.move(file_path, target)
+            else:
+                shutil.copyfile(file_path, target)
+        except OSError as e:
+            logger.warning(f"Could not keep a copy of quarantined {source}: {str(e)}")
+
+        entry = {
+            "source": source,
+            "content_hash": content_hash,
+            "reason": error.reason,
+            "detail": error.detail,
+            "file": target.name if target.exists() else None,
+            "quarantined_at": time.time(),
+        }
+        with self._lock:
+            entries = self._load_index()
+            entries[content_hash] = entry
+            self._save_index(entries)
+        logger.warning(f"Quarantined {source} ({error.reason}): {error.detail}")
+        return entry
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the quarantine entry of a PDF, or None."""
+        return self._load_index().get(content_hash)
+
+    def contains(self, content_hash: str) -> bool:
+        """Check whether a PDF is quarantined."""
+        return content_hash in self._load_index()
+
+    def list_entries(self) -> List[Dict[str, Any]]:
+        """List quarantined PDFs, newest first."""
+        entries = list(self._load_index().values())
+        entries.sort(key=lambda entry: entry.get("quarantined_at", 0), reverse=True)
+        return entries
+
+    def release(self, content_hash: str) -> bool:
+        """
+        Forget a quarantined PDF (and delete its copy) so it can be retried.
+
+        Returns:
+            True if the PDF was quarantined
+        """
+        with self._lock:
+            entries = self._load_index()
+            entry = entries.pop(content_hash, None)
+            if entry is None:
+                return False
+            self._save_index(entries)
+        (self.root / f"{content_hash}.pdf").unlink(missing_ok=True)
+        return True
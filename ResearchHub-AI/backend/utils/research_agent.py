@@ -1,18 +1,30 @@
 import os
-from typing import Dict, Any, List
-from utils.vector_store import VectorStore
+from typing import Dict, Any, List, Optional
+from config import Config
 from utils.llm_client import GroqClient
+from utils.profiling import profiled
+from utils.tracing import traced
+from utils.workspaces import WorkspaceManager
 
 
 class ResearchAgent:
-    def __init__(self, db_path: str, collection_name: str):
+    def __init__(
+        self,
+        db_path: str,
+        collection_name: str,
+        workspace_manager: Optional[WorkspaceManager] = None
+    ):
         """
         ResearchAgent requires an explicit `db_path` and `collection_name`.
 
         This enforces that the path is provided by `main.py` at startup
-        and avoids accidental use of a relative or in-memory DB.
+        and avoids accidental use of a relative or in-memory DB. Pass the
+        app's shared `workspace_manager` to reuse its client and model.
         """
-        self.vector_store = VectorStore(db_path=db_path, collection_name=collection_name)
+        self.workspaces = workspace_manager or WorkspaceManager(
+            db_path=db_path, collection_name=collection_name
+        )
+        self.vector_store = self.workspaces.get(Config.DEFAULT_WORKSPACE)
 
         try:
             self.llm = GroqClient()
@@ -28,7 +40,17 @@ class ResearchAgent:
             logger = logging.getLogger(__name__)
             logger.warning(f"GroqClient initialization failed: {str(e)}. AI responses will be disabled.")
 
-    def analyze_topic(self, query: str, top_k: int = 5, use_context: bool = True) -> Dict[str, Any]:
+    @profiled
+    def analyze_topic(
+        self,
+        query: str,
+        top_k: int = 5,
+        use_context: bool = True,
+        workspace: str = Config.DEFAULT_WORKSPACE,
+        diversify: Optional[bool] = None,
+        mmr_lambda: Optional[float] = None,
+        max_per_source: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         Analyze a topic using optional context from the vector store.
 
@@ -36,42 +58,43 @@ class ResearchAgent:
             query: User query string.
             top_k: Number of similar documents to retrieve from the vector store.
             use_context: If False, skip retrieval and call the LLM directly with the query.
+            workspace: Workspace whose collection is searched for context.
+            diversify, mmr_lambda, max_per_source: Context diversification,
+                see BaseVectorStore.query_by_embedding (None uses Config).
 
         Returns:
             Dict with analysis, query and metadata about sources used.
         """
+        with traced("agent.analyze_topic", timing_key="total", workspace=workspace, use_context=use_context):
+            return self._analyze_topic(
+                query, top_k, use_context, workspace,
+                {"diversify": diversify, "mmr_lambda": mmr_lambda, "max_per_source": max_per_source}
+            )
+
+    def _analyze_topic(
+        self,
+        query: str,
+        top_k: int,
+        use_context: bool,
+        workspace: str,
+        diversity: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Retrieve context, assemble the prompt and call the LLM (see analyze_topic)."""
         results: List[Dict[str, Any]] = []
 
         # Retrieve context if requested
         if use_context:
-            results = self.vector_store.query_similar_documents(query, top_k=top_k)
-
-        # If no context is found and use_context was requested, fall back to empty context
-        if use_context and not results:
-            context = ""
-        else:
-            context = "\n\n".join([r["document"] for r in results]) if results else ""
+            vector_store = self.workspaces.get(workspace)
+            results = vector_store.query_similar_documents(query, top_k=top_k, **diversity)
 
         # Build structured prompt
-        prompt = f"""
-You are a research intelligence assistant.
-
-Using the research context below, generate a structured research analysis.
-
-Research Context:
-{context}
-
-User Query:
-{query}
-
-Return output in this structure:
-
-1. Executive Summary
-2. Key Findings
-3. Methodology Comparison
-4. Research Gaps
-5. Future Scope
-"""
+        with traced("agent.build_prompt", timing_key="prompt_assembly"):
+            # If no context is found and use_context was requested, fall back to empty context
+            if use_context and not results:
+                context = ""
+            else:
+                context = "\n\n".join([r["document"] for r in results]) if results else ""
+            prompt = self._build_prompt(query, context)
 
         # Call LLM if available, otherwise return helpful message
         if self.llm:
@@ -136,6 +159,30 @@ Once configured, the system will provide intelligent research analysis combining
             "query": query,
             "analysis": analysis,
             "source_chunks_used": len(results),
+            "distinct_sources": len({(r["metadata"] or {}).get("source") for r in results}),
             "top_k": top_k,
+            "workspace": workspace,
             "model": self.model_name
         }
+
+    def _build_prompt(self, query: str, context: str) -> str:
+        """Build the structured analysis prompt."""
+        return f"""
+You are a research intelligence assistant.
+
+Using the research context below, generate a structured research analysis.
+
+Research Context:
+{context}
+
+User Query:
+{query}
+
+Return output in this structure:
+
+1. Executive Summary
+2. Key Findings
+3. Methodology Comparison
+4. Research Gaps
+5. Future Scope
+"""
@@ -0,0 +1,220 @@
+"""
+Shared Model Module
+Loads the sentence-transformer with its weights memory-mapped from disk.
+
+When several server processes load the same model, each would normally
+hold a private copy of every weight tensor. With Config.SHARED_MODEL_DIR
+set, the weights are exported once as raw tensor files and every process
+maps them read-only, so the pages live in the OS page cache and are shared
+between processes instead of being duplicated in each one's RSS.
+
+The export also holds the model's structure with every tensor on the meta
+device. Processes that find an export build the model from that skeleton
+and map the weights straight into it, so they never hold a private copy,
+not even while loading.
+"""
+
+import copy
+import json
+import logging
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import torch
+from sentence_transformers import SentenceTransformer
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+# Pickled model whose parameters and buffers are all on the meta device
+SKELETON_FILE = "skeleton.pt"
+
+
+def _model_dir(shared_dir: str, model_name: str) -> Path:
+    """Return the export directory for one model."""
+    return Path(shared_dir).resolve() / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+
+
+def _named_tensors(model: torch.nn.Module):
+    """Yield (module, slot kind, slot name, qualified name, tensor) for every parameter and buffer."""
+    for module_name, module in model.named_modules():
+        for kind, slots in (("parameter", module._parameters), ("buffer", module._buffers)):
+            for name, tensor in slots.items():
+                if tensor is not None:
+                    qualified = f"{module_name}.{name}" if module_name else name
+                    yield module, kind, name, qualified, tensor
+
+
+def export_model_weights(model: SentenceTransformer, target_dir: Path) -> None:
+    """
+    Write every parameter and buffer of a model as a raw tensor file.
+
+    The export is staged in a temporary directory and renamed into place,
+    so concurrent processes never see a partial export.
+
+    Args:
+        model: Loaded model to export
+        target_dir: Final export directory
+    """
+    staging = target_dir.with_name(f"{target_dir.name}.{uuid.uuid4().hex}.tmp")
+    staging.mkdir(parents=True)
+    manifest: Dict[str, Any] = {}
+    files: Dict[int, str] = {}
+
+    for _, _, _, qualified, tensor in _named_tensors(model):
+        # Tied weights (one tensor in several modules) are written once
+        key = id(tensor)
+        if key not in files:
+            files[key] = f"{len(files):05d}.bin"
+            tensor.detach().cpu().contiguous().numpy().tofile(staging / files[key])
+        manifest[qualified] = {
+            "file": files[key],
+            "dtype": str(tensor.dtype).replace("torch.", ""),
+            "shape": list(tensor.shape),
+        }
+
+    with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    # Deep-copy the module tree with every tensor swapped for an empty meta
+    # tensor of the same shape (tied weights stay tied)
+    memo: Dict[int, Any] = {}
+    for _, kind, _, _, tensor in _named_tensors(model):
+        if id(tensor) not in memo:
+            meta = torch.empty_like(tensor, device="meta")
+            memo[id(tensor)] = torch.nn.Parameter(meta, requires_grad=False) if kind == "parameter" else meta
+    try:
+        torch.save(copy.deepcopy(model, memo), staging / SKELETON_FILE)
+    except Exception as e:
+        # Readers then load the model in full before mapping its weights
+        logger.warning(f"Could not export the model skeleton: {str(e)}")
+
+    try:
+        os.rename(staging, target_dir)
+        logger.info(f"Exported {len(files)} weight tensors to {target_dir}")
+    except OSError:
+        # Another process finished its export first; use that one
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def map_model_weights(model: SentenceTransformer, source_dir: Path) -> int:
+    """
+    Replace a model's parameters and buffers with memory-mapped tensors.
+
+    Files are mapped copy-on-write, so inference shares the page-cache
+    pages and nothing is ever written back to the export.
+
+    Args:
+        model: Loaded model whose tensors are replaced in place
+        source_dir: Directory written by export_model_weights
+
+    Returns:
+        Number of tensors mapped
+
+    Raises:
+        RuntimeError: If a meta tensor (from a skeleton) has no shared weights
+    """
+    with open(source_dir / MANIFEST_FILE, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    mapped: Dict[str, torch.Tensor] = {}
+    count = 0
+    for module, kind, name, qualified, tensor in list(_named_tensors(model)):
+        entry = manifest.get(qualified)
+        if entry is None or list(tensor.shape) != entry["shape"]:
+            if tensor.is_meta:
+                raise RuntimeError(f"Shared weights have no match for '{qualified}'")
+            logger.warning(f"Shared weights have no match for '{qualified}'; keeping private copy")
+            continue
+        if entry["file"] not in mapped:
+            dtype = getattr(torch, entry["dtype"])
+            numel = 1
+            for dim in entry["shape"]:
+                numel *= dim
+            mapped[entry["file"]] = torch.from_file(
+                str(source_dir / entry["file"]), shared=False, size=numel, dtype=dtype
+            ).view(entry["shape"])
+        shared = mapped[entry["file"]]
+        if kind == "parameter":
+            module._parameters[name] = torch.nn.Parameter(shared, requires_grad=False)
+        else:
+            module._buffers[name] = shared
+        count += 1
+    return count
+
+
+def load_model_skeleton(source_dir: Path) -> Optional[SentenceTransformer]:
+    """
+    Load the weightless model written by export_model_weights.
+
+    The skeleton is a pickle written by this module into SHARED_MODEL_DIR,
+    so it is loaded with full unpickling.
+
+    Returns:
+        Model with all tensors on the meta device, or None if the export
+        has no usable skeleton (exports from older versions)
+    """
+    path = source_dir / SKELETON_FILE
+    if not path.exists():
+        return None
+    try:
+        try:
+            return torch.load(str(path), weights_only=False)
+        except TypeError:
+            # torch < 1.13 has no weights_only and always unpickles
+            return torch.load(str(path))
+    except Exception as e:
+        logger.warning(f"Could not load model skeleton {path}: {str(e)}")
+        return None
+
+
+def load_embedding_model(model_name: str, shared_dir: Optional[str] = None) -> SentenceTransformer:
+    """
+    Load a sentence-transformer, sharing its weights through mmap when configured.
+
+    Args:
+        model_name: Name of the sentence-transformer model
+        shared_dir: Export directory root (defaults to Config.SHARED_MODEL_DIR;
+            empty disables sharing)
+
+    Returns:
+        Model ready for encoding
+    """
+    logger.info(f"Loading embedding model: {model_name}")
+    shared_dir = shared_dir or Config.SHARED_MODEL_DIR
+    if not shared_dir:
+        return SentenceTransformer(model_name)
+
+    target_dir = _model_dir(shared_dir, model_name)
+    if (target_dir / MANIFEST_FILE).exists():
+        # Readers: weights go straight from the mapped files into the skeleton
+        model = load_model_skeleton(target_dir)
+        if model is not None:
+            try:
+                with torch.no_grad():
+                    count = map_model_weights(model, target_dir)
+                model.eval()
+                logger.info(f"Mapped {count} weight tensors of {model_name} into its skeleton from {target_dir}")
+                return model
+            except Exception as e:
+                logger.warning(f"Falling back to a full load of {model_name}: {str(e)}")
+
+    # Mapped tensors live in host memory
+    model = SentenceTransformer(model_name, device="cpu")
+    model.eval()
+    if not (target_dir / MANIFEST_FILE).exists():
+        target_dir.parent.mkdir(parents=True, exist_ok=True)
+        export_model_weights(model, target_dir)
+
+    with torch.no_grad():
+        count = map_model_weights(model, target_dir)
+    logger.info(f"Mapped {count} weight tensors of {model_name} from {target_dir}")
+    return model
@@ -0,0 +1,103 @@
+"""
+Snippets Module
+Query-centred excerpts of chunk text with match offsets for highlighting.
+
+List views only need a couple of lines around the query terms, not the
+whole chunk; a snippet is a window of the chunk holding the most distinct
+query terms, and `highlights` gives each match's [start, end) character
+offsets within the snippet so the client can mark them up safely.
+"""
+
+import re
+from typing import List, Set, Tuple
+
+WORD = re.compile(r"\w+")
+ELLIPSIS = "…"
+# Words too common to be worth centring a snippet on
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were what which "
+    "with how why when who does do did can about into than then there these those their".split()
+)
+
+
+def _normalize(word: str) -> str:
+    """Lower-case and strip a plural "s", so "models" matches "model"."""
+    word = word.lower()
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def query_terms(query: str) -> Set[str]:
+    """Normalized query words worth highlighting."""
+    return {
+        _normalize(word) for word in WORD.findall(query)
+        if len(word) > 1 and word.lower() not in STOPWORDS
+    }
+
+
+def make_snippet(text: str, terms: Set[str], width: int = 240) -> Tuple[str, List[List[int]]]:
+    """
+    Cut the window of `text` that covers the most distinct query terms.
+
+    Args:
+        text: Full chunk text
+        terms: Normalized query terms from `query_terms`
+        width: Maximum snippet length in characters (before ellipses)
+
+    Returns:
+        Tuple of (snippet, [start, end] offsets of matches in the snippet)
+    """
+    matches = [
+        (match.start(), match.end(), _normalize(match.group()))
+        for match in WORD.finditer(text)
+        if _normalize(match.group()) in terms
+    ] if terms else []
+
+    if len(text) <= width:
+        start, end = 0, len(text)
+    elif not matches:
+        start, end = 0, width
+    else:
+        # Two pointers over the matches: the window with the most distinct
+        # terms wins, then the one with the most matches
+        best = (0, 0, 0)
+        counts: dict = {}
+        left = 0
+        for right, (_, match_end, term) in enumerate(matches):
+            counts[term] = counts.get(term, 0) + 1
+            while match_end - matches[left][0] > width:
+                left_term = matches[left][2]
+                counts[left_term] -= 1
+                if not counts[left_term]:
+                    del counts[left_term]
+                left += 1
+            score = (len(counts), right - left + 1)
+            if score > best[:2]:
+                best = (*score, left)
+        first = matches[best[2]]
+        last_end = max(end for _, end, _ in matches[best[2]:best[2] + best[1]])
+        # Centre the matched span in the window
+        start = max(0, min(first[0] - (width - (last_end - first[0])) // 2, len(text) - width))
+        end = min(len(text), start + width)
+
+    # Snap to word boundaries, never cutting into a match
+    if start > 0 and text[start - 1].isalnum():
+        space = text.find(" ", start, start + 20)
+        first_match = next((m_start for m_start, _, _ in matches if m_start >= start), end)
+        if space != -1 and space < first_match:
+            start = space + 1
+    if end < len(text) and text[end].isalnum():
+        space = text.rfind(" ", max(start, end - 20), end)
+        last_match = max((m_end for _, m_end, _ in matches if m_end <= end), default=start)
+        if space != -1 and space >= last_match:
+            end = space
+
+    prefix = ELLIPSIS if start > 0 else ""
+    suffix = ELLIPSIS if end < len(text) else ""
+    snippet = prefix + text[start:end].strip() + suffix
+    shift = len(prefix) - start - (len(text[start:end]) - len(text[start:end].lstrip()))
+    highlights = [
+        [match_start + shift, match_end + shift]
+        for match_start, match_end, _ in matches
+        if match_start >= start and match_end <= end
+    ]
+    return snippet, highlights
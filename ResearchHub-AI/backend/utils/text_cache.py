@@ -0,0 +1,128 @@
+"""
+Text Cache Module
+Compressed on-disk cache of extracted PDF page texts.
+
+Entries are keyed by the PDF's content hash and the extractor version, so
+re-chunking a document never has to parse the PDF again, while upgrading
+the extractor naturally misses the cache. Entries are zstd-compressed
+when the `zstandard` package is installed and zlib-compressed otherwise;
+both formats are readable either way.
+"""
+
+import json
+import logging
+import os
+import re
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, fall back to zlib
+    zstandard = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ZSTD_SUFFIX = ".json.zst"
+ZLIB_SUFFIX = ".json.z"
+
+
+def _safe_version(extractor_version: str) -> str:
+    """Make an extractor version usable in a filename."""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", extractor_version)
+
+
+class TextCache:
+    """
+    Content-addressed cache of per-page PDF text.
+
+    Features:
+    - One compressed JSON entry per (content hash, extractor version)
+    - Atomic writes, so concurrent readers never see partial entries
+    - Unreadable entries are treated as misses and re-extracted
+    """
+
+    def __init__(self, cache_dir: str, level: int = 3):
+        """
+        Initialize TextCache.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            level: Compression level (zstd 1-22, zlib 1-9)
+        """
+        self.root = Path(cache_dir).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.level = level
+        self.codec = "zstd" if zstandard is not None else "zlib"
+        logger.info(f"TextCache initialized at {self.root} ({self.codec})")
+
+    def _base_path(self, content_hash: str, extractor_version: str) -> Path:
+        return self.root / content_hash[:2] / f"{content_hash}.{_safe_version(extractor_version)}"
+
+    def _compress(self, payload: bytes) -> bytes:
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=self.level).compress(payload)
+        return zlib.compress(payload, min(max(self.level, 1), 9))
+
+    def get(self, content_hash: str, extractor_version: str) -> Optional[List[str]]:
+        """
+        Look up the page texts of a document.
+
+        Args:
+            content_hash: Content hash of the source PDF
+            extractor_version: Version of the extractor that produced the text
+
+        Returns:
+            List of page texts, or None on a cache miss
+        """
+        base = self._base_path(content_hash, extractor_version)
+        for suffix in (ZSTD_SUFFIX, ZLIB_SUFFIX):
+            path = base.with_name(base.name + suffix)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            try:
+                if suffix == ZSTD_SUFFIX:
+                    if zstandard is None:
+                        continue
+                    # The frame header carries the size, so one-shot decompression works
+                    payload = zstandard.ZstdDecompressor().decompress(data)
+                else:
+                    payload = zlib.decompress(data)
+                return json.loads(payload.decode("utf-8"))["pages"]
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable text cache entry {path.name}: {str(e)}")
+        return None
+
+    def put(self, content_hash: str, extractor_version: str, pages: List[str]) -> None:
+        """
+        Store the page texts of a document.
+
+        Args:
+            content_hash: Content hash of the source PDF
+            extractor_version: Version of the extractor that produced the text
+            pages: Text of each page (empty string for pages without text)
+        """
+        base = self._base_path(content_hash, extractor_version)
+        path = base.with_name(base.name + (ZSTD_SUFFIX if zstandard is not None else ZLIB_SUFFIX))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({"extractor_version": extractor_version, "pages": pages}).encode("utf-8")
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(self._compress(payload))
+        os.replace(tmp_path, path)
+
+    def stats(self) -> Dict[str, Any]:
+        """Count the cached entries and their size on disk."""
+        entries = 0
+        size = 0
+        for path in self.root.glob("*/*.json.z*"):
+            entries += 1
+            size += path.stat().st_size
+        return {"entries": entries, "bytes": size, "codec": self.codec}
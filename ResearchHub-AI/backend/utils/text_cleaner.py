@@ -0,0 +1,208 @@
+"""
+Text Cleaner Module
+Strips boilerplate from extracted page texts before chunking.
+
+Running headers, footers, page numbers and licence lines repeat on every
+page of a paper and the reference list at the end rarely helps retrieval;
+embedding them inflates chunk counts, embedding time, index size and
+prompt tokens. The cleaner works on the per-page texts from the extractor
+(and the text cache), so changing its settings only needs a re-chunk.
+"""
+
+import hashlib
+import json
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump whenever cleaning output changes so re-chunked documents get new ids
+CLEANER_VERSION = 1
+
+REFERENCES_HEADING = re.compile(
+    r"^\s*(?:[0-9]+\.?|[IVX]+\.)?\s*(references|bibliography|works cited|literature cited)\s*$",
+    re.IGNORECASE
+)
+APPENDIX_HEADING = re.compile(
+    r"^\s*(?:[A-Z0-9]+\.?)?\s*(appendix|appendices|supplementary material)\b",
+    re.IGNORECASE
+)
+HYPHENATED_BREAK = re.compile(r"([A-Za-z])-\n[ \t]*([a-z])")
+HORIZONTAL_SPACE = re.compile(r"[ \t\f\v\u00a0]+")
+DIGITS = re.compile(r"\d+")
+MAX_HEADING_LENGTH = 60
+
+
+def _is_appendix_heading(line: str) -> bool:
+    return len(line.strip()) <= MAX_HEADING_LENGTH and bool(APPENDIX_HEADING.match(line))
+
+
+def _line_key(line: str) -> str:
+    """Normalize a line for repetition counting (case, digits and spacing ignored)."""
+    return DIGITS.sub("#", HORIZONTAL_SPACE.sub(" ", line).strip().lower())
+
+
+class TextCleaner:
+    """
+    Removes boilerplate from the pages of one document.
+
+    Features:
+    - Drops lines repeated across pages in the header/footer zones
+      (first and last `edge_lines` lines), with page numbers normalized
+    - Joins words hyphenated across line breaks
+    - Collapses runs of spaces and blank lines
+    - Optionally drops the reference section (up to any appendix)
+    """
+
+    def __init__(
+        self,
+        edge_lines: int = 3,
+        min_repeat_fraction: float = 0.5,
+        dehyphenate: bool = True,
+        collapse_whitespace: bool = True,
+        drop_references: bool = False
+    ):
+        """
+        Initialize TextCleaner.
+
+        Args:
+            edge_lines: Lines at the top and bottom of each page searched for boilerplate
+            min_repeat_fraction: Fraction of pages a line must appear on to be boilerplate
+            dehyphenate: Join "exam-\\nple" into "example"
+            collapse_whitespace: Collapse spaces and blank lines
+            drop_references: Drop the bibliography section
+        """
+        self.edge_lines = max(0, edge_lines)
+        self.min_repeat_fraction = min_repeat_fraction
+        self.dehyphenate = dehyphenate
+        self.collapse_whitespace = collapse_whitespace
+        self.drop_references = drop_references
+
+    @property
+    def signature(self) -> str:
+        """Short identifier of the cleaning settings, recorded in chunk metadata."""
+        settings = json.dumps([
+            CLEANER_VERSION, self.edge_lines, self.min_repeat_fraction,
+            self.dehyphenate, self.collapse_whitespace, self.drop_references
+        ])
+        return f"c{CLEANER_VERSION}-{hashlib.sha1(settings.encode('utf-8')).hexdigest()[:8]}"
+
+    def clean(self, pages: List[str]) -> Tuple[List[str], Dict[str, Any]]:
+        """
+        Clean the pages of one document.
+
+        Args:
+            pages: Extracted text of each page
+
+        Returns:
+            Tuple of (cleaned pages, stats with `boilerplate_lines`,
+            `dehyphenated` and `reference_characters`)
+        """
+        lines_per_page = [page.split("\n") for page in pages]
+        stats: Dict[str, Any] = {"boilerplate_lines": 0, "dehyphenated": 0, "reference_characters": 0}
+
+        repeated = self._repeated_edge_lines(lines_per_page)
+        if repeated:
+            for index, lines in enumerate(lines_per_page):
+                kept = self._strip_edges(lines, repeated)
+                stats["boilerplate_lines"] += len(lines) - len(kept)
+                lines_per_page[index] = kept
+
+        if self.drop_references:
+            stats["reference_characters"] = self._drop_references(lines_per_page)
+
+        cleaned = []
+        for lines in lines_per_page:
+            text = "\n".join(lines)
+            if self.dehyphenate:
+                text, joined = HYPHENATED_BREAK.subn(r"\1\2", text)
+                stats["dehyphenated"] += joined
+            if self.collapse_whitespace:
+                text = self._collapse(text)
+            cleaned.append(text)
+        return cleaned, stats
+
+    def _edge_indexes(self, lines: List[str]) -> List[int]:
+        """Indexes of the first and last `edge_lines` non-empty lines of a page."""
+        non_empty = [i for i, line in enumerate(lines) if line.strip()]
+        if len(non_empty) <= 2 * self.edge_lines:
+            return non_empty
+        return non_empty[:self.edge_lines] + non_empty[-self.edge_lines:]
+
+    def _repeated_edge_lines(self, lines_per_page: List[List[str]]) -> set:
+        """Normalized edge lines found on enough pages to count as boilerplate."""
+        if len(lines_per_page) < 2 or not self.edge_lines:
+            return set()
+        counts: Counter = Counter()
+        for lines in lines_per_page:
+            counts.update({_line_key(lines[i]) for i in self._edge_indexes(lines)})
+        threshold = max(2, self.min_repeat_fraction * len(lines_per_page))
+        return {key for key, count in counts.items() if count >= threshold}
+
+    def _strip_edges(self, lines: List[str], repeated: set) -> List[str]:
+        drop = {i for i in self._edge_indexes(lines) if _line_key(lines[i]) in repeated}
+        return [line for i, line in enumerate(lines) if i not in drop]
+
+    @staticmethod
+    def _drop_references(lines_per_page: List[List[str]]) -> int:
+        """
+        Cut from the last references heading in the second half of the
+        document up to the next appendix heading; returns characters dropped.
+        """
+        start = None
+        for page_index in range(len(lines_per_page) - 1, len(lines_per_page) // 2 - 1, -1):
+            lines = lines_per_page[page_index]
+            for line_index in range(len(lines) - 1, -1, -1):
+                if REFERENCES_HEADING.match(lines[line_index]):
+                    start = (page_index, line_index)
+                    break
+            if start:
+                break
+        if start is None:
+            return 0
+
+        dropped = 0
+        page_index, line_index = start
+        for index in range(page_index, len(lines_per_page)):
+            lines = lines_per_page[index]
+            first = line_index if index == page_index else 0
+            # The heading itself is never an appendix; later pages are searched from the top
+            search_from = first + 1 if index == page_index else 0
+            end = next(
+                (i for i in range(search_from, len(lines)) if _is_appendix_heading(lines[i])),
+                None
+            )
+            cut = lines[first:end] if end is not None else lines[first:]
+            dropped += sum(len(line) + 1 for line in cut)
+            lines_per_page[index] = lines[:first] + (lines[end:] if end is not None else [])
+            if end is not None:
+                break
+        return dropped
+
+    @staticmethod
+    def _collapse(text: str) -> str:
+        lines = [HORIZONTAL_SPACE.sub(" ", line).strip() for line in text.split("\n")]
+        collapsed: List[str] = []
+        for line in lines:
+            if line or (collapsed and collapsed[-1]):
+                collapsed.append(line)
+        return "\n".join(collapsed).strip()
+
+
+def create_text_cleaner() -> Optional[TextCleaner]:
+    """Build the cleaner configured by TEXT_CLEANING_* settings (None when disabled)."""
+    if not Config.TEXT_CLEANING_ENABLED:
+        return None
+    return TextCleaner(
+        edge_lines=Config.CLEAN_EDGE_LINES,
+        min_repeat_fraction=Config.CLEAN_MIN_REPEAT_FRACTION,
+        dehyphenate=Config.CLEAN_DEHYPHENATE,
+        collapse_whitespace=Config.CLEAN_COLLAPSE_WHITESPACE,
+        drop_references=Config.CLEAN_DROP_REFERENCES
+    )
@@ -0,0 +1,242 @@
+"""
+Tracing Module
+OpenTelemetry spans for the search and chat pipelines, plus per-request
+timing breakdowns.
+
+Spans go through the OpenTelemetry API, so with TRACING_EXPORTER=none they
+are no-ops. Timings are collected separately: when an endpoint opts in
+with `collect_timings()`, every `traced()` block in that request also
+records its wall time in milliseconds, whether or not the trace is sampled.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from importlib.metadata import entry_points
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from opentelemetry import propagate, trace
+from opentelemetry.propagators.composite import CompositePropagator
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from config import Config
+from utils.metrics import route_template
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+tracer = trace.get_tracer("researchhub")
+
+# Timing breakdown of the current request, or None when not requested
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+# Propagation is off until configure_tracing() installs propagators
+_propagation_enabled = False
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """
+    Append finished spans to a local file, one OpenTelemetry JSON span per line.
+
+    The file is opened in append mode and each batch is written with a
+    single call, so several worker processes can share it.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        directory = os.path.dirname(os.path.abspath(file_path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(span.to_json(indent=None) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.file_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.warning(f"Failed to write spans to {self.file_path}: {str(e)}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _load_propagators(names: List[str]) -> List[Any]:
+    """Instantiate text-map propagators by their registered entry-point names."""
+    propagators = []
+    for name in names:
+        matches = list(entry_points(group="opentelemetry_propagator", name=name))
+        if not matches:
+            logger.warning(f"Unknown trace propagator '{name}', skipping")
+            continue
+        propagators.append(matches[0].load()())
+    return propagators
+
+
+def _create_exporter(kind: str) -> Optional[SpanExporter]:
+    """Build the span exporter selected by TRACING_EXPORTER."""
+    if kind == "file":
+        return JsonLinesSpanExporter(Config.TRACING_FILE)
+    if kind == "console":
+        return ConsoleSpanExporter()
+    if kind == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.error("TRACING_EXPORTER=otlp requires opentelemetry-exporter-otlp-proto-http")
+            return None
+        return OTLPSpanExporter(endpoint=Config.TRACING_OTLP_ENDPOINT)
+    if kind != "none":
+        logger.warning(f"Unknown TRACING_EXPORTER '{kind}', tracing disabled")
+    return None
+
+
+def configure_tracing() -> Optional[TracerProvider]:
+    """
+    Install the tracer provider and propagators from Config.
+
+    Call once per process at startup. Without an exporter no provider is
+    installed and spans stay no-ops; propagation is configured either way.
+
+    Returns:
+        The installed TracerProvider (to shut down on exit), or None
+    """
+    global _propagation_enabled
+
+    names = [n.strip() for n in Config.TRACING_PROPAGATORS.split(",") if n.strip()]
+    if names and names != ["none"]:
+        propagators = _load_propagators(names)
+        propagate.set_global_textmap(CompositePropagator(propagators))
+        _propagation_enabled = bool(propagators)
+
+    exporter = _create_exporter(Config.TRACING_EXPORTER)
+    if exporter is None:
+        return None
+
+    ratio = min(max(Config.TRACING_SAMPLE_RATIO, 0.0), 1.0)
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": Config.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(ratio))
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    logger.info(f"Tracing enabled: exporter={Config.TRACING_EXPORTER}, sample ratio={ratio}")
+    return provider
+
+
+@contextmanager
+def traced(name: str, timing_key: Optional[str] = None, **attributes: Any) -> Iterator[Any]:
+    """
+    Run a block inside a span, recording its duration in the request's timings.
+
+    Args:
+        name: Span name
+        timing_key: Key in the timings breakdown (defaults to the span name);
+            repeated keys accumulate
+        **attributes: Span attributes
+
+    Yields:
+        The active span (a no-op span when tracing is off)
+    """
+    timings = _timings.get()
+    start = time.perf_counter()
+    try:
+        with tracer.start_as_current_span(name, attributes=attributes or None) as span:
+            yield span
+    finally:
+        if timings is not None:
+            key = f"{timing_key or name}_ms"
+            elapsed = (time.perf_counter() - start) * 1000
+            timings[key] = round(timings.get(key, 0.0) + elapsed, 3)
+
+
+@contextmanager
+def collect_timings(enabled: bool = True) -> Iterator[Optional[Dict[str, float]]]:
+    """
+    Collect a timing breakdown for the `traced()` blocks run inside this context.
+
+    Args:
+        enabled: When False, nothing is collected and None is yielded
+
+    Yields:
+        Dict filled with `<key>_ms` durations as the blocks finish
+    """
+    if not enabled:
+        yield None
+        return
+    timings: Dict[str, float] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def outgoing_headers() -> Dict[str, str]:
+    """Trace context headers to send with an outgoing request (empty if propagation is off)."""
+    headers: Dict[str, str] = {}
+    if _propagation_enabled:
+        propagate.inject(headers)
+    return headers
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a server span per HTTP request.
+
+    Incoming trace context (e.g. a `traceparent` header) is honoured so the
+    request joins the caller's trace, and the response carries the trace
+    context back to the caller.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._route_paths: Dict[Any, str] = {}
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        if _propagation_enabled:
+            carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+            parent = propagate.extract(carrier)
+
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=parent,
+            kind=trace.SpanKind.SERVER,
+            attributes={"http.request.method": scope["method"], "url.path": scope["path"]}
+        ) as span:
+
+            async def send_with_context(message: Dict[str, Any]) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    response_headers = outgoing_headers()
+                    if response_headers:
+                        message["headers"] = list(message.get("headers", [])) + [
+                            (key.encode("latin-1"), value.encode("latin-1"))
+                            for key, value in response_headers.items()
+                        ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_context)
+            finally:
+                route = route_template(scope, self._route_paths)
+                span.set_attribute("http.route", route)
+                span.update_name(f"{scope['method']} {route}")
@@ -3,20 +3,108 @@ Vector Store Module
 Handles vector database operations using ChromaDB with sentence-transformers embeddings.
 """
 
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
 from pathlib import Path
-import uuid
 import chromadb
 # use PersistentClient for disk persistence
 from sentence_transformers import SentenceTransformer
 
+from config import Config
+from utils.base_store import BaseVectorStore, file_lock
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Folds published ingest segments into the base segment off the write path
+_SEGMENT_FOLDER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="segment-fold")
+
+
+def hnsw_metadata(
+    m: Optional[int] = None,
+    construction_ef: Optional[int] = None,
+    search_ef: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build the HNSW collection metadata, falling back to Config values.
+    
+    Args:
+        m: Max neighbours per graph node (hnsw:M)
+        construction_ef: Candidate list size while building (hnsw:construction_ef)
+        search_ef: Candidate list size while querying (hnsw:search_ef)
+        
+    Returns:
+        Metadata dict to pass when creating a Chroma collection
+    """
+    return {
+        "hnsw:space": "cosine",
+        "hnsw:M": m or Config.HNSW_M,
+        "hnsw:construction_ef": construction_ef or Config.HNSW_CONSTRUCTION_EF,
+        "hnsw:search_ef": search_ef or Config.HNSW_SEARCH_EF,
+    }
+
+
+def copy_collection(source: Any, target: Any, batch_size: int = 1000) -> int:
+    """
+    Copy stored ids, embeddings, documents and metadata between collections.
+
+    Nothing is re-embedded; records are moved page by page.
+
+    Args:
+        source: Collection to read
+        target: Collection to write
+        batch_size: Records copied per page
+
+    Returns:
+        Number of records copied
+    """
+    total = source.count()
+    copied = 0
+    for offset in range(0, total, batch_size):
+        page = source.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=batch_size,
+            offset=offset
+        )
+        if not page["ids"]:
+            break
+        target.upsert(
+            ids=page["ids"],
+            embeddings=page["embeddings"],
+            documents=page["documents"],
+            metadatas=page["metadatas"]
+        )
+        copied += len(page["ids"])
+    return copied
+
+
+class IndexSnapshot:
+    """
+    One published generation of a collection: the segments searched together.
 
-class VectorStore:
+    Snapshots are never modified after publishing. Searches hold the
+    snapshot they started with (`readers`), so segments retired by a
+    later generation are only dropped once nobody is reading them.
+    """
+
+    def __init__(self, generation: int, segments: List[Any]):
+        self.generation = generation
+        self.segments = segments
+        self.readers = 0
+
+    @property
+    def names(self) -> List[str]:
+        return [segment.name for segment in self.segments]
+
+
+class VectorStore(BaseVectorStore):
     """
     Vector Store manager using ChromaDB.
     
@@ -24,15 +112,37 @@ class VectorStore:
     - Initialize and manage ChromaDB collections
     - Generate embeddings using sentence-transformers
     - Store document chunks with metadata
-    - Query similar documents using semantic search
+    - Query similar documents using semantic search (HNSW)
     - Persistent storage
+    - Snapshot publishing: ingestion, clears and rebuilds build new
+      segments and swap them in atomically, never touching the index
+      that searches are reading
+    - Read-only mode for tools that only inspect a collection
+    
+    A logical collection is a list of segment collections
+    ('<collection>' or '<collection>.<n>') recorded in a manifest under
+    `<db_path>/manifests/`. Each ingest embeds and writes into a fresh
+    staging segment that searches cannot see; once it is complete, a new
+    generation that includes it is published. A background task then
+    copies the ingested records into the base segment and publishes the
+    base alone, so searches normally query a single segment (at most
+    MAX_INDEX_SEGMENTS while folds are pending).
+    
+    Writers of a collection - in this store, another store on the same
+    collection, or another process - are serialized by a lock file next
+    to the manifest and always build on the latest published generation.
     """
     
+    backend_name = "chroma"
+    
     def __init__(
         self,
         db_path: str,
         collection_name: str = "research_papers",
-        embedding_model: str = "all-MiniLM-L6-v2"
+        embedding_model: Union[str, SentenceTransformer] = "all-MiniLM-L6-v2",
+        batch_size: Optional[int] = None,
+        client: Optional[Any] = None,
+        read_only: bool = False
     ):
         """
         Initialize VectorStore.
@@ -40,178 +150,610 @@ class VectorStore:
         Args:
             db_path: Path to ChromaDB persistent storage
             collection_name: Name of the collection to work with
-            embedding_model: Name of the sentence-transformer model
+            embedding_model: Name of the sentence-transformer model, or an
+                already loaded model to share between stores
+            batch_size: Chunks embedded and written per batch
+                (defaults to Config.INGEST_BATCH_SIZE)
+            client: Optional existing Chroma client to share between stores
+            read_only: Open an existing collection without creating,
+                cleaning up or writing anything
+        
+        Raises:
+            ValueError: If `read_only` is set and the collection does not exist
         """
         # enforce absolute resolved path for DB
         self.db_path = Path(db_path).resolve()
         self.db_path.mkdir(parents=True, exist_ok=True)
         
         self.collection_name = collection_name
+        self.read_only = read_only
+        self.manifest_path = self.db_path / "manifests" / f"{collection_name}.json"
+        # Writers hold the manifest lock while they change the manifest or
+        # live segments; ingests building a staging segment hold the
+        # staging lock shared, so unpublished segments are only dropped
+        # when nobody is building one
+        self._manifest_lock_path = self.manifest_path.with_suffix(".lock")
+        self._staging_lock_path = self.manifest_path.with_suffix(".staging.lock")
         
         # ✅ Use PersistentClient to ensure on-disk persistence
-        self.client = chromadb.PersistentClient(path=str(self.db_path))
+        self.client = client or chromadb.PersistentClient(path=str(self.db_path))
         logger.info(f"[VectorStore] Using DB Path: {self.db_path}")
-
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
-            metadata={"hnsw:space": "cosine"}
+        
+        # _lock guards snapshot bookkeeping; _write_lock serializes writers
+        # (publish, delete, fold, clear, rebuild) without blocking searches;
+        # _ingest_lock runs one ingest at a time without blocking the others
+        self._lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self._ingest_lock = threading.Lock()
+        self._manifest_owner: Optional[int] = None
+        self._ingest_active = False
+        self._staging: Optional[Any] = None
+        self._staging_guard: Optional[ExitStack] = None
+        self._draining: List[IndexSnapshot] = []
+        self._retired: Set[str] = set()
+        # Upper bound on each live segment's record count, so searches
+        # clamp n_results and skip empty segments without a count() call
+        self._segment_counts: Dict[str, int] = {}
+        
+        # Open the published snapshot (creating the collection if needed)
+        self._snapshot = self._open_snapshot()
+        logger.info(
+            f"Collection '{collection_name}' ready "
+            f"(generation {self._snapshot.generation}, {len(self._snapshot.segments)} segment(s))"
         )
-        logger.info(f"Collection '{collection_name}' ready")
         
-        # Initialize embedding model
-        logger.info(f"Loading embedding model: {embedding_model}")
-        self.embedding_model = SentenceTransformer(embedding_model)
-        logger.info(f"Embedding model loaded successfully")
+        super().__init__(collection_name, embedding_model, batch_size)
+        
+        # Never exceed the maximum batch size Chroma accepts in one call
+        max_batch_size = getattr(self.client, "max_batch_size", None)
+        if max_batch_size and self.batch_size > max_batch_size:
+            logger.info(f"Clamping ingest batch size {self.batch_size} to Chroma limit {max_batch_size}")
+            self.batch_size = max_batch_size
     
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+    @property
+    def collection(self) -> Any:
+        """The oldest (base) segment of the live snapshot."""
+        return self._snapshot.segments[0]
+    
+    @property
+    def segments(self) -> List[Any]:
+        """Segment collections of the live snapshot, oldest first."""
+        return list(self._snapshot.segments)
+    
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+    
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        """Return the published manifest, or None if there is none (or it is unreadable)."""
+        if not self.manifest_path.exists():
+            return None
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading manifest {self.manifest_path}: {str(e)}")
+            return None
+    
+    def _open_segments(self, names: List[str]) -> List[Any]:
+        """Open the named segments, skipping (and reporting) missing ones."""
+        segments = []
+        for name in names:
+            try:
+                segments.append(self._open_segment(name))
+            except Exception as e:
+                logger.error(f"Segment '{name}' of '{self.collection_name}' is missing: {str(e)}")
+        return segments
+    
+    def _open_snapshot(self) -> IndexSnapshot:
+        """Load the manifest, or adopt the plain collection as generation 0."""
+        if self.read_only:
+            manifest = self._read_manifest()
+            self._next_segment = (manifest or {}).get("next_segment", 1)
+            if manifest is None:
+                # Collections created before snapshots are their own single segment
+                segments = [self._open_segment(self.collection_name)] if self._collection_exists() else []
+            else:
+                segments = self._open_segments(manifest["segments"])
+            if not segments:
+                raise ValueError(f"Collection '{self.collection_name}' does not exist")
+            return IndexSnapshot((manifest or {}).get("generation", 0), segments)
+        
+        with self._manifest_lock():
+            manifest = self._read_manifest()
+            if manifest is None:
+                self._next_segment = 1
+                snapshot = IndexSnapshot(0, [self._open_segment(self.collection_name, create=True)])
+            else:
+                self._next_segment = manifest.get("next_segment", 1)
+                segments = self._open_segments(manifest["segments"])
+                if not segments:
+                    segments.append(self._open_segment(self._allocate_segment_name(), create=True))
+                snapshot = IndexSnapshot(manifest.get("generation", 0), segments)
+            if manifest is None or snapshot.names != manifest["segments"]:
+                self._write_manifest(snapshot.generation, snapshot.names)
+            self._drop_orphans(snapshot.names)
+        return snapshot
+    
+    def _collection_exists(self) -> bool:
+        try:
+            self.client.get_collection(name=self.collection_name)
+            return True
+        except Exception:
+            return False
+    
+    def _open_segment(self, name: str, create: bool = False) -> Any:
         """
-        Generate embeddings for a list of texts.
+        Open a segment collection, creating it with the configured HNSW parameters.
         
-        Args:
-            texts: List of text strings
-            
-        Returns:
-            List of embedding vectors
+        HNSW parameters of an existing collection are fixed at creation
+        time, so a mismatch with Config is only reported.
         """
+        index_metadata = hnsw_metadata()
         try:
-            # Newer SentenceTransformer.encode may return a numpy array and
-            # does not accept `convert_to_list`. Convert to list explicitly.
-            embeddings = self.embedding_model.encode(texts)
+            collection = self.client.get_collection(name=name)
+        except Exception:
+            if not create:
+                raise
+            return self.client.get_or_create_collection(name=name, metadata=index_metadata)
+        
+        # Collections created before the parameters were configurable
+        # carry only hnsw:space and use Chroma's defaults (16/100/10)
+        stored = {"hnsw:M": 16, "hnsw:construction_ef": 100, "hnsw:search_ef": 10}
+        stored.update(collection.metadata or {})
+        drift = {k: v for k, v in index_metadata.items() if stored.get(k) != v}
+        if drift:
+            logger.warning(
+                f"Collection '{name}' was built with different HNSW settings "
+                f"than configured {drift}; run scripts/rebuild_index.py to apply them"
+            )
+        return collection
+    
+    @contextmanager
+    def _manifest_lock(self):
+        """Hold the collection's cross-process manifest lock (re-entrant within a thread)."""
+        if self._manifest_owner == threading.get_ident():
+            yield
+            return
+        with file_lock(self._manifest_lock_path):
+            self._manifest_owner = threading.get_ident()
             try:
-                # If it's a numpy array
-                embeddings_list = embeddings.tolist()
-            except Exception:
-                embeddings_list = list(embeddings)
-
-            logger.info(f"Generated embeddings for {len(texts)} text(s)")
-            return embeddings_list
+                yield
+            finally:
+                self._manifest_owner = None
+    
+    @contextmanager
+    def _writing(self):
+        """
+        Serialize a write with every other writer of the collection.
+        
+        The snapshot is first brought up to date with the manifest, so the
+        write builds on whatever another store or process last published.
+        
+        Raises:
+            RuntimeError: If the store was opened read-only
+        """
+        if self.read_only:
+            raise RuntimeError(f"Collection '{self.collection_name}' is open read-only")
+        with self._write_lock, self._manifest_lock():
+            self._follow_manifest()
+            yield
+    
+    def _follow_manifest(self) -> bool:
+        """
+        Adopt a generation published by another store since this one last looked.
+        
+        Segments the other store retired are its to drop.
+        
+        Returns:
+            True if the snapshot changed
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            return False
+        with self._lock:
+            self._next_segment = max(self._next_segment, manifest.get("next_segment", 1))
+            if manifest.get("generation", 0) == self._snapshot.generation:
+                return False
+        segments = self._open_segments(manifest["segments"])
+        if not segments:
+            return False
+        with self._lock:
+            self._snapshot = IndexSnapshot(manifest.get("generation", 0), segments)
+            self._segment_counts = {}
+        logger.info(
+            f"Following generation {self._snapshot.generation} of '{self.collection_name}' "
+            f"({len(segments)} segment(s))"
+        )
+        return True
+    
+    def _write_manifest(self, generation: int, names: List[str]) -> None:
+        """Atomically record which segments make up the published generation."""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "generation": generation,
+                "segments": names,
+                "next_segment": self._next_segment
+            }, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def _allocate_segment_name(self) -> str:
+        """Reserve a new segment name; the counter is persisted before use."""
+        with self._manifest_lock():
+            manifest = self._read_manifest()
+            with self._lock:
+                if manifest is not None:
+                    self._next_segment = max(self._next_segment, manifest.get("next_segment", 1))
+                name = f"{self.collection_name}.{self._next_segment}"
+                self._next_segment += 1
+            if manifest is not None:
+                self._write_manifest(manifest.get("generation", 0), manifest["segments"])
+            return name
+    
+    def _new_segment(self, metadata: Optional[Dict[str, Any]] = None) -> Any:
+        """Create an empty segment, invisible to searches until published."""
+        return self.client.create_collection(
+            name=self._allocate_segment_name(),
+            metadata=metadata or hnsw_metadata()
+        )
+    
+    def _drop_orphans(self, live_names: List[str]) -> None:
+        """
+        Drop segments left behind by an interrupted ingest or rebuild.
+        
+        Called with the manifest lock held, so no rebuild or clear is
+        half-way; segments are only dropped if no store (in any process)
+        holds the staging lock for an ingest it has not published yet.
+        """
+        with file_lock(self._staging_lock_path, blocking=False) as idle:
+            if not idle:
+                logger.info(f"An ingest into '{self.collection_name}' is in progress; keeping unpublished segments")
+                return
+            pattern = re.compile(rf"^{re.escape(self.collection_name)}\.\d+$")
+            try:
+                # Chroma returns Collection objects in 0.4/0.5 and names afterwards
+                names = [getattr(c, "name", c) for c in self.client.list_collections()]
+            except Exception as e:
+                logger.warning(f"Could not list collections: {str(e)}")
+                return
+            for name in names:
+                if pattern.match(name) and name not in live_names:
+                    logger.info(f"Dropping unpublished segment '{name}'")
+                    self.client.delete_collection(name=name)
+    
+    def _publish(self, segments: List[Any]) -> IndexSnapshot:
+        """
+        Make `segments` the live generation.
+        
+        Searches already running finish on the snapshot they hold;
+        segments no longer referenced are dropped once those searches end.
+        """
+        with self._writing():
+            counts = {
+                segment.name: self._segment_counts[segment.name] if segment.name in self._segment_counts
+                else segment.count()
+                for segment in segments
+            }
+            with self._lock:
+                previous = self._snapshot
+                snapshot = IndexSnapshot(previous.generation + 1, segments)
+                self._segment_counts = counts
+                self._write_manifest(snapshot.generation, snapshot.names)
+                self._snapshot = snapshot
+                self._draining.append(previous)
+                self._retired.update(set(previous.names) - set(snapshot.names))
+        logger.info(
+            f"Published generation {snapshot.generation} of '{self.collection_name}' "
+            f"({len(segments)} segment(s))"
+        )
+        self._drop_retired()
+        return snapshot
+    
+    def _drop_retired(self) -> None:
+        """Delete retired segments that no running search still reads."""
+        with self._lock:
+            self._draining = [s for s in self._draining if s.readers > 0]
+            in_use = set(self._snapshot.names)
+            for snapshot in self._draining:
+                in_use.update(snapshot.names)
+            droppable = self._retired - in_use
+            self._retired -= droppable
+        for name in droppable:
+            try:
+                self.client.delete_collection(name=name)
+            except Exception as e:
+                logger.warning(f"Could not drop retired segment '{name}': {str(e)}")
+    
+    @contextmanager
+    def _reading(self):
+        """Pin the live snapshot for the duration of a read."""
+        with self._lock:
+            snapshot = self._snapshot
+            snapshot.readers += 1
+        try:
+            yield snapshot
+        finally:
+            with self._lock:
+                snapshot.readers -= 1
+                pending = bool(self._retired)
+            if pending:
+                self._drop_retired()
+    
+    def _fold_segments(self) -> None:
+        """
+        Copy the records of every segment after the base into the base and
+        publish the base alone.
+        
+        Only the folded records are written (already embedded), so the cost
+        follows the size of the ingests being folded, not of the collection.
+        Runs in the background after an ingest is published.
+        """
+        try:
+            with self._writing():
+                segments = self._snapshot.segments
+                if len(segments) <= 1:
+                    return
+                base, tail = segments[0], segments[1:]
+                # Oldest first, so the newest version of a re-ingested chunk wins
+                copied = sum(copy_collection(segment, base, self.batch_size) for segment in tail)
+                with self._lock:
+                    self._segment_counts[base.name] = self._segment_counts.get(base.name, 0) + copied
+                self._publish([base])
+                logger.info(f"Folded {len(tail)} segment(s) into the base of '{self.collection_name}' ({copied} records)")
         except Exception as e:
-            logger.error(f"Error generating embeddings: {str(e)}")
-            raise
+            logger.error(f"Error folding segments of '{self.collection_name}': {str(e)}")
+    
+    def refresh(self) -> None:
+        """Follow a generation another store or process published."""
+        self._follow_manifest()
+        super().refresh()
     
-    def ingest_documents(
+    # ------------------------------------------------------------------
+    # Ingestion hooks
+    # ------------------------------------------------------------------
+    
+    def _begin_ingest(self) -> None:
+        """
+        Start writing into a staging segment.
+        
+        Only other ingests of this store wait; deletes, clears and searches
+        carry on while the chunks are embedded and staged.
+        """
+        if self.read_only:
+            raise RuntimeError(f"Collection '{self.collection_name}' is open read-only")
+        self._ingest_lock.acquire()
+        self._staging = None
+        self._ingest_active = True
+    
+    def _end_ingest(self, publish: bool) -> None:
+        """Publish the staging segment (or discard it) and let the next ingest start."""
+        try:
+            with self._lock:
+                self._ingest_active = False
+                staging, guard = self._staging, self._staging_guard
+                self._staging, self._staging_guard = None, None
+            if staging is None:
+                return
+            fold_now = False
+            try:
+                if not publish:
+                    self.client.delete_collection(name=staging.name)
+                    return
+                with self._writing():
+                    self._publish(self._snapshot.segments + [staging])
+                    # Too many folds pending: catch up before the next ingest
+                    fold_now = len(self._snapshot.segments) > max(1, Config.MAX_INDEX_SEGMENTS)
+                    if fold_now:
+                        self._fold_segments()
+            finally:
+                guard.close()
+            if not fold_now:
+                _SEGMENT_FOLDER.submit(self._fold_segments)
+        finally:
+            self._ingest_lock.release()
+    
+    def rebuild_index(
         self,
-        documents: List[tuple[str, dict]]
+        m: Optional[int] = None,
+        construction_ef: Optional[int] = None,
+        search_ef: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        Ingest documents into the vector store.
+        Re-index the collection with new HNSW parameters, reusing stored embeddings.
+        
+        All segments are copied into one new segment, which is published
+        once the copy is verified; searches keep running on the old index
+        until then.
         
         Args:
-            documents: List of (text, metadata) tuples from DocumentLoader
+            m: Max neighbours per graph node (defaults to Config.HNSW_M)
+            construction_ef: Build-time candidate list size
+            search_ef: Query-time candidate list size
             
         Returns:
-            Dictionary with ingestion statistics
+            Dictionary with the rebuild status and applied parameters
         """
-        if not documents:
-            logger.warning("No documents provided for ingestion")
-            return {"status": "failed", "message": "No documents provided", "count": 0}
-        
+        index_metadata = hnsw_metadata(m, construction_ef, search_ef)
+        rebuilt = None
         try:
-            texts = []
-            metadatas = []
-            ids = []
-            
-            # Prepare documents for ingestion
-            for idx, (text, metadata) in enumerate(documents):
-                texts.append(text)
-                metadatas.append(metadata)
-                source = metadata.get("source", "document") if isinstance(metadata, dict) else "document"
-                ids.append(f"{source}_{idx}_{uuid.uuid4().hex}")
-            
-            # Generate embeddings
-            logger.info(f"Generating embeddings for {len(texts)} documents...")
-            embeddings = self.generate_embeddings(texts)
-            
-            # Add to collection
-            logger.info(f"Adding {len(texts)} documents to collection...")
-            self.collection.add(
+            with self._writing():
+                segments = self._snapshot.segments
+                total = sum(segment.count() for segment in segments)
+                logger.info(f"Rebuilding '{self.collection_name}' ({total} records) with {index_metadata}")
+                rebuilt = self._new_segment(index_metadata)
+                for segment in segments:
+                    copy_collection(segment, rebuilt, self.batch_size)
+                if rebuilt.count() != total:
+                    raise RuntimeError(
+                        f"Rebuild of '{self.collection_name}' copied {rebuilt.count()} of {total} records; "
+                        "original kept"
+                    )
+                self._publish([rebuilt])
+                return {
+                    "status": "success",
+                    "collection_name": self.collection_name,
+                    "count": total,
+                    "index": index_metadata
+                }
+        except Exception as e:
+            logger.error(f"Error rebuilding collection: {str(e)}")
+            if rebuilt is not None and rebuilt.name not in self._snapshot.names:
+                self.client.delete_collection(name=rebuilt.name)
+            return {"status": "failed", "message": str(e), "count": 0}
+    
+    # ------------------------------------------------------------------
+    # Storage hooks
+    # ------------------------------------------------------------------
+    
+    def _existing_ids(self, ids: List[str]) -> Set[str]:
+        """Return the subset of `ids` already stored."""
+        with self._reading() as snapshot:
+            existing: Set[str] = set()
+            for segment in snapshot.segments:
+                existing.update(segment.get(ids=ids, include=[])["ids"])
+            return existing
+    
+    def _upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        texts: List[str],
+        metadatas: List[dict]
+    ) -> None:
+        """Insert or overwrite one batch of pre-embedded chunks."""
+        if self._ingest_active:
+            # Called from the ingest pipeline's writer thread; the staging
+            # lock is taken before the segment exists, so no other store
+            # mistakes it for an orphan
+            if self._staging is None:
+                guard = ExitStack()
+                guard.enter_context(file_lock(self._staging_lock_path, exclusive=False))
+                try:
+                    staging = self._new_segment()
+                except Exception:
+                    guard.close()
+                    raise
+                with self._lock:
+                    self._staging, self._staging_guard = staging, guard
+            self._staging.upsert(ids=ids, embeddings=embeddings, documents=texts, metadatas=metadatas)
+            return
+        
+        # Direct writes outside an ingest land in the newest live segment
+        with self._writing():
+            segment = self._snapshot.segments[-1]
+            segment.upsert(
                 ids=ids,
                 embeddings=embeddings,
                 documents=texts,
                 metadatas=metadatas
             )
-            
-            logger.info(f"Successfully ingested {len(texts)} document chunks")
-            return {
-                "status": "success",
-                "message": f"Ingested {len(texts)} document chunks",
-                "count": len(texts)
-            }
-        
-        except Exception as e:
-            logger.error(f"Error ingesting documents: {str(e)}")
-            return {
-                "status": "failed",
-                "message": str(e),
-                "count": 0
-            }
+            with self._lock:
+                self._segment_counts[segment.name] = self._segment_counts.get(segment.name, 0) + len(ids)
+    
+    def _ids_where(self, field: str, value: Any, limit: Optional[int] = None) -> List[str]:
+        """Return ids of chunks whose metadata `field` equals `value`."""
+        ids: List[str] = []
+        with self._reading() as snapshot:
+            for segment in snapshot.segments:
+                result = segment.get(where={field: value}, limit=limit, include=[])
+                ids.extend(result["ids"] if result else [])
+        # A chunk re-ingested but not folded yet is in two segments
+        ids = list(dict.fromkeys(ids))
+        return ids[:limit] if limit else ids
+    
+    def _metadatas_where(self, field: str, value: Any) -> List[dict]:
+        """Return metadata of chunks whose metadata `field` equals `value`."""
+        found: Dict[str, dict] = {}
+        with self._reading() as snapshot:
+            # Newest segment first, so a re-ingested chunk reports its latest version
+            for segment in reversed(snapshot.segments):
+                result = segment.get(where={field: value}, include=["metadatas"])
+                for chunk_id, metadata in zip(result["ids"], result["metadatas"]):
+                    found.setdefault(chunk_id, metadata)
+        return list(found.values())
+    
+    def _delete_ids(self, ids: List[str]) -> None:
+        """Delete chunks by id (applied to the live segments in place, and to an ingest's staging segment)."""
+        with self._writing():
+            with self._lock:
+                staging = self._staging
+            for segment in self._snapshot.segments + ([staging] if staging is not None else []):
+                segment.delete(ids=ids)
     
-    def query_similar_documents(
+    def _get_chunks(self, ids: List[str]) -> List[Tuple[str, str, dict]]:
+        """Return (id, document, metadata) of the stored chunks among `ids`."""
+        found: Dict[str, Tuple[str, str, dict]] = {}
+        with self._reading() as snapshot:
+            # Newest segment first, so a re-ingested chunk reports its latest version
+            for segment in reversed(snapshot.segments):
+                remaining = [chunk_id for chunk_id in ids if chunk_id not in found]
+                if not remaining:
+                    break
+                result = segment.get(ids=remaining, include=["documents", "metadatas"])
+                for chunk_id, document, metadata in zip(result["ids"], result["documents"], result["metadatas"]):
+                    found.setdefault(chunk_id, (chunk_id, document, metadata))
+        return list(found.values())
+    
+    def _search(
         self,
-        query: str,
-        top_k: int = 5
-    ) -> List[Dict[str, Any]]:
+        query_embedding: List[float],
+        top_k: int,
+        with_embeddings: bool = False
+    ) -> List[tuple]:
         """
-        Query the vector store for similar documents.
+        Query every segment of the live snapshot and merge the results.
         
-        Args:
-            query: Query string
-            top_k: Number of top results to return
-            
-        Returns:
-            List of similar documents with scores
+        One query per segment (a single one unless a fold is pending) and
+        nothing else - document fields are joined from the catalog's
+        in-memory cache. n_results is clamped with the maintained segment
+        counts (an upper bound, which Chroma clamps further), and segments
+        known to be empty are skipped. Embeddings, when asked for, come
+        back from the same query.
         """
+        include = ["documents", "metadatas", "distances"] + (["embeddings"] if with_embeddings else [])
+        with self._reading() as snapshot:
+            counts = self._segment_counts
+            best: Dict[str, tuple] = {}
+            # Newest segment first, so a re-ingested chunk keeps its latest version
+            for segment in reversed(snapshot.segments):
+                segment_count = counts.get(segment.name, top_k)
+                if segment_count == 0:
+                    continue
+                results = segment.query(
+                    query_embeddings=[query_embedding],
+                    n_results=min(top_k, segment_count),
+                    include=include
+                )
+                if not results or not results["documents"]:
+                    continue
+                columns = [
+                    results["ids"][0],
+                    results["documents"][0],
+                    results["metadatas"][0],
+                    results["distances"][0]
+                ]
+                if with_embeddings:
+                    columns.append(results["embeddings"][0])
+                for hit in zip(*columns):
+                    best.setdefault(hit[0], hit)
         
-        try:
-            # Check if collection has documents
-            collection_count = self.collection.count()
-            if collection_count == 0:
-                logger.warning("Collection is empty, no documents to query")
-                return []
-            
-            # Generate query embedding (encode returns array; make plain list)
-            query_embedding = self.embedding_model.encode([query])
-            try:
-                query_embedding = query_embedding.tolist()[0]
-            except Exception:
-                query_embedding = list(query_embedding)[0]
-            
-            # Query collection
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=min(top_k, collection_count),
-                include=["documents", "metadatas", "distances"]
-            )
-            
-            # Format results
-            formatted_results = []
-            
-            if results and results["documents"] and len(results["documents"]) > 0:
-                for idx, (doc, metadata, distance) in enumerate(
-                    zip(
-                        results["documents"][0],
-                        results["metadatas"][0],
-                        results["distances"][0]
-                    )
-                ):
-                    # Convert distance to similarity (for cosine, 1 - distance)
-                    similarity = 1 - distance
-                    
-                    formatted_results.append({
-                        "rank": idx + 1,
-                        "document": doc,
-                        "metadata": metadata,
-                        "similarity": round(similarity, 4),
-                        "distance": round(distance, 4)
-                    })
-            
-            logger.info(f"Query returned {len(formatted_results)} results")
-            return formatted_results
-        
-        except Exception as e:
-            logger.error(f"Error querying documents: {str(e)}")
+        if not best:
+            logger.warning("Collection is empty, no documents to query")
             return []
+        return sorted(best.values(), key=lambda hit: hit[3])[:top_k]
+    
+    def _count_stored(self) -> int:
+        """Count every live segment, refreshing the maintained segment counts."""
+        # Serialized with writers so no write lands between a count and its update
+        with self._write_lock:
+            snapshot = self._snapshot
+            counts = {segment.name: segment.count() for segment in snapshot.segments}
+            with self._lock:
+                if self._snapshot is snapshot:
+                    self._segment_counts = counts
+            return sum(counts.values())
     
     def get_collection_stats(self) -> Dict[str, Any]:
         """
@@ -220,32 +762,31 @@ class VectorStore:
         Returns:
             Dictionary with collection statistics
         """
-        try:
-            count = self.collection.count()
-            return {
-                "collection_name": self.collection_name,
-                "document_count": count,
-                "embedding_model": self.embedding_model.get_sentence_embedding_dimension(),
-                "db_path": str(self.db_path)
-            }
-        except Exception as e:
-            logger.error(f"Error getting collection stats: {str(e)}")
-            return {}
+        stats = super().get_collection_stats()
+        if stats:
+            stats["db_path"] = str(self.db_path)
+            stats["generation"] = self._snapshot.generation
+            stats["segments"] = len(self._snapshot.segments)
+        return stats
     
     def clear_collection(self) -> bool:
         """
         Clear all documents from the collection.
         
+        An empty segment is published as the next generation; searches
+        still running on the old one finish before it is dropped. A
+        running ingest of this store is waited for.
+        
         Returns:
             True if successful, False otherwise
         """
         try:
-            # Delete and recreate collection
-            self.client.delete_collection(name=self.collection_name)
-            self.collection = self.client.get_or_create_collection(
-                name=self.collection_name,
-                metadata={"hnsw:space": "cosine"}
-            )
+            with self._ingest_lock, self._writing():
+                self._publish([self._new_segment()])
+            self._reset_count()
+            self.catalog.clear(self.collection_name)
+            if self.near_duplicates is not None:
+                self.near_duplicates.clear()
             logger.info(f"Collection '{self.collection_name}' cleared")
             return True
         except Exception as e:
@@ -0,0 +1,282 @@
+"""
+Workspace Module
+Maps research workspaces to their own ChromaDB collections.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from utils.base_store import BaseVectorStore
+from utils.metrics import CACHE_REQUESTS
+from utils.write_queue import read_generation
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Workspace names become part of a Chroma collection name (max 63 chars),
+# leaving room for a '.<n>' segment suffix
+WORKSPACE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9](?:[A-Za-z0-9_-]{0,36}[A-Za-z0-9])?$")
+COLLECTION_SEPARATOR = "__"
+SEGMENT_SUFFIX = re.compile(r"\.\d+$")
+VECTOR_BACKENDS = ("chroma", "exact")
+
+
+class WorkspaceNotFoundError(LookupError):
+    """Raised when reading a workspace that has no collection yet."""
+
+
+def workspace_collection_name(base_collection_name: str, workspace: str) -> str:
+    """
+    Return the Chroma collection name backing a workspace.
+
+    Raises:
+        ValueError: If the workspace name is invalid
+    """
+    WorkspaceManager.validate_name(workspace)
+    if workspace == Config.DEFAULT_WORKSPACE:
+        return base_collection_name
+    return f"{base_collection_name}{COLLECTION_SEPARATOR}{workspace}"
+
+
+def create_vector_store(
+    backend: str,
+    db_path: str,
+    collection_name: str,
+    embedding_model: Any,
+    client: Optional[Any] = None,
+    read_only: bool = False
+) -> BaseVectorStore:
+    """
+    Instantiate a vector store for the configured backend.
+
+    Backends are imported lazily so the exact backend never loads ChromaDB.
+
+    Args:
+        backend: "chroma" or "exact"
+        db_path: Root directory for vector data
+        collection_name: Collection backing the store
+        embedding_model: Model name or shared model instance
+        client: Shared Chroma client (chroma backend only)
+        read_only: Open the store for a reader process (exact backend only)
+    """
+    if backend == "exact":
+        from utils.exact_store import ExactVectorStore
+        return ExactVectorStore(
+            db_path=db_path,
+            collection_name=collection_name,
+            embedding_model=embedding_model,
+            read_only=read_only
+        )
+    if read_only:
+        raise ValueError(f"The {backend} backend cannot be shared read-only between processes")
+    if backend == "chroma":
+        from utils.vector_store import VectorStore
+        return VectorStore(
+            db_path=db_path,
+            collection_name=collection_name,
+            embedding_model=embedding_model,
+            client=client
+        )
+    raise ValueError(f"Unknown vector backend '{backend}', expected one of {VECTOR_BACKENDS}")
+
+
+class WorkspaceManager:
+    """
+    Per-workspace vector stores sharing one client and embedding model.
+
+    Features:
+    - One collection per workspace, created lazily on the first write
+      (reads of an unknown workspace never create one)
+    - Bounded LRU of open store handles
+    - A single embedding model (and Chroma client) for all workspaces
+    - The default workspace keeps using the base collection name
+    - Backend selected by Config.VECTOR_BACKEND
+    - Read-only mode for server workers, following the writer's published
+      index generations
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        collection_name: str = "research_papers",
+        embedding_model: str = "all-MiniLM-L6-v2",
+        max_open: Optional[int] = None,
+        backend: Optional[str] = None,
+        read_only: bool = False
+    ):
+        """
+        Initialize WorkspaceManager.
+
+        Args:
+            db_path: Path to ChromaDB persistent storage
+            collection_name: Base collection name (used by the default workspace)
+            embedding_model: Name of the sentence-transformer model
+            max_open: Maximum number of open workspace handles
+                (defaults to Config.MAX_OPEN_WORKSPACES)
+            backend: Vector backend (defaults to Config.VECTOR_BACKEND)
+            read_only: Open stores read-only and refresh them when the writer
+                process publishes a new generation
+        """
+        self.db_path = Path(db_path).resolve()
+        self.db_path.mkdir(parents=True, exist_ok=True)
+        self.base_collection_name = collection_name
+        self.max_open = max(1, max_open or Config.MAX_OPEN_WORKSPACES)
+        self.backend = (backend or Config.VECTOR_BACKEND).lower()
+        if self.backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend '{self.backend}', expected one of {VECTOR_BACKENDS}")
+
+        self.read_only = read_only
+        if self.read_only and self.backend != "exact":
+            raise ValueError("Read-only workspace stores require the exact backend")
+
+        self.client = None
+        if self.backend == "chroma":
+            import chromadb
+            self.client = chromadb.PersistentClient(path=str(self.db_path))
+
+        # Imported here so that importing this module does not load torch
+        from utils.shared_model import load_embedding_model
+        self.embedding_model = load_embedding_model(embedding_model)
+
+        self._stores: "OrderedDict[str, BaseVectorStore]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = read_generation(str(self.db_path))
+        self._next_poll = 0.0
+        self._handle_hits = CACHE_REQUESTS.labels("workspace_handles", "hit")
+        self._handle_misses = CACHE_REQUESTS.labels("workspace_handles", "miss")
+        logger.info(f"WorkspaceManager ready ({self.backend} backend, max {self.max_open} open workspaces)")
+
+    @staticmethod
+    def validate_name(workspace: str) -> str:
+        """
+        Validate a workspace name.
+
+        Raises:
+            ValueError: If the name cannot be used as part of a collection name
+        """
+        if not workspace or not WORKSPACE_NAME_PATTERN.match(workspace):
+            raise ValueError(
+                f"Invalid workspace name '{workspace}': use 1-38 letters, digits, '-' or '_', "
+                "starting and ending with a letter or digit"
+            )
+        return workspace
+
+    def collection_name_for(self, workspace: str) -> str:
+        """Return the Chroma collection name backing a workspace."""
+        return workspace_collection_name(self.base_collection_name, workspace)
+
+    def get(self, workspace: str = Config.DEFAULT_WORKSPACE, create: bool = False) -> BaseVectorStore:
+        """
+        Get the vector store for a workspace.
+
+        Args:
+            workspace: Workspace name
+            create: Create the workspace's collection if it does not exist
+                (write paths); the default workspace always exists
+
+        Returns:
+            Vector store bound to the workspace's collection
+
+        Raises:
+            ValueError: If the workspace name is invalid
+            WorkspaceNotFoundError: If the workspace does not exist and
+                `create` is False
+        """
+        collection_name = self.collection_name_for(workspace)
+        if self.read_only:
+            self._poll_generation()
+
+        with self._lock:
+            store = self._stores.get(workspace)
+            if store is not None:
+                self._stores.move_to_end(workspace)
+                self._handle_hits.inc()
+                return store
+            self._handle_misses.inc()
+
+            if not create and not self.exists(workspace):
+                raise WorkspaceNotFoundError(f"Workspace '{workspace}' does not exist")
+
+            store = create_vector_store(
+                self.backend,
+                db_path=str(self.db_path),
+                collection_name=collection_name,
+                embedding_model=self.embedding_model,
+                client=self.client,
+                read_only=self.read_only
+            )
+            self._stores[workspace] = store
+
+            while len(self._stores) > self.max_open:
+                evicted, _ = self._stores.popitem(last=False)
+                logger.info(f"Closed idle workspace handle '{evicted}'")
+
+            return store
+
+    def _poll_generation(self) -> None:
+        """Refresh open stores if the writer published a new generation (rate limited)."""
+        now = time.monotonic()
+        if now < self._next_poll:
+            return
+        self._next_poll = now + Config.GENERATION_POLL_INTERVAL
+        generation = read_generation(str(self.db_path))
+        if generation != self._generation:
+            self._generation = generation
+            self.refresh()
+
+    def refresh(self, workspace: Optional[str] = None) -> None:
+        """
+        Re-read open stores from disk after another process wrote to them.
+
+        Args:
+            workspace: Only refresh this workspace (default: all open ones)
+        """
+        with self._lock:
+            if workspace is None:
+                stores = list(self._stores.values())
+            else:
+                stores = [self._stores[workspace]] if workspace in self._stores else []
+        for store in stores:
+            store.refresh()
+
+    def open_stores(self) -> Dict[str, BaseVectorStore]:
+        """Return the currently open workspace stores by workspace name."""
+        with self._lock:
+            return dict(self._stores)
+
+    def exists(self, workspace: str) -> bool:
+        """Return whether a workspace has a collection (the default workspace always does)."""
+        return workspace == Config.DEFAULT_WORKSPACE or workspace in self.list_workspaces()
+
+    def list_workspaces(self) -> List[str]:
+        """
+        List workspaces that have a collection on disk.
+
+        Returns:
+            Sorted list of workspace names
+        """
+        prefix = f"{self.base_collection_name}{COLLECTION_SEPARATOR}"
+        if self.backend == "exact":
+            exact_dir = self.db_path / "exact"
+            names = [p.name for p in exact_dir.iterdir() if p.is_dir()] if exact_dir.exists() else []
+        else:
+            # Chroma returns Collection objects in 0.4/0.5 and names afterwards
+            names = [getattr(collection, "name", collection) for collection in self.client.list_collections()]
+
+        workspaces = set()
+        for name in names:
+            # Snapshot segments ('<collection>.<n>') belong to their collection
+            name = SEGMENT_SUFFIX.sub("", name)
+            if name == self.base_collection_name:
+                workspaces.add(Config.DEFAULT_WORKSPACE)
+            elif name.startswith(prefix) and WORKSPACE_NAME_PATTERN.match(name[len(prefix):]):
+                # Staging collections (e.g. '<name>.rebuild') are not workspaces
+                workspaces.add(name[len(prefix):])
+        return sorted(workspaces)
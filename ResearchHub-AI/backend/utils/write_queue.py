@@ -0,0 +1,180 @@
+"""
+Write Queue Module
+File-based job queue between API worker processes and the single index writer.
+
+Workers cannot share in-memory queues with a process they did not start,
+so jobs are spooled as files: a worker drops a job into `pending/`, the
+writer claims it by renaming it into `running/` (atomic on one
+filesystem), and the result appears in `done/`. After each job the writer
+bumps the index generation so readers know to pick up new data.
+"""
+
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+GENERATION_FILE = "generation.json"
+# Seconds between checks while waiting for a job or its result
+POLL_INTERVAL = 0.05
+
+
+def _write_json(path: Path, payload: Dict[str, Any]) -> None:
+    """Atomically write a JSON file."""
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def publish_generation(db_path: str) -> int:
+    """
+    Announce a new index generation to reader processes.
+
+    Only the writer process calls this, so a read-increment-write is safe.
+
+    Args:
+        db_path: Vector database root
+
+    Returns:
+        The new generation number
+    """
+    generation = read_generation(db_path) + 1
+    _write_json(Path(db_path) / GENERATION_FILE, {"generation": generation, "published_at": time.time()})
+    return generation
+
+
+def read_generation(db_path: str) -> int:
+    """Return the last published index generation (0 if none)."""
+    try:
+        with open(Path(db_path) / GENERATION_FILE, "r", encoding="utf-8") as f:
+            return int(json.load(f)["generation"])
+    except (OSError, ValueError, KeyError):
+        return 0
+
+
+class WriteQueue:
+    """
+    Spool-directory job queue with exactly one consumer.
+
+    Features:
+    - FIFO order by submission time
+    - Binary payloads (uploaded PDFs) stored next to the job
+    - Jobs left in `running/` by a crashed writer are re-queued on startup
+    """
+
+    def __init__(self, queue_dir: str):
+        """
+        Initialize WriteQueue.
+
+        Args:
+            queue_dir: Spool directory shared by all processes
+        """
+        self.root = Path(queue_dir).resolve()
+        self.pending_dir = self.root / "pending"
+        self.running_dir = self.root / "running"
+        self.done_dir = self.root / "done"
+        self.payload_dir = self.root / "payloads"
+        for directory in (self.pending_dir, self.running_dir, self.done_dir, self.payload_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def submit(self, op: str, args: Dict[str, Any], content: Optional[bytes] = None) -> str:
+        """
+        Queue a write job.
+
+        Args:
+            op: Operation name understood by the writer
+            args: JSON-serializable operation arguments
+            content: Optional binary payload (e.g. an uploaded PDF)
+
+        Returns:
+            Job id to wait on
+        """
+        job_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        if content is not None:
+            payload_path = self.payload_dir / job_id
+            tmp_path = payload_path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, payload_path)
+        _write_json(self.pending_dir / f"{job_id}.json", {
+            "id": job_id,
+            "op": op,
+            "args": args,
+            "has_payload": content is not None,
+        })
+        return job_id
+
+    def wait(self, job_id: str, timeout: float) -> Dict[str, Any]:
+        """
+        Block until the writer has finished a job.
+
+        Raises:
+            TimeoutError: If the job is not done within `timeout` seconds
+        """
+        result_path = self.done_dir / f"{job_id}.json"
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if result_path.exists():
+                with open(result_path, "r", encoding="utf-8") as f:
+                    result = json.load(f)
+                result_path.unlink(missing_ok=True)
+                return result
+            time.sleep(POLL_INTERVAL)
+        raise TimeoutError(f"Write job {job_id} did not finish within {timeout:.0f}s")
+
+    def depth(self) -> int:
+        """Number of jobs waiting for the writer."""
+        return sum(1 for _ in self.pending_dir.glob("*.json"))
+
+    def recover(self) -> int:
+        """Move jobs interrupted by a writer crash back to the pending queue."""
+        recovered = 0
+        for path in self.running_dir.glob("*.json"):
+            os.replace(path, self.pending_dir / path.name)
+            recovered += 1
+        if recovered:
+            logger.warning(f"Re-queued {recovered} interrupted write jobs")
+        return recovered
+
+    def claim(self, timeout: float = 1.0) -> Optional[Tuple[Dict[str, Any], Optional[bytes]]]:
+        """
+        Take the oldest pending job (writer only).
+
+        Args:
+            timeout: Seconds to wait for a job
+
+        Returns:
+            Tuple of (job, payload bytes or None), or None if the queue stayed empty
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            for name in sorted(p.name for p in self.pending_dir.glob("*.json")):
+                running_path = self.running_dir / name
+                try:
+                    os.replace(self.pending_dir / name, running_path)
+                except FileNotFoundError:
+                    continue
+                with open(running_path, "r", encoding="utf-8") as f:
+                    job = json.load(f)
+                content = None
+                if job.get("has_payload"):
+                    with open(self.payload_dir / job["id"], "rb") as f:
+                        content = f.read()
+                return job, content
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(POLL_INTERVAL)
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> None:
+        """Publish a job's result and drop its spool files (writer only)."""
+        _write_json(self.done_dir / f"{job_id}.json", result)
+        (self.running_dir / f"{job_id}.json").unlink(missing_ok=True)
+        (self.payload_dir / job_id).unlink(missing_ok=True)